@@ -0,0 +1,111 @@
+"""
+Benchmark do modelo compilado (src/compiled_model.py) contra o pipeline do scikit-learn:
+- latência de um email e de um lote (p50/p95);
+- memória residente de um processo novo que carrega cada artefato e classifica um email;
+- tamanho dos artefatos e concordância das predições.
+
+    python benchmarks/bench_compiled_model.py --iterations 500
+    python benchmarks/bench_compiled_model.py --synthetic-vocab 200000   # pipeline maior, com n-gramas
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from time import perf_counter
+
+from common import add_src_to_path, latency_summary, synthetic_emails, write_report, BASE_DIR, SRC_DIR
+
+add_src_to_path()
+
+import joblib
+import numpy as np
+
+from compiled_model import CompiledModel
+
+# Executado em um processo novo; imprime a memória após carregar o artefato e classificar
+CHILD = """
+import json, sys
+import joblib
+from common import rss_bytes
+before = rss_bytes()
+model = joblib.load(sys.argv[1], mmap_mode='r')
+model.predict(['Preciso de suporte técnico urgente.'])
+print(json.dumps({'baseline_rss': before, 'rss': rss_bytes(), 'sklearn_loaded': 'sklearn' in sys.modules}))
+"""
+
+
+def child_memory(path):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC_DIR), str(BASE_DIR / "benchmarks")]))
+    output = subprocess.check_output([sys.executable, "-c", CHILD, str(path)], env=env, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def synthetic_pipeline(vocab_size):
+    """
+    Treina um pipeline com n-gramas (1, 3) em emails sintéticos, com vocabulário de cerca de `vocab_size` termos.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import Pipeline
+
+    texts = synthetic_emails(max(200, vocab_size // 20), words=60, seed=7)
+    labels = [int(i % 2) for i in range(len(texts))]
+    vectorizer = TfidfVectorizer(ngram_range=(1, 3), max_features=vocab_size)
+    return Pipeline([("tfidf", vectorizer), ("clf", MultinomialNB())]).fit(texts, labels)
+
+
+def time_calls(func, iterations):
+    func()  # Aquecimento
+    samples = []
+    for _ in range(iterations):
+        start = perf_counter()
+        func()
+        samples.append(perf_counter() - start)
+    return latency_summary(samples)
+
+
+def bench_model(name, model, path, emails, batch, iterations):
+    results = {
+        "single": time_calls(lambda: model.predict(emails[:1]), iterations),
+        "batch": time_calls(lambda: model.predict(batch), max(10, iterations // 20)),
+        "artifact_bytes": Path(path).stat().st_size,
+        "process": child_memory(path),
+    }
+    process = results["process"]
+    print(f"{name:<9} 1 email p50={results['single']['p50_ms']:.3f}ms p95={results['single']['p95_ms']:.3f}ms  "
+          f"lote de {len(batch)} p50={results['batch']['p50_ms']:.1f}ms  "
+          f"artefato={results['artifact_bytes'] / 1024:.1f}KiB  "
+          f"RSS={(process['rss'] or 0) / 2 ** 20:.1f}MiB (sklearn carregado: {process['sklearn_loaded']})")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do modelo compilado contra o pipeline")
+    parser.add_argument("--model", default=os.getenv("MODEL_PATH", str(BASE_DIR / "models/email-classifier/model.joblib")))
+    parser.add_argument("--synthetic-vocab", type=int, default=0,
+                        help="Treina um pipeline sintético com este vocabulário em vez de usar --model")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pipeline = synthetic_pipeline(args.synthetic_vocab) if args.synthetic_vocab else joblib.load(args.model)
+        compiled = CompiledModel.from_pipeline(pipeline)
+        pipeline_path, compiled_path = Path(workdir) / "pipeline.joblib", Path(workdir) / "compiled.joblib"
+        joblib.dump(pipeline, pipeline_path)
+        joblib.dump(compiled, compiled_path)
+
+        emails = synthetic_emails(max(args.batch, 1000), seed=3)
+        batch = emails[:args.batch]
+        agreement = float(np.mean(compiled.predict(emails) == pipeline.predict(emails)))
+        print(f"Termos: {compiled.n_features}  concordância das predições: {agreement:.2%} em {len(emails)} emails")
+
+        write_report("compiled_model", {
+            "n_features": compiled.n_features,
+            "agreement": agreement,
+            "pipeline": bench_model("pipeline", pipeline, pipeline_path, emails, batch, args.iterations),
+            "compiled": bench_model("compilado", compiled, compiled_path, emails, batch, args.iterations),
+        })
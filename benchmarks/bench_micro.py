@@ -0,0 +1,92 @@
+"""
+Micro-benchmarks de classify_email, extract_text_from_pdf e clean_text
+sobre corpora sintéticos de tamanhos diferentes.
+
+    python benchmarks/bench_micro.py --sizes 100,1000,10000 --pdf-pages 1,10,50
+"""
+import io
+import os
+import argparse
+from time import perf_counter
+
+from common import add_src_to_path, synthetic_emails, build_pdf, latency_summary, rss_bytes, write_report, BASE_DIR
+
+os.environ.setdefault("MODEL_PATH", str(BASE_DIR / "models/email-classifier/model.joblib"))
+add_src_to_path()
+
+from app import classify_email, classify_emails, extract_text_from_pdf  # noqa: E402
+from text_utils import clean_text  # noqa: E402
+
+
+def time_each(func, items):
+    """
+    Executa func(item) para cada item e retorna as latências em segundos.
+    """
+    latencies = []
+    for item in items:
+        start = perf_counter()
+        func(item)
+        latencies.append(perf_counter() - start)
+    return latencies
+
+
+def bench_classify(sizes, words):
+    results = []
+    for size in sizes:
+        corpus = synthetic_emails(size, words=words)
+        single = time_each(classify_email, corpus)
+
+        start = perf_counter()
+        classify_emails(corpus)
+        batch_seconds = perf_counter() - start
+
+        results.append({
+            "size": size,
+            "words": words,
+            "single": latency_summary(single),
+            "single_docs_per_s": size / sum(single),
+            "batch_seconds": batch_seconds,
+            "batch_docs_per_s": size / batch_seconds,
+        })
+        print(f"classify_email  n={size:<6} p50={results[-1]['single']['p50_ms']:.3f}ms  lote={results[-1]['batch_docs_per_s']:.0f} docs/s")
+    return results
+
+
+def bench_pdf(page_counts, repeat):
+    results = []
+    for pages in page_counts:
+        pdf = build_pdf([f"Pagina {i} solicito atualizacao do relatorio mensal" for i in range(pages)])
+        latencies = time_each(lambda data: extract_text_from_pdf(io.BytesIO(data)), [pdf] * repeat)
+        results.append({"pages": pages, "bytes": len(pdf), "latency": latency_summary(latencies)})
+        print(f"extract_text_from_pdf  páginas={pages:<4} p50={results[-1]['latency']['p50_ms']:.2f}ms")
+    return results
+
+
+def bench_clean_text(sizes, words):
+    results = []
+    for size in sizes:
+        corpus = synthetic_emails(size, words=words, seed=7)
+        latencies = time_each(clean_text, corpus)
+        results.append({"size": size, "words": words, "latency": latency_summary(latencies), "docs_per_s": size / sum(latencies)})
+        print(f"clean_text  n={size:<6} p50={results[-1]['latency']['p50_ms']:.4f}ms")
+    return results
+
+
+def parse_ints(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks do pipeline de classificação")
+    parser.add_argument("--sizes", type=parse_ints, default=[100, 1000, 10000], help="Tamanhos dos corpora")
+    parser.add_argument("--words", type=int, default=40, help="Palavras por email")
+    parser.add_argument("--pdf-pages", type=parse_ints, default=[1, 10, 50], help="Número de páginas dos PDFs")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições por PDF")
+    args = parser.parse_args()
+
+    write_report("micro", {
+        "classify_email": bench_classify(args.sizes, args.words),
+        "extract_text_from_pdf": bench_pdf(args.pdf_pages, args.repeat),
+        "clean_text": bench_clean_text(args.sizes, args.words),
+        "rss_bytes": rss_bytes(),
+    })
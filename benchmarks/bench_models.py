@@ -0,0 +1,299 @@
+"""
+Compara as variantes de classificador no mesmo conjunto de avaliação:
+qualidade (F1 e acurácia), latência de um email e de um lote, vazão, tempo de
+carregamento e pico de memória (RSS).
+
+Variantes:
+- sklearn: pipeline TF-IDF + NB de src/train_model.py (MODEL_PATH);
+- compiled: o mesmo pipeline compilado (src/compiled_model.py);
+- bert_torch: BERT ajustado por models/email-classifier.py (PyTorch);
+- onnx_float / onnx_int8: BERT exportado por src/export_onnx.py;
+- cascade: sklearn + onnx_int8 abaixo de CASCADE_THRESHOLD, como CLASSIFIER_BACKEND=cascade.
+
+Cada variante roda em um processo novo, para que o tempo de carregamento e a memória
+não sejam afetados pelas demais. Variantes sem artefato ou dependência são listadas
+como indisponíveis. Por padrão, a avaliação usa o mesmo conjunto de teste de
+src/train_model.py (TEST_SIZE, RANDOM_STATE); com --eval-csv, todo o arquivo informado.
+
+    python benchmarks/bench_models.py
+    python benchmarks/bench_models.py --eval-csv corpus.csv --text-column body --markdown models.md
+    python benchmarks/compare.py --benchmark models
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+from pathlib import Path
+from time import perf_counter
+
+from common import add_src_to_path, latency_summary, peak_rss_bytes, rss_bytes, write_report, BASE_DIR, SRC_DIR
+
+VARIANTS = ("sklearn", "compiled", "bert_torch", "onnx_float", "onnx_int8", "cascade")
+
+# Dependências de cada variante (verificadas sem importar os pacotes)
+REQUIREMENTS = {
+    "sklearn": ("sklearn",),
+    "compiled": (),
+    "bert_torch": ("torch", "transformers"),
+    "onnx_float": ("onnxruntime", "transformers"),
+    "onnx_int8": ("onnxruntime", "transformers"),
+    "cascade": ("sklearn", "onnxruntime", "transformers"),
+}
+
+
+def artifacts(args):
+    from onnx_classifier import FLOAT_FILE, QUANTIZED_FILE
+
+    return {
+        "sklearn": [args.sklearn_model],
+        "compiled": [args.compiled_model],
+        "bert_torch": [args.bert_dir / "config.json"],
+        "onnx_float": [args.onnx_dir / FLOAT_FILE],
+        "onnx_int8": [args.onnx_dir / QUANTIZED_FILE],
+        "cascade": [args.sklearn_model, args.onnx_dir / QUANTIZED_FILE],
+    }
+
+
+def unavailable(name, args):
+    """
+    Motivo pelo qual a variante não pode ser avaliada, ou None.
+    """
+    missing = [module for module in REQUIREMENTS[name] if importlib.util.find_spec(module) is None]
+    if missing:
+        return f"dependência ausente: {', '.join(missing)}"
+    files = [str(path) for path in artifacts(args)[name] if not Path(path).exists()]
+    if files:
+        return f"artefato ausente: {', '.join(files)}"
+    return None
+
+
+class CascadeClassifier:
+    """
+    Interface de predição sobre cascade_predict (a mesma regra de CLASSIFIER_BACKEND=cascade),
+    contando quantos emails foram reclassificados pelo BERT.
+    """
+
+    def __init__(self, fast, heavy, threshold):
+        from cascade import cascade_predict
+
+        self._cascade_predict = cascade_predict
+        self.fast = fast
+        self.heavy = heavy
+        self.threshold = threshold
+        self.classified = 0
+        self.escalated = 0
+
+    def predict(self, texts):
+        results = self._cascade_predict(self.fast, self.heavy, list(texts), self.threshold)
+        self.classified += len(results)
+        self.escalated += sum(tier == "transformer" for _, _, tier in results)
+        return [category for category, _, _ in results]
+
+
+def load_variant(name, args):
+    import joblib
+
+    if name in ("sklearn", "compiled"):
+        return joblib.load(args.sklearn_model if name == "sklearn" else args.compiled_model, mmap_mode="r")
+    if name == "bert_torch":
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        from export_onnx import TorchClassifier
+
+        model = AutoModelForSequenceClassification.from_pretrained(str(args.bert_dir)).eval()
+        return TorchClassifier(model, AutoTokenizer.from_pretrained(str(args.bert_dir)), args.max_length)
+
+    from onnx_classifier import OnnxClassifier, FLOAT_FILE, QUANTIZED_FILE
+
+    onnx_file = FLOAT_FILE if name == "onnx_float" else QUANTIZED_FILE
+    heavy = OnnxClassifier(args.onnx_dir, onnx_file, args.max_length, args.batch_size).load()
+    if name == "cascade":
+        return CascadeClassifier(joblib.load(args.sklearn_model, mmap_mode="r"), heavy, args.cascade_threshold)
+    return heavy
+
+
+def run_worker(name, args):
+    """
+    Executado no processo da variante: carrega o modelo, mede e imprime o resultado em JSON.
+    """
+    import numpy as np
+
+    with open(args.input, encoding="utf-8") as f:
+        data = json.load(f)
+    texts, labels = data["texts"], np.asarray(data["labels"])
+
+    baseline_rss = rss_bytes()
+    start = perf_counter()
+    model = load_variant(name, args)
+    model.predict(texts[:1])  # Primeira predição (inicializações preguiçosas) conta no carregamento
+    load_seconds = perf_counter() - start
+
+    predictions = np.concatenate([model.predict(texts[i:i + args.batch_size])
+                                  for i in range(0, len(texts), args.batch_size)])
+
+    single = []
+    for i in range(args.latency_samples):
+        text = texts[i % len(texts)]
+        start = perf_counter()
+        model.predict([text])
+        single.append(perf_counter() - start)
+
+    # Vazão em lotes sobre um corpus de --throughput-docs emails (o conjunto repetido)
+    corpus = [texts[i % len(texts)] for i in range(max(args.throughput_docs, len(texts)))]
+    batches = []
+    start = perf_counter()
+    for i in range(0, len(corpus), args.batch_size):
+        batch_start = perf_counter()
+        model.predict(corpus[i:i + args.batch_size])
+        batches.append(perf_counter() - batch_start)
+    elapsed = perf_counter() - start
+
+    print(json.dumps({
+        "predictions": predictions.tolist(),
+        "single": latency_summary(single),
+        "batch": latency_summary(batches),
+        "throughput_per_s": len(corpus) / elapsed,
+        "load_seconds": load_seconds,
+        "baseline_rss_bytes": baseline_rss,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "escalated_fraction": model.escalated / model.classified if isinstance(model, CascadeClassifier) else None,
+    }))
+
+
+def worker_command(name, args, input_path):
+    command = [sys.executable, os.path.abspath(__file__), "--worker", name, "--input", str(input_path)]
+    for option in ("sklearn_model", "compiled_model", "bert_dir", "onnx_dir", "max_length", "batch_size",
+                   "cascade_threshold", "latency_samples", "throughput_docs"):
+        command += [f"--{option.replace('_', '-')}", str(getattr(args, option))]
+    return command
+
+
+def evaluate_variant(name, args, input_path, labels):
+    from sklearn.metrics import accuracy_score, f1_score
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC_DIR), str(BASE_DIR / "benchmarks")]))
+    result = subprocess.run(worker_command(name, args, input_path), cwd=SRC_DIR, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"variant": name, "status": "error", "reason": (result.stderr.strip().splitlines() or ["sem saída"])[-1]}
+
+    measured = json.loads(result.stdout.strip().splitlines()[-1])
+    predictions = measured.pop("predictions")
+    return {
+        "variant": name,
+        "status": "ok",
+        "f1": float(f1_score(labels, predictions, average="weighted")),
+        "accuracy": float(accuracy_score(labels, predictions)),
+        **measured,
+    }
+
+
+def load_eval_set(args):
+    if args.eval_csv is None:
+        from export_onnx import load_eval_set as held_out_split
+
+        texts, labels = held_out_split(args.train_csv)
+        return texts, labels.tolist(), f"held-out de {args.train_csv.name if args.train_csv else 'email_training_data'}"
+
+    from dataset_store import open_dataset
+
+    data = open_dataset(args.eval_csv).read([args.text_column, args.label_column], stop=args.limit or None)
+    return data[args.text_column].tolist(), data[args.label_column].tolist(), str(args.eval_csv)
+
+
+def format_table(rows):
+    header = (f"{'variante':<11} {'F1':>6} {'acurácia':>8} {'1 email p50':>11} {'p95':>8} "
+              f"{'lote p50':>9} {'emails/s':>9} {'carga':>7} {'pico RSS':>9}")
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        if row["status"] != "ok":
+            lines.append(f"{row['variant']:<11} {row['status']}: {row['reason']}")
+            continue
+        lines.append(
+            f"{row['variant']:<11} {row['f1']:>6.3f} {row['accuracy']:>8.3f} {row['single']['p50_ms']:>9.3f}ms "
+            f"{row['single']['p95_ms']:>6.3f}ms {row['batch']['p50_ms']:>7.2f}ms {row['throughput_per_s']:>9.0f} "
+            f"{row['load_seconds']:>6.2f}s {(row['peak_rss_bytes'] or 0) / 2 ** 20:>6.0f}MiB"
+        )
+    return "\n".join(lines)
+
+
+def format_markdown(rows, eval_name, eval_size, batch_size):
+    lines = [
+        f"Avaliação: {eval_name} ({eval_size} emails), lotes de {batch_size}",
+        "",
+        "| Variante | F1 | Acurácia | 1 email p50 (ms) | 1 email p95 (ms) | Lote p50 (ms) | Emails/s | Carga (s) | Pico RSS (MiB) |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    for row in rows:
+        if row["status"] != "ok":
+            lines.append(f"| {row['variant']} | {row['status']}: {row['reason']} |||||||| ")
+            continue
+        lines.append(
+            f"| {row['variant']} | {row['f1']:.3f} | {row['accuracy']:.3f} | {row['single']['p50_ms']:.3f} | "
+            f"{row['single']['p95_ms']:.3f} | {row['batch']['p50_ms']:.2f} | {row['throughput_per_s']:.0f} | "
+            f"{row['load_seconds']:.2f} | {(row['peak_rss_bytes'] or 0) / 2 ** 20:.0f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compara as variantes de classificador")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="Variantes separadas por vírgula")
+    parser.add_argument("--train-csv", type=Path, default=None,
+                        help="Dataset de treino, CSV ou Parquet (padrão: o de src/dataset_store.py); "
+                             "avaliação no conjunto de teste de src/train_model.py")
+    parser.add_argument("--eval-csv", type=Path, default=None, help="Corpus externo de avaliação, CSV ou Parquet (todo o arquivo)")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--limit", type=int, default=0, help="Usa apenas as primeiras N linhas de --eval-csv")
+    parser.add_argument("--sklearn-model", type=Path,
+                        default=Path(os.getenv("MODEL_PATH", BASE_DIR / "models/email-classifier/model.joblib")))
+    parser.add_argument("--compiled-model", type=Path, default=BASE_DIR / "models/email-classifier/model.compiled.joblib")
+    parser.add_argument("--bert-dir", type=Path, default=BASE_DIR / "models/email-classifier")
+    parser.add_argument("--onnx-dir", type=Path, default=BASE_DIR / "models/email-classifier-onnx")
+    parser.add_argument("--max-length", type=int, default=128, help="Tokens por email nas variantes BERT")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--cascade-threshold", type=float, default=float(os.getenv("CASCADE_THRESHOLD", 0.8)))
+    parser.add_argument("--latency-samples", type=int, default=200, help="Predições de um único email")
+    parser.add_argument("--throughput-docs", type=int, default=1000, help="Emails classificados na medição de vazão")
+    parser.add_argument("--markdown", type=Path, default=None, help="Salva também a tabela em Markdown")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--input", default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    add_src_to_path()
+    if args.worker:
+        run_worker(args.worker, args)
+        sys.exit(0)
+
+    # Os processos das variantes rodam em SRC_DIR: caminhos relativos à pasta atual deixariam de valer
+    for option in ("sklearn_model", "compiled_model", "bert_dir", "onnx_dir"):
+        setattr(args, option, getattr(args, option).resolve())
+
+    texts, labels, eval_name = load_eval_set(args)
+    print(f"Avaliação: {eval_name} ({len(texts)} emails)")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = Path(workdir) / "eval.json"
+        with open(input_path, "w", encoding="utf-8") as f:
+            json.dump({"texts": texts, "labels": labels}, f, ensure_ascii=False)
+
+        for name in [v.strip() for v in args.variants.split(",") if v.strip()]:
+            if name not in VARIANTS:
+                raise SystemExit(f"Variante desconhecida: {name} (use {', '.join(VARIANTS)})")
+            reason = unavailable(name, args)
+            rows.append({"variant": name, "status": "unavailable", "reason": reason} if reason
+                        else evaluate_variant(name, args, input_path, labels))
+
+    print(format_table(rows))
+    if args.markdown:
+        args.markdown.write_text(format_markdown(rows, eval_name, len(texts), args.batch_size), encoding="utf-8")
+        print(f"Tabela salva em: {args.markdown}")
+    write_report("models", {"eval_set": eval_name, "eval_size": len(texts), "batch_size": args.batch_size,
+                            "variants": rows})
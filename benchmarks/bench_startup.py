@@ -0,0 +1,92 @@
+"""
+Benchmark de inicialização (cold start) da API, cada medição em um interpretador novo:
+- tempo de `import app`, com e sem MODEL_PRELOAD;
+- tempo da primeira requisição (classificação) logo após a importação;
+- tempo de cada etapa do /warmup;
+- módulos mais lentos de importar (python -X importtime).
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+from common import latency_summary, write_report, BASE_DIR, SRC_DIR
+
+# Executado em um processo novo; imprime os tempos em JSON
+CHILD = """
+import json, sys
+from time import perf_counter
+start = perf_counter()
+import app
+imported = perf_counter() - start
+client = app.app.test_client()
+start = perf_counter()
+response = client.post('/process/batch', json=['Preciso de suporte técnico urgente.'])
+first_request = perf_counter() - start
+warmup = client.get('/warmup').get_json()
+print(json.dumps({'import_s': imported, 'first_request_s': first_request,
+                  'status': response.status_code, 'warmup_ms': warmup.get('timings_ms')}))
+"""
+
+
+def child_env(preload):
+    env = dict(os.environ)
+    env.setdefault("MODEL_PATH", str(BASE_DIR / "models/email-classifier/model.joblib"))
+    env.update({"MODEL_PRELOAD": "True" if preload else "False", "OPENAI_API_KEY": "benchmark"})
+    return env
+
+
+def run_child(preload):
+    output = subprocess.check_output([sys.executable, "-c", CHILD], cwd=SRC_DIR, env=child_env(preload),
+                                     stderr=subprocess.DEVNULL, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_profile(top):
+    """
+    Módulos com maior tempo acumulado de importação (em ms), segundo python -X importtime.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=SRC_DIR,
+                            env=child_env(False), capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        modules.append({"module": name, "cumulative_ms": int(cumulative) / 1000})
+    return sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top]
+
+
+def bench_startup(runs, preload):
+    samples = [run_child(preload) for _ in range(runs)]
+    results = {
+        "import": latency_summary([s["import_s"] for s in samples]),
+        "first_request": latency_summary([s["first_request_s"] for s in samples]),
+        "cold_start": latency_summary([s["import_s"] + s["first_request_s"] for s in samples]),
+        "warmup_ms": samples[-1]["warmup_ms"],
+    }
+    label = "preload" if preload else "lazy"
+    print(f"{label:<8} import p50={results['import']['p50_ms']:.1f}ms  "
+          f"primeira requisição p50={results['first_request']['p50_ms']:.1f}ms  "
+          f"cold start p50={results['cold_start']['p50_ms']:.1f}ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização da API")
+    parser.add_argument("--runs", type=int, default=5, help="Processos novos por cenário")
+    parser.add_argument("--top", type=int, default=15, help="Módulos listados no perfil de importação")
+    args = parser.parse_args()
+
+    profile = import_profile(args.top)
+    for module in profile:
+        print(f"{module['cumulative_ms']:>8.1f}ms  {module['module']}")
+
+    write_report("startup", {
+        "lazy": bench_startup(args.runs, preload=False),
+        "preload": bench_startup(args.runs, preload=True),
+        "import_profile": profile,
+    })
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import random
+import platform
+import subprocess
+from pathlib import Path
+from time import strftime
+
+# Diretórios do projeto
+BASE_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = BASE_DIR / "src"
+RESULTS_DIR = Path(os.getenv("BENCH_RESULTS_DIR", BASE_DIR / "benchmarks" / "results"))
+
+# Vocabulário usado para gerar emails sintéticos
+PRODUCTIVE_WORDS = [
+    "suporte", "sistema", "erro", "relatório", "caso", "atualização", "reunião", "projeto",
+    "solicito", "urgente", "acesso", "fatura", "contrato", "prazo", "módulo", "chamado",
+]
+UNPRODUCTIVE_WORDS = [
+    "obrigado", "parabéns", "feliz", "aniversário", "café", "abraço", "férias", "festa",
+    "série", "futebol", "restaurante", "final", "semana", "bom", "dia", "ótimo",
+]
+FILLER_WORDS = ["o", "a", "de", "que", "para", "com", "no", "na", "por", "você", "está", "hoje"]
+
+
+def add_src_to_path():
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+
+def synthetic_emails(count, words=40, seed=42):
+    """
+    Gera `count` emails sintéticos com cerca de `words` palavras cada.
+    """
+    rng = random.Random(seed)
+    emails = []
+    for _ in range(count):
+        topic = PRODUCTIVE_WORDS if rng.random() < 0.5 else UNPRODUCTIVE_WORDS
+        length = max(3, int(rng.gauss(words, words / 4)))
+        emails.append(" ".join(rng.choice(topic if rng.random() < 0.4 else FILLER_WORDS) for _ in range(length)))
+    return emails
+
+
+def build_pdf(pages):
+    """
+    Monta um PDF válido com uma linha de texto por página.
+    """
+    count = len(pages)
+    objects = [
+        b"<</Type /Catalog /Pages 2 0 R>>",
+        ("<</Type /Pages /Kids [%s] /Count %d>>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(count)), count)).encode(),
+        b"<</Type /Font /Subtype /Type1 /BaseFont /Helvetica>>",
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1", "replace")
+        objects.append(f"<</Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources <</Font <</F1 3 0 R>>>> /Contents {5 + 2 * i} 0 R>>".encode())
+        objects.append(b"<</Length %d>>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<</Size %d /Root 1 0 R>>\nstartxref\n%d\n%%%%EOF" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def percentile(values, q):
+    """
+    Percentil `q` (0-100) por interpolação linear.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latency_summary(seconds):
+    """
+    Resume uma lista de latências (em segundos) em milissegundos.
+    """
+    return {
+        "count": len(seconds),
+        "mean_ms": sum(seconds) / len(seconds) * 1000 if seconds else None,
+        "p50_ms": percentile(seconds, 50) * 1000 if seconds else None,
+        "p95_ms": percentile(seconds, 95) * 1000 if seconds else None,
+        "p99_ms": percentile(seconds, 99) * 1000 if seconds else None,
+        "max_ms": max(seconds) * 1000 if seconds else None,
+    }
+
+
+def _proc_status_bytes(field, pid=None):
+    try:
+        with open(f"/proc/{pid or os.getpid()}/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def rss_bytes(pid=None):
+    """
+    Memória residente (VmRSS) de um processo, lida de /proc. Retorna None fora do Linux.
+    """
+    return _proc_status_bytes("VmRSS:", pid)
+
+
+def peak_rss_bytes(pid=None):
+    """
+    Pico de memória residente (VmHWM) de um processo desde o seu exec. Diferente de
+    ru_maxrss, não herda o pico do processo pai. Retorna None fora do Linux.
+    """
+    return _proc_status_bytes("VmHWM:", pid)
+
+
+def child_pids(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, text=True).strip()
+    except Exception:
+        return None
+
+
+def write_report(name, results):
+    """
+    Salva o relatório em JSON (um arquivo por execução) e acrescenta uma linha
+    em <name>-history.jsonl, para comparar execuções ao longo do tempo.
+    """
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    report = {
+        "benchmark": name,
+        "timestamp": strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    path = RESULTS_DIR / f"{name}-{strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    with open(RESULTS_DIR / f"{name}-history.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    print(f"Relatório salvo em: {path}")
+    return path
@@ -0,0 +1,74 @@
+"""
+Compara dois relatórios de benchmark e aponta regressões.
+Sem argumentos de arquivo, compara as duas últimas execuções do histórico.
+
+    python benchmarks/compare.py --benchmark load --threshold 10
+    python benchmarks/compare.py antigo.json novo.json
+"""
+import sys
+import json
+import argparse
+
+from common import RESULTS_DIR
+
+# Métricas em que valores maiores são melhores (vazão e qualidade); nas demais (latência, memória), piores
+HIGHER_IS_BETTER = ("_per_s", "f1", "accuracy")
+COMPARED = ("_ms", "_per_s", "_seconds", "rss_bytes", "f1", "accuracy")
+
+
+def flatten(data, prefix=""):
+    """
+    Converte o relatório em {caminho: valor} para as métricas numéricas.
+    Listas de resultados são indexadas pelo primeiro campo identificador (size, pages, concurrency).
+    """
+    items = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            items.update(flatten(value, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            label = index
+            if isinstance(value, dict):
+                label = next((f"{k}={value[k]}" for k in ("concurrency", "size", "pages", "variant") if k in value), index)
+            items.update(flatten(value, f"{prefix}[{label}]"))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool) and prefix.endswith(COMPARED):
+        items[prefix] = data
+    return items
+
+
+def load_reports(args):
+    if args.files:
+        return [json.load(open(path, encoding="utf-8")) for path in args.files]
+    with open(RESULTS_DIR / f"{args.benchmark}-history.jsonl", encoding="utf-8") as f:
+        history = [json.loads(line) for line in f if line.strip()]
+    if len(history) < 2:
+        raise SystemExit("São necessárias ao menos duas execuções no histórico")
+    return history[-2:]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara relatórios de benchmark")
+    parser.add_argument("files", nargs="*", help="Relatório base e relatório novo")
+    parser.add_argument("--benchmark", default="load", help="Nome do benchmark no histórico")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Variação (%%) considerada regressão")
+    args = parser.parse_args()
+
+    base, new = load_reports(args)
+    base_metrics, new_metrics = flatten(base["results"]), flatten(new["results"])
+    print(f"Base: {base.get('git_revision')} ({base['timestamp']})  Novo: {new.get('git_revision')} ({new['timestamp']})")
+
+    regressions = []
+    for path in sorted(base_metrics.keys() & new_metrics.keys()):
+        old, current = base_metrics[path], new_metrics[path]
+        if not old:
+            continue
+        change = (current - old) / old * 100
+        worse = -change if path.endswith(HIGHER_IS_BETTER) else change
+        flag = "REGRESSÃO" if worse > args.threshold else ""
+        if flag:
+            regressions.append(path)
+        print(f"{path:<70} {old:>14.3f} {current:>14.3f} {change:>+8.1f}% {flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} métrica(s) pioraram mais de {args.threshold}%")
+        sys.exit(1)
@@ -0,0 +1,152 @@
+"""
+Teste de carga do endpoint /process rodando no gunicorn, com um LLM simulado
+de latência configurável. Mede p50/p95/p99, requisições por segundo e RSS
+para cada nível de concorrência.
+
+    python benchmarks/load_test.py --concurrency 1,8,32 --duration 20 --llm-latency 0.5 --workers 2
+"""
+import os
+import sys
+import socket
+import argparse
+import threading
+import subprocess
+from time import perf_counter, sleep
+
+import requests
+
+from common import synthetic_emails, latency_summary, rss_bytes, child_pids, write_report, BASE_DIR, SRC_DIR
+from stub_llm import start_stub_llm
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(port, workers, threads, llm_url, extra_env=None):
+    """
+    Inicia a API no gunicorn apontando o LLM para o servidor simulado.
+    """
+    env = dict(os.environ)
+    env.setdefault("MODEL_PATH", str(BASE_DIR / "models/email-classifier/model.joblib"))
+    env.update({
+        "OPENAI_BASE_URL": llm_url,
+        "OPENAI_API_KEY": "benchmark",
+        "RESPONSE_CACHE_ENABLED": "False",  # Mede o caminho completo até o LLM
+        "NEAR_DUP_ENABLED": "False",  # Idem para a reutilização de respostas de emails quase idênticos
+        "RATE_LIMIT_PER_SECOND": "0",  # Todos os clientes vêm de 127.0.0.1 (--rate-limit mantém o limite)
+        **(extra_env or {}),
+    })
+    command = [
+        sys.executable, "-m", "gunicorn", "-c", str(BASE_DIR / "gunicorn.conf.py"), "--chdir", str(SRC_DIR),
+        "-w", str(workers), "--threads", str(threads),
+        "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:app",
+    ]
+    return subprocess.Popen(command, env=env)
+
+
+def wait_ready(url, timeout=60):
+    deadline = perf_counter() + timeout
+    while perf_counter() < deadline:
+        try:
+            requests.post(url, json={"email": "aquecimento"}, timeout=5)
+            return
+        except requests.RequestException:
+            sleep(0.2)
+    raise RuntimeError(f"Servidor não respondeu em {timeout}s")
+
+
+def run_level(url, concurrency, duration, emails):
+    """
+    Mantém `concurrency` clientes enviando requisições por `duration` segundos.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = perf_counter() + duration
+
+    def client(offset):
+        session = requests.Session()
+        local_latencies, local_errors, index = [], 0, offset
+        while perf_counter() < deadline:
+            email = emails[index % len(emails)]
+            index += concurrency
+            start = perf_counter()
+            try:
+                response = session.post(url, json={"email": email}, timeout=120)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            local_latencies.append(perf_counter() - start)
+            local_errors += not ok
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    start = perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "requests_per_s": len(latencies) / elapsed,
+        "latency": latency_summary(latencies),
+    }
+
+
+def parse_ints(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga de /process no gunicorn")
+    parser.add_argument("--concurrency", type=parse_ints, default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=20, help="Segundos por nível de concorrência")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Latência do LLM simulado (s)")
+    parser.add_argument("--workers", type=int, default=2, help="Workers do gunicorn")
+    parser.add_argument("--threads", type=int, default=1, help="Threads por worker do gunicorn")
+    parser.add_argument("--path", default="/process", help="Endpoint testado")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="Mantém o limite por cliente (RATE_LIMIT_PER_SECOND do ambiente ou o padrão da API)")
+    args = parser.parse_args()
+
+    stub, llm_url = start_stub_llm(latency=args.llm_latency)
+    port = free_port()
+    extra_env = {"RATE_LIMIT_PER_SECOND": os.getenv("RATE_LIMIT_PER_SECOND", "10")} if args.rate_limit else None
+    server = start_gunicorn(port, args.workers, args.threads, llm_url, extra_env)
+    url = f"http://127.0.0.1:{port}{args.path}"
+    emails = synthetic_emails(5000)
+
+    try:
+        wait_ready(url)
+        levels = []
+        for concurrency in args.concurrency:
+            result = run_level(url, concurrency, args.duration, emails)
+            pids = [server.pid] + child_pids(server.pid)
+            result["rss_bytes"] = sum(rss_bytes(pid) or 0 for pid in pids)
+            levels.append(result)
+            print(f"concorrência={concurrency:<4} rps={result['requests_per_s']:.1f} "
+                  f"p50={result['latency']['p50_ms']:.0f}ms p95={result['latency']['p95_ms']:.0f}ms "
+                  f"p99={result['latency']['p99_ms']:.0f}ms erros={result['errors']}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        stub.shutdown()
+
+    write_report("load", {
+        "config": {
+            "workers": args.workers,
+            "threads": args.threads,
+            "llm_latency_s": args.llm_latency,
+            "duration_s": args.duration,
+            "path": args.path,
+        },
+        "levels": levels,
+    })
@@ -0,0 +1,79 @@
+"""
+Servidor HTTP que imita a API de Chat Completions com latência configurável.
+Usado pelos benchmarks no lugar da OpenAI (aponte OPENAI_BASE_URL para ele).
+
+    python benchmarks/stub_llm.py --port 8090 --latency 0.8
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = "Olá! Recebemos sua mensagem e retornaremos em breve com uma atualização."
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    # Fila de conexões maior que o padrão (5): suporta rajadas de centenas de chamadas simultâneas
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.server.latency)
+
+        if payload.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for token in REPLY.split(" "):
+                chunk = {"choices": [{"delta": {"content": token + " "}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(self.server.token_latency)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+            return
+
+        body = json.dumps({"choices": [{"message": {"role": "assistant", "content": REPLY}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_stub_llm(host="127.0.0.1", port=0, latency=0.5, token_latency=0.0):
+    """
+    Inicia o servidor em uma thread e retorna (servidor, base_url).
+    """
+    server = StubLLMServer((host, port), StubLLMHandler)
+    server.latency = latency
+    server.token_latency = token_latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM simulado para benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.5, help="Latência por requisição (s)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Latência por token no streaming (s)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_llm(args.host, args.port, args.latency, args.token_latency)
+    print(f"LLM simulado em {base_url} (latência {args.latency}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
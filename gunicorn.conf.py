@@ -0,0 +1,24 @@
+import os
+import shutil
+import tempfile
+
+# Configuração do gunicorn: gunicorn -c gunicorn.conf.py --chdir src app:app
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Workers carregam o modelo ao iniciar, antes de receber requisições
+os.environ.setdefault("MODEL_PRELOAD", "True")
+
+# Diretório onde cada worker grava suas métricas; /metrics agrega todos os arquivos
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "autou-prometheus"))
+
+
+def on_starting(server):
+    # Remove métricas de execuções anteriores
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,14 +1,20 @@
 import os
+import hashlib
 import logging
+import resource
+from time import perf_counter
 import torch
 import joblib
 import numpy as np
 from pathlib import Path
-from datasets import load_dataset
-from transformers import AutoModelForSequenceClassification, AutoTokenizer, Trainer, TrainingArguments
+import transformers
+from datasets import Dataset, DatasetDict, load_from_disk
+from transformers import (AutoModelForSequenceClassification, AutoTokenizer, DataCollatorWithPadding,
+                          Trainer, TrainerCallback, TrainingArguments)
 from sklearn.metrics import accuracy_score, precision_recall_fscore_support
 from config import BASE_DIR, MODEL_PATH
 from downloadmodel import model_name  # Importa o modelo baixado
+from dataset_store import open_dataset
 
 # Configuração do logger
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -18,14 +24,19 @@ logger = logging.getLogger(__name__)
 BATCH_SIZE = 8
 EPOCHS = 3
 LEARNING_RATE = 2e-5
+MAX_LENGTH = 512
+SEED = 42
 
-# Caminho do dataset
-CSV_PATH = BASE_DIR / "data/email_training_data.csv"
+# Dataset de treinamento: Parquet (src/dataset_store.py) ou, se ainda não convertido, o CSV
+training_data = open_dataset()
 
 # Caminho do diretório para salvar o modelo treinado
 MODEL_DIR = BASE_DIR / "models/email-classifier"
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
+# Cache do dataset tokenizado (chave: conteúdo do dataset + tokenizer)
+TOKENIZED_CACHE_DIR = BASE_DIR / "models/.tokenized-cache"
+
 # Carregar o tokenizer uma única vez
 tokenizer = AutoTokenizer.from_pretrained(model_name)
 
@@ -33,18 +44,75 @@ def load_data():
     """
     Carrega e converte os dados de treinamento para um formato compatível com transformers.
     """
-    if not CSV_PATH.exists():
-        raise FileNotFoundError(f"Arquivo CSV não encontrado: {CSV_PATH}")
+    if not training_data.exists():
+        raise FileNotFoundError(f"Dataset de treinamento não encontrado: {training_data.path}")
 
-    dataset = load_dataset("csv", data_files=str(CSV_PATH))["train"]
-    dataset = dataset.train_test_split(test_size=0.2, stratify_by_column="label")  # Stratify mantém proporções
+    # Tabela Arrow apenas com as colunas usadas (no Parquet, lida com memory-mapping, sem parsing)
+    dataset = Dataset(training_data.read_table(["text", "label"]))
+    dataset = dataset.class_encode_column("label")  # Necessário para estratificar
+    dataset = dataset.train_test_split(test_size=0.2, stratify_by_column="label", seed=SEED)  # Stratify mantém proporções
     return dataset
 
 def tokenize_function(examples):
     """
     Tokeniza os textos usando o tokenizer do modelo do Hugging Face.
+    Sem padding: cada lote é completado apenas até o maior texto (DataCollatorWithPadding).
+    """
+    encoded = tokenizer(examples["text"], truncation=True, max_length=MAX_LENGTH)
+    encoded["length"] = [len(ids) for ids in encoded["input_ids"]]  # Usado pela amostragem group_by_length
+    return encoded
+
+def tokenized_cache_key():
+    """
+    Chave do cache: conteúdo do dataset, tokenizer, versão do transformers e parâmetros da tokenização.
+    """
+    digest = hashlib.sha256()
+    digest.update(training_data.fingerprint().encode())
+    digest.update(f"{tokenizer.name_or_path}|{len(tokenizer)}|{transformers.__version__}|{MAX_LENGTH}|{SEED}".encode())
+    return digest.hexdigest()[:16]
+
+def load_tokenized_data() -> DatasetDict:
+    """
+    Retorna o dataset tokenizado, reaproveitando o cache em disco quando o dataset e o tokenizer não mudaram.
     """
-    return tokenizer(examples["text"], padding="max_length", truncation=True, max_length=512)
+    cache_path = TOKENIZED_CACHE_DIR / tokenized_cache_key()
+    if cache_path.exists():
+        logger.info(f"Dataset tokenizado carregado do cache: {cache_path}")
+        return load_from_disk(str(cache_path))
+
+    dataset = load_data().map(tokenize_function, batched=True, remove_columns=["text"])
+    dataset.save_to_disk(str(cache_path))
+    logger.info(f"Dataset tokenizado salvo no cache: {cache_path}")
+    return dataset
+
+class EpochStatsCallback(TrainerCallback):
+    """
+    Registra, a cada época, o tempo e a vazão (exemplos e tokens por segundo), junto com o pico
+    de RSS do processo até o fim da época (ru_maxrss não é reiniciado entre as épocas) e,
+    com GPU, o pico de memória da época.
+    """
+
+    def __init__(self, train_dataset):
+        self.samples = len(train_dataset)
+        self.tokens = sum(train_dataset["length"])
+        self.started = None
+
+    def on_epoch_begin(self, args, state, control, **kwargs):
+        self.started = perf_counter()
+        if torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+
+    def on_epoch_end(self, args, state, control, **kwargs):
+        elapsed = perf_counter() - self.started
+        # Pico desde o início do processo (inclui o carregamento do modelo e as épocas anteriores)
+        process_peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB no Linux
+        message = (
+            f"Época {state.epoch:.0f}: {elapsed:.1f}s, {self.samples / elapsed:.1f} exemplos/s, "
+            f"{self.tokens / elapsed:.0f} tokens/s, pico de RSS do processo {process_peak_rss_mb:.0f} MB"
+        )
+        if torch.cuda.is_available():
+            message += f", pico de GPU na época {torch.cuda.max_memory_allocated() / 2 ** 20:.0f} MB"
+        logger.info(message)
 
 def compute_metrics(eval_pred):
     """
@@ -61,8 +129,7 @@ def compute_metrics(eval_pred):
 def train_model():
     try:
         # Carregar dados
-        dataset = load_data()
-        dataset = dataset.map(tokenize_function, batched=True)
+        dataset = load_tokenized_data()
 
         # Configurar modelo
         model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=2)
@@ -70,7 +137,7 @@ def train_model():
         # Configuração do treinamento
         training_args = TrainingArguments(
             output_dir=str(MODEL_DIR),
-            evaluation_strategy="epoch",
+            eval_strategy="epoch",
             save_strategy="epoch",
             learning_rate=LEARNING_RATE,
             per_device_train_batch_size=BATCH_SIZE,
@@ -80,7 +147,10 @@ def train_model():
             save_total_limit=1,  # Mantém apenas o último modelo salvo
             push_to_hub=False,
             logging_dir=str(MODEL_DIR / "logs"),
-            logging_steps=10
+            logging_steps=10,
+            train_sampling_strategy="group_by_length",  # Agrupa emails de tamanho parecido no mesmo lote
+            length_column_name="length",
+            seed=SEED,
         )
 
         # Criar trainer
@@ -89,8 +159,10 @@ def train_model():
             args=training_args,
             train_dataset=dataset["train"],
             eval_dataset=dataset["test"],
-            tokenizer=tokenizer,
-            compute_metrics=compute_metrics
+            processing_class=tokenizer,
+            data_collator=DataCollatorWithPadding(tokenizer, pad_to_multiple_of=8),
+            compute_metrics=compute_metrics,
+            callbacks=[EpochStatsCallback(dataset["train"])],
         )
 
         # Treinar o modelo
@@ -0,0 +1,201 @@
+import os
+import heapq
+import itertools
+import threading
+from math import ceil
+from time import monotonic
+from collections import OrderedDict
+
+# Prioridades da fila de admissão (menor valor = atendida antes)
+PRIORITY_CLASSIFY = 0  # Apenas classificação (modo assíncrono, lote sem resposta)
+PRIORITY_REPLY = 1     # Classificação e geração de resposta pelo LLM
+PRIORITY_NAMES = {PRIORITY_CLASSIFY: "classify", PRIORITY_REPLY: "reply"}
+
+
+class AdmissionRejected(Exception):
+    """
+    Requisição recusada pelo controle de admissão. `retry_after` é o tempo sugerido (em segundos)
+    antes de uma nova tentativa, devolvido no cabeçalho Retry-After.
+    """
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Requisição recusada ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Limite de requisições por cliente (token bucket): `rate` requisições por segundo,
+    com rajadas de até `burst`. Mantém os `max_clients` clientes mais recentes.
+    """
+
+    def __init__(self, rate=10.0, burst=20, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # cliente -> (tokens, último acesso)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            rate=float(os.getenv("RATE_LIMIT_PER_SECOND", 10)),
+            burst=int(os.getenv("RATE_LIMIT_BURST", 20)),
+        )
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def acquire(self, key):
+        """
+        Consome uma requisição do cliente ou lança AdmissionRejected("rate_limit").
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            now = monotonic()
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                raise AdmissionRejected("rate_limit", max(1, ceil((1 - tokens) / self.rate)))
+            self._buckets[key] = (tokens - 1, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+
+
+class AdmissionController:
+    """
+    Controle de admissão por worker.
+
+    No máximo `max_in_flight` requisições são atendidas ao mesmo tempo; as demais esperam
+    em uma fila de prioridade (classificação antes de geração de resposta, e por ordem de
+    chegada dentro da mesma prioridade) de até `max_queue` posições, por no máximo
+    `queue_timeout` segundos. Com a fila cheia, a recusa é imediata.
+
+    As chamadas ao LLM têm um limite próprio (`max_llm_in_flight`). Quando ele se esgota,
+    `try_acquire_llm()` não espera: a requisição é atendida sem resposta (degradação).
+
+    `on_change`, se definido, recebe `stats()` a cada mudança (usado para as métricas).
+    """
+
+    def __init__(self, max_in_flight=32, max_queue=64, queue_timeout=10.0, max_llm_in_flight=16,
+                 enabled=True, on_change=None):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_llm_in_flight = max_llm_in_flight
+        self.enabled = enabled
+        self.on_change = on_change
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._llm_in_flight = 0
+        self._waiting = []  # heap de (prioridade, ordem de chegada)
+        self._arrivals = itertools.count()
+        self._service_time = 1.0  # Média móvel do tempo de atendimento (s), usada no Retry-After
+        self.rejected = {}
+        self.degraded = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", 32)),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", 64)),
+            queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 10)),
+            max_llm_in_flight=int(os.getenv("ADMISSION_MAX_LLM_IN_FLIGHT", 16)),
+            enabled=os.getenv("ADMISSION_ENABLED", "True") == "True",
+        )
+
+    def retry_after(self):
+        """
+        Estimativa (em segundos) de quando a fila atual terá sido atendida.
+        """
+        with self._cond:
+            return max(1, ceil(self._service_time * (len(self._waiting) + 1) / max(self.max_in_flight, 1)))
+
+    def _reject(self, reason):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return AdmissionRejected(reason, self.retry_after())
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change(self.stats())
+
+    def acquire(self, priority=PRIORITY_REPLY):
+        """
+        Reserva uma vaga, esperando na fila se necessário. Retorna o ticket a ser passado
+        para `release()`, ou lança AdmissionRejected ("queue_full" ou "queue_timeout").
+        """
+        if not self.enabled:
+            return None
+        with self._cond:
+            if self._in_flight < self.max_in_flight and not self._waiting:
+                self._in_flight += 1
+                self._changed()
+                return monotonic()
+            if len(self._waiting) >= self.max_queue:
+                raise self._reject("queue_full")
+
+            entry = (priority, next(self._arrivals))
+            heapq.heappush(self._waiting, entry)
+            self._changed()
+            deadline = monotonic() + self.queue_timeout
+            try:
+                while self._waiting[0] != entry or self._in_flight >= self.max_in_flight:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        raise self._reject("queue_timeout")
+                    self._cond.wait(remaining)
+                self._in_flight += 1
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()  # O início da fila mudou
+                self._changed()
+            return monotonic()
+
+    def release(self, ticket):
+        if ticket is None:
+            return
+        with self._cond:
+            self._in_flight -= 1
+            self._service_time = 0.9 * self._service_time + 0.1 * (monotonic() - ticket)
+            self._cond.notify_all()
+            self._changed()
+
+    def try_acquire_llm(self):
+        """
+        Reserva uma chamada ao LLM sem esperar; False indica que as chamadas estão saturadas.
+        """
+        if not self.enabled:
+            return True
+        with self._cond:
+            if self._llm_in_flight >= self.max_llm_in_flight:
+                self.degraded += 1
+                return False
+            self._llm_in_flight += 1
+            self._changed()
+            return True
+
+    def release_llm(self):
+        if not self.enabled:
+            return
+        with self._cond:
+            self._llm_in_flight -= 1
+            self._changed()
+
+    def stats(self):
+        with self._cond:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._waiting:
+                queued[PRIORITY_NAMES[priority]] += 1
+            return {
+                "enabled": self.enabled,
+                "in_flight": self._in_flight,
+                "llm_in_flight": self._llm_in_flight,
+                "queued": queued,
+                "rejected": dict(self.rejected),
+                "degraded": self.degraded,
+            }
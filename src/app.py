@@ -1,10 +1,22 @@
-from flask import Flask, request, jsonify
-import joblib
-import openai
+from flask import Flask, Response, request, jsonify, g, make_response
 import logging
 import os
-from functools import lru_cache
-import pdfplumber  # Correção da importação
+import json
+from time import perf_counter
+from functools import lru_cache, wraps
+from response_cache import ResponseCache
+from near_duplicates import NearDuplicateIndex
+from email_preprocessing import EmailPreprocessor
+from jobs import JobRunner, JobQueueFull, InvalidCallbackUrl
+from admission import AdmissionController, AdmissionRejected, RateLimiter, PRIORITY_CLASSIFY, PRIORITY_REPLY
+from pdf_extraction import PdfExtractor
+from cascade import cascade_predict
+from profiling import RequestProfiler
+from llm_client import LLMClient, CircuitOpenError
+from model_registry import ModelRegistry, ActiveModel, FixedModel
+from metrics import (stage_timer, start_request, finish_request, render_metrics, current_timings,
+                     CACHE_EVENTS, FALLBACKS, ERRORS, PDF_PAGE_LATENCY, CIRCUIT_OPEN, CLASSIFIER_TIER,
+                     LLM_INPUT_TOKENS, ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS, PROFILES)
 
 # Configuração do logger
 logging.basicConfig(level=logging.INFO)
@@ -13,79 +25,674 @@ logger = logging.getLogger(__name__)
 # Inicializar o Flask
 app = Flask(__name__)
 
+# Atrás de proxies reversos: número de proxies confiáveis que acrescentam o endereço do cliente
+# ao X-Forwarded-For. Apenas esses endereços são considerados (o restante do cabeçalho é escrito
+# pelo cliente) e request.remote_addr passa a ser o do cliente
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+if TRUSTED_PROXY_COUNT > 0:
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT)
+
 # Carregar o modelo (com cache para evitar recarregamento)
 @lru_cache(maxsize=1)
 def load_model():
+    import joblib  # Importado sob demanda: o modelo só é carregado no primeiro uso ou no warm-up
+
     try:
         model_path = os.getenv('MODEL_PATH', 'model.pkl')  # Melhor usar variável de ambiente para caminho
-        model = joblib.load(model_path)
+        model = joblib.load(model_path, mmap_mode='r')
         logger.info("Modelo carregado com sucesso")
         return model
     except Exception as e:
         logger.error(f"Erro ao carregar modelo: {e}")
         raise
 
-model = load_model()
+# Registro de versões do modelo; sem versão ativa, usa o arquivo de MODEL_PATH
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+model_registry = ModelRegistry(os.getenv('MODEL_REGISTRY_DIR', os.path.join(BASE_DIR, 'models', 'registry')))
+
+# Backend de classificação: "sklearn" (registro de versões), "onnx" (BERT quantizado)
+# ou "cascade" (modelo do registro primeiro; BERT apenas quando a confiança é baixa)
+CLASSIFIER_BACKEND = os.getenv('CLASSIFIER_BACKEND', 'sklearn')
+CASCADE_THRESHOLD = float(os.getenv('CASCADE_THRESHOLD', 0.8))
+
+# Nível da cascata que responde: "fast" (TF-IDF/NB) ou "transformer" (BERT)
+MODEL_TIER = 'transformer' if CLASSIFIER_BACKEND == 'onnx' else 'fast'
+cascade_model = None
+if CLASSIFIER_BACKEND in ('onnx', 'cascade'):
+    from onnx_classifier import OnnxClassifier
+    onnx_model = OnnxClassifier.from_env(BASE_DIR)
+    if CLASSIFIER_BACKEND == 'cascade':
+        cascade_model = onnx_model
+
+if CLASSIFIER_BACKEND == 'onnx':
+    active_model = FixedModel(f"onnx:{onnx_model.model_file}", onnx_model)
+else:
+    active_model = ActiveModel(
+        model_registry,
+        fallback_loader=load_model,
+        check_interval=float(os.getenv('MODEL_RELOAD_INTERVAL', 2)),
+    )
+
+# Com MODEL_PRELOAD=True (padrão no gunicorn.conf.py), o modelo é carregado na importação;
+# caso contrário (ex.: serverless), na primeira requisição ou via /warmup
+MODEL_PRELOAD = os.getenv('MODEL_PRELOAD', 'False') == 'True'
+
+# Coleta de latência por requisição (histogramas e log estruturado opcional)
+@app.before_request
+def before_request_metrics():
+    g.request_started = start_request()
+
+@app.after_request
+def after_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        finish_request(endpoint, response.status_code, started, request.headers.get('X-Request-ID'))
+    return response
+
+# Extrator de PDF com limites de páginas, caracteres e tempo (configurados por PDF_*)
+pdf_extractor = PdfExtractor.from_env()
 
 # Função para extrair texto de PDF
 def extract_text_from_pdf(file):
     try:
-        with pdfplumber.open(file) as pdf:
-            return " ".join(page.extract_text() for page in pdf.pages if page.extract_text())
+        with stage_timer('pdf_extraction'):
+            result = pdf_extractor.extract(file)
+        for seconds in result.page_seconds:
+            PDF_PAGE_LATENCY.observe(seconds)
+        return result.text
     except Exception as e:
         logger.error(f"Erro ao extrair texto do PDF: {e}")
         return ""
 
-# Função para classificar o email
-def classify_email(content):
+# Cascata: o modelo rápido classifica todos os emails e apenas os de confiança abaixo
+# de CASCADE_THRESHOLD são reclassificados pelo BERT, em uma única chamada
+def cascade_error(e):
+    # Sem o BERT, mantém as respostas do modelo rápido
+    logger.error(f"Erro no classificador da cascata, usando o modelo rápido: {e}")
+    FALLBACKS.labels('cascade_error').inc()
+
+def cascade_classify(contents, model):
+    results = cascade_predict(model, cascade_model, contents, CASCADE_THRESHOLD, stage_timer, cascade_error)
+    for _, _, tier in results:
+        CLASSIFIER_TIER.labels(tier).inc()
+    return results
+
+# Função para classificar o email; retorna (categoria, nível que respondeu)
+def classify_email_with_tier(content, model=None):
     try:
-        return model.predict([content])[0]
+        if model is None:
+            model = active_model.get()[1]
+        with stage_timer('classification'):
+            if cascade_model is not None:
+                category, _, tier = cascade_classify([content], model)[0]
+                return category, tier
+            prediction = model.predict([content])[0]
+        CLASSIFIER_TIER.labels(MODEL_TIER).inc()
+        return prediction.item() if hasattr(prediction, 'item') else prediction, MODEL_TIER  # Tipos numpy não são serializáveis em JSON
     except Exception as e:
         logger.error(f"Erro ao classificar email: {e}")
-        return "improdutivo"
+        return "improdutivo", None
+
+def classify_email(content, model=None):
+    return classify_email_with_tier(content, model)[0]
+
+# Função para classificar vários emails de uma vez
+def classify_emails_with_tier(contents, model=None):
+    """
+    Classifica uma lista de emails com uma única chamada vetorizada ao modelo.
+    Retorna uma lista de tuplas (categoria, confiança, nível) na mesma ordem da entrada.
+    """
+    if not contents:
+        return []
+    try:
+        if model is None:
+            model = active_model.get()[1]
+        with stage_timer('batch_classification'):
+            if cascade_model is not None:
+                return cascade_classify(contents, model)
+            CLASSIFIER_TIER.labels(MODEL_TIER).inc(len(contents))
+            if hasattr(model, 'predict_proba'):
+                probabilities = model.predict_proba(contents)
+                best = probabilities.argmax(axis=1)
+                categories = model.classes_[best].tolist()
+                confidences = probabilities.max(axis=1).tolist()
+                return [(category, confidence, MODEL_TIER) for category, confidence in zip(categories, confidences)]
+            return [(category, None, MODEL_TIER) for category in model.predict(contents).tolist()]
+    except Exception as e:
+        logger.error(f"Erro ao classificar lote de emails: {e}")
+        return [("improdutivo", None, None)] * len(contents)
+
+def classify_emails(contents, model=None):
+    """
+    Como classify_emails_with_tier, retornando apenas (categoria, confiança).
+    """
+    return [(category, confidence) for category, confidence, _ in classify_emails_with_tier(contents, model)]
+
+# Cliente do LLM (sessão HTTP por worker, timeouts, retries e circuit breaker)
+llm_client = LLMClient.from_env()
+
+# Configuração do LLM usado para gerar respostas
+LLM_MODEL = llm_client.model
+SYSTEM_PROMPT = "Você é um assistente profissional que gera respostas para emails."
+FALLBACK_RESPONSE = "Desculpe, não foi possível gerar uma resposta."
+
+# Cache de respostas (memória + disco compartilhado entre workers)
+response_cache = ResponseCache.from_env()
+
+# Índice de emails quase idênticos já respondidos (por worker)
+near_duplicates = NearDuplicateIndex.from_env()
+
+# Procura um email quase idêntico já respondido; retorna {category, response, model_version, tier} ou None
+def lookup_near_duplicate(content):
+    match = near_duplicates.lookup(content)
+    if near_duplicates.enabled:
+        CACHE_EVENTS.labels("near_duplicate_hit" if match else "near_duplicate_miss").inc()
+    return match
+
+# Guarda a classificação e a resposta para emails quase idênticos (respostas padrão não são guardadas)
+def remember_near_duplicate(content, category, response_content, model_version, tier):
+    if response_content and response_content != FALLBACK_RESPONSE:
+        near_duplicates.add(content, {'category': category, 'response': response_content,
+                                      'model_version': model_version, 'tier': tier})
+
+# Consulta o cache de respostas e registra hit/miss nas métricas
+def lookup_cached_response(cache_key):
+    value, tier = response_cache.lookup(cache_key)
+    if response_cache.enabled:
+        CACHE_EVENTS.labels(f"{tier}_hit" if tier else "miss").inc()
+    return value
+
+# Remove histórico citado, assinaturas e avisos legais e limita os tokens de entrada do LLM
+email_preprocessor = EmailPreprocessor.from_env()
+
+def prepare_llm_input(content):
+    prepared = email_preprocessor.process(content)
+    LLM_INPUT_TOKENS.labels('original').inc(prepared.original_tokens)
+    LLM_INPUT_TOKENS.labels('sent').inc(prepared.tokens)
+    return prepared
+
+# Monta as mensagens enviadas ao LLM
+def build_messages(content):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": content}
+    ]
 
 # Função para gerar resposta automática
 def generate_response(content):
+    cache_key = response_cache.make_key(content, LLM_MODEL, SYSTEM_PROMPT)
+    cached = lookup_cached_response(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        openai.api_key = os.getenv('OPENAI_API_KEY')  # Definir a chave API de forma segura
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Você é um assistente profissional que gera respostas para emails."},
-                {"role": "user", "content": content}
-            ],
-            max_tokens=100
-        )
-        return response['choices'][0]['message']['content']
+        with stage_timer('llm'):
+            reply = llm_client.chat(build_messages(content), max_tokens=100)
+        response_cache.set(cache_key, reply)  # Apenas respostas válidas vão para o cache
+        return reply
+    except CircuitOpenError:
+        logger.warning("LLM indisponível (circuit breaker aberto), usando resposta padrão")
+        FALLBACKS.labels('circuit_open').inc()
+        return FALLBACK_RESPONSE
     except Exception as e:
         logger.error(f"Erro ao gerar resposta: {e}")
-        return "Desculpe, não foi possível gerar uma resposta."
+        FALLBACKS.labels('llm_error').inc()
+        return FALLBACK_RESPONSE
+
+# Função para gerar a resposta em partes, à medida que o LLM produz os tokens.
+# Ao fim, `status["complete"]` indica se a resposta veio inteira (do LLM ou do cache);
+# respostas interrompidas ou padrão não devem ser reaproveitadas
+def stream_response(content, status=None):
+    status = {} if status is None else status
+    status['complete'] = False
+    cache_key = response_cache.make_key(content, LLM_MODEL, SYSTEM_PROMPT)
+    cached = lookup_cached_response(cache_key)
+    if cached is not None:
+        status['complete'] = True
+        yield cached
+        return
+
+    parts = []
+    try:
+        for token in llm_client.stream_chat(build_messages(content), max_tokens=100):
+            parts.append(token)
+            yield token
+        response_cache.set(cache_key, "".join(parts))
+        status['complete'] = True
+    except CircuitOpenError:
+        logger.warning("LLM indisponível (circuit breaker aberto), usando resposta padrão")
+        FALLBACKS.labels('circuit_open').inc()
+        yield FALLBACK_RESPONSE
+    except Exception as e:
+        logger.error(f"Erro ao gerar resposta em streaming: {e}")
+        ERRORS.labels('llm_stream').inc()
+        if not parts:
+            FALLBACKS.labels('llm_error').inc()
+            yield FALLBACK_RESPONSE
+
+# Formata um evento no padrão Server-Sent Events
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# Lê o conteúdo do email (arquivo enviado ou JSON) e as opções da requisição
+def read_email_content():
+    file = request.files.get('file')
+    if file:
+        if file.filename.endswith('.pdf'):
+            return extract_text_from_pdf(file), request.form
+        with stage_timer('decode'):
+            return file.read().decode('utf-8'), request.form
+    with stage_timer('decode'):
+        options = request.json
+    return options.get('email', ''), options
+
+# Pool de jobs para geração de respostas em segundo plano
+job_runner = JobRunner.from_env()
+
+# Controle de admissão: requisições em andamento por worker, fila de prioridade e limite por cliente
+def update_admission_metrics(stats):
+    ADMISSION_IN_FLIGHT.labels('request').set(stats['in_flight'])
+    ADMISSION_IN_FLIGHT.labels('llm').set(stats['llm_in_flight'])
+    for priority, depth in stats['queued'].items():
+        ADMISSION_QUEUE_DEPTH.labels(priority).set(depth)
+
+admission = AdmissionController.from_env()
+admission.on_change = update_admission_metrics
+rate_limiter = RateLimiter.from_env()
+
+# Cliente da requisição para o limite por cliente: o IP da conexão, ou o endereço informado
+# pelo proxy confiável (TRUSTED_PROXY_COUNT). X-Forwarded-For do cliente não é usado diretamente
+def client_key():
+    return request.remote_addr or 'unknown'
+
+# Resposta 429 com Retry-After para requisições recusadas
+def too_many_requests(error):
+    ADMISSION_REJECTIONS.labels(error.reason).inc()
+    response = jsonify({'error': 'Servidor sobrecarregado, tente novamente em instantes',
+                        'retry_after': error.retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+# Aplica o limite por cliente e a fila de admissão à rota; `priority_of` define a prioridade
+# da requisição. Em respostas em streaming, a vaga é liberada ao fim do envio
+def admission_control(priority_of):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                rate_limiter.acquire(client_key())
+                ticket = admission.acquire(priority_of())
+            except AdmissionRejected as e:
+                return too_many_requests(e)
+            try:
+                response = make_response(view(*args, **kwargs))
+            except BaseException:
+                admission.release(ticket)
+                raise
+            if response.is_streamed:
+                response.call_on_close(lambda: admission.release(ticket))
+            else:
+                admission.release(ticket)
+            return response
+        return wrapper
+    return decorator
+
+# Perfil sob demanda das requisições (PROFILE_ENABLED=True): forçado pelo cabeçalho X-Profile
+# com o token de administração, ou por amostragem (PROFILE_SAMPLE_RATE). Perfis forçados ou mais
+# lentos que PROFILE_SLOW_MS são salvos em PROFILE_DIR. Desativado, a rota não é envolvida
+profiler = RequestProfiler.from_env(BASE_DIR)
+
+def profile_forced():
+    return parse_bool(request.headers.get('X-Profile', False)) and is_admin_request()
+
+# Metadados da requisição salvos com o perfil, sem o conteúdo do email nem os valores das opções
+def profile_metadata():
+    file = request.files.get('file')
+    data = request.get_json(silent=True) if not file else None
+    options = data if isinstance(data, dict) else request.form
+    email = options.get('email')
+    return {
+        'request_id': request.headers.get('X-Request-ID'),
+        'method': request.method,
+        'path': request.path,
+        'query': sorted(request.args),
+        'content_type': request.mimetype,
+        'content_length': request.content_length,
+        'file_type': os.path.splitext(file.filename)[1].lower() if file else None,
+        'email_chars': len(email) if isinstance(email, str) else None,
+        'options': sorted(key for key in options if key != 'email'),
+    }
+
+def profiled(view):
+    if not profiler.enabled:
+        return view
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        capture = profiler.start(forced=profile_forced())
+        if capture is None:
+            return view(*args, **kwargs)
+        try:
+            response = make_response(view(*args, **kwargs))
+        finally:
+            profile_id = profiler.finish(capture, current_timings(), profile_metadata())
+        if profile_id is not None:
+            PROFILES.labels(capture.trigger).inc()
+            response.headers['X-Profile-Id'] = profile_id
+        return response
+    return wrapper
+
+# Opções da requisição (formulário ou JSON) sem consumir o corpo
+def request_options():
+    if request.files:
+        return request.form
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+# Classificação sem resposta (modo assíncrono) passa à frente na fila de admissão
+def process_priority():
+    is_async = parse_bool(request.args.get('async', request_options().get('async', False)))
+    return PRIORITY_CLASSIFY if is_async else PRIORITY_REPLY
+
+def batch_priority():
+    with_response = parse_bool(request.args.get('generate_response', request_options().get('generate_response', False)))
+    return PRIORITY_REPLY if with_response else PRIORITY_CLASSIFY
+
+# Gera a resposta respeitando o limite de chamadas simultâneas ao LLM. Com o limite esgotado,
+# devolve apenas uma resposta já em cache, ou None (requisição degradada: só a categoria)
+def generate_response_admitted(content):
+    if not admission.try_acquire_llm():
+        cached = lookup_cached_response(response_cache.make_key(content, LLM_MODEL, SYSTEM_PROMPT))
+        if cached is None:
+            FALLBACKS.labels('llm_saturated').inc()
+        return cached
+    try:
+        return generate_response(content)
+    finally:
+        admission.release_llm()
 
 # Rota para processar emails
 @app.route('/process', methods=['POST'])
+@admission_control(process_priority)
+@profiled
 def process_email():
     try:
         # Verifica se o arquivo foi enviado
-        file = request.files.get('file')
-        if file:
-            content = extract_text_from_pdf(file) if file.filename.endswith('.pdf') else file.read().decode('utf-8')
-        else:
-            content = request.json.get('email', '')
+        content, options = read_email_content()
 
         # Validação do conteúdo
         if not content.strip():
             return jsonify({'error': 'Texto do email é obrigatório'}), 400
 
-        # Classificação e geração de resposta
-        category = classify_email(content)
-        response_content = generate_response(content)
+        is_async = parse_bool(request.args.get('async', options.get('async', False)))
+        callback_url = options.get('callback_url') if is_async else None
+        if callback_url:
+            try:
+                job_runner.validate_callback_url(callback_url)
+            except InvalidCallbackUrl as e:
+                return jsonify({'error': str(e)}), 400
+
+        # Email quase idêntico a um já respondido: reaproveita categoria e resposta
+        if not is_async:
+            match = lookup_near_duplicate(content)
+            if match is not None:
+                return jsonify({**match, 'near_duplicate': True}), 200
+
+        # Classificação e geração de resposta (a requisição usa a mesma versão do início ao fim)
+        model_version, model = active_model.get()
+        category, tier = classify_email_with_tier(content, model)
+
+        prepared = prepare_llm_input(content)
+
+        # Modo assíncrono: devolve a categoria e gera a resposta em segundo plano
+        if is_async:
+            try:
+                job_id = job_runner.submit(
+                    lambda: generate_response(prepared.text),
+                    {'category': category, 'model_version': model_version, 'tier': tier, 'llm_input': prepared.stats()},
+                    callback_url=callback_url,
+                )
+            except JobQueueFull:
+                return too_many_requests(AdmissionRejected('job_queue_full', admission.retry_after()))
+            return jsonify({'category': category, 'model_version': model_version, 'tier': tier,
+                            'llm_input': prepared.stats(), 'job_id': job_id, 'status': 'pending'}), 202
 
-        return jsonify({'category': category, 'response': response_content}), 200
+        response_content = generate_response_admitted(prepared.text)
+        if response_content is None:
+            # LLM saturado: devolve a categoria sem resposta
+            return jsonify({'category': category, 'response': None, 'model_version': model_version,
+                            'tier': tier, 'llm_input': prepared.stats(), 'degraded': True}), 200
+        remember_near_duplicate(content, category, response_content, model_version, tier)
 
+        return jsonify({'category': category, 'response': response_content, 'model_version': model_version,
+                        'tier': tier, 'llm_input': prepared.stats()}), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao processar o email: {e}", exc_info=True)
+        ERRORS.labels('process').inc()
+        return jsonify({'error': 'Erro ao processar o email'}), 500
+
+# Rota para processar emails com a resposta enviada via Server-Sent Events:
+# o primeiro evento traz a categoria e os seguintes, os tokens da resposta
+@app.route('/process/stream', methods=['POST'])
+@admission_control(lambda: PRIORITY_REPLY)
+def process_email_stream():
+    try:
+        content, _ = read_email_content()
+        if not content.strip():
+            return jsonify({'error': 'Texto do email é obrigatório'}), 400
+        match = lookup_near_duplicate(content)
+        if match is None:
+            model_version, model = active_model.get()
+            category, tier = classify_email_with_tier(content, model)
+            prepared = prepare_llm_input(content)
     except Exception as e:
         logger.error(f"Erro ao processar o email: {e}", exc_info=True)
         return jsonify({'error': 'Erro ao processar o email'}), 500
 
+    def events():
+        if match is not None:
+            yield sse_event('category', {'category': match['category'], 'model_version': match['model_version'],
+                                         'tier': match['tier'], 'near_duplicate': True})
+            yield sse_event('token', {'token': match['response']})
+            yield sse_event('done', {})
+            return
+
+        if not admission.try_acquire_llm():
+            # LLM saturado: apenas a categoria (ou a resposta em cache)
+            cached = lookup_cached_response(response_cache.make_key(prepared.text, LLM_MODEL, SYSTEM_PROMPT))
+            if cached is None:
+                FALLBACKS.labels('llm_saturated').inc()
+            yield sse_event('category', {'category': category, 'model_version': model_version, 'tier': tier,
+                                         'llm_input': prepared.stats(), 'degraded': cached is None})
+            if cached is not None:
+                yield sse_event('token', {'token': cached})
+            yield sse_event('done', {})
+            return
+
+        try:
+            yield sse_event('category', {'category': category, 'model_version': model_version, 'tier': tier,
+                                         'llm_input': prepared.stats()})
+            parts, status = [], {}
+            for token in stream_response(prepared.text, status):
+                parts.append(token)
+                yield sse_event('token', {'token': token})
+            yield sse_event('done', {})
+            if status['complete']:
+                remember_near_duplicate(content, category, "".join(parts), model_version, tier)
+        finally:
+            admission.release_llm()
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(events(), mimetype='text/event-stream', headers=headers)
+
+# Rota para consultar o andamento de um job assíncrono
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_runner.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job não encontrado'}), 404
+    return jsonify(job), 200
+
+# Rota com as métricas no formato do Prometheus (agregadas entre os workers do gunicorn)
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    CIRCUIT_OPEN.set(1 if llm_client.breaker.state == llm_client.breaker.OPEN else 0)
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
+# Rota com os contadores do cache de respostas
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({**response_cache.stats(), 'near_duplicates': near_duplicates.stats()}), 200
+
+# Verifica o token de administração (ADMIN_TOKEN); sem token configurado, as rotas ficam desativadas
+def is_admin_request():
+    token = os.getenv('ADMIN_TOKEN')
+    return bool(token) and request.headers.get('X-Admin-Token') == token
+
+# Rota para consultar as versões do modelo
+@app.route('/admin/model', methods=['GET'])
+def model_info():
+    if not is_admin_request():
+        return jsonify({'error': 'Acesso negado'}), 403
+    return jsonify({
+        'active_version': active_model.version,
+        'versions': model_registry.versions(),
+    }), 200
+
+# Rota para recarregar o modelo ativo ou ativar outra versão ({"version": "..."})
+@app.route('/admin/model/reload', methods=['POST'])
+def reload_model():
+    if not is_admin_request():
+        return jsonify({'error': 'Acesso negado'}), 403
+    version = (request.get_json(silent=True) or {}).get('version')
+    try:
+        model_version, _ = active_model.reload(version)
+    except (ValueError, FileNotFoundError) as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Erro ao recarregar modelo: {e}", exc_info=True)
+        return jsonify({'error': 'Erro ao recarregar modelo'}), 500
+    return jsonify({'active_version': model_version}), 200
+
+# Rota para listar os perfis de requisição salvos (mais recentes primeiro)
+@app.route('/admin/profiles', methods=['GET'])
+def list_profiles():
+    if not is_admin_request():
+        return jsonify({'error': 'Acesso negado'}), 403
+    return jsonify({'enabled': profiler.enabled, 'directory': str(profiler.directory),
+                    'profiles': profiler.list_profiles()}), 200
+
+# Limite de emails aceitos por requisição em lote
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 1000))
+
+# Converte valores de query string / JSON em booleano
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'sim', 'on')
+
+# Lê o corpo de /process/batch: array JSON, objeto {"emails": [...]} ou NDJSON
+def parse_batch_payload():
+    options = {}
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            options = data
+            data = data.get('emails')
+        if not isinstance(data, list):
+            raise ValueError("Corpo deve ser um array JSON de emails")
+        items = data
+    else:
+        lines = request.get_data(as_text=True).splitlines()
+        items = [json.loads(line) for line in lines if line.strip()]
+
+    emails = []
+    for item in items:
+        if isinstance(item, dict):
+            emails.append((item.get('id'), str(item.get('email') or '')))
+        else:
+            emails.append((None, str(item or '')))
+    return emails, options
+
+# Rota para processar emails em lote
+@app.route('/process/batch', methods=['POST'])
+@admission_control(batch_priority)
+def process_batch():
+    try:
+        try:
+            emails, options = parse_batch_payload()
+        except ValueError as e:
+            return jsonify({'error': f'Lote inválido: {e}'}), 400
+
+        if not emails:
+            return jsonify({'error': 'Lote de emails é obrigatório'}), 400
+        if len(emails) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Lote excede o limite de {MAX_BATCH_SIZE} emails'}), 413
+
+        with_response = parse_bool(request.args.get('generate_response', options.get('generate_response', False)))
+
+        # Uma única predição vetorizada para todos os emails válidos
+        model_version, model = active_model.get()
+        valid = [i for i, (_, content) in enumerate(emails) if content.strip()]
+        predictions = dict(zip(valid, classify_emails_with_tier([emails[i][1] for i in valid], model)))
+
+        results = []
+        for index, (email_id, content) in enumerate(emails):
+            item = {'index': index}
+            if email_id is not None:
+                item['id'] = email_id
+            if index not in predictions:
+                item['error'] = 'Texto do email é obrigatório'
+            else:
+                item['category'], item['confidence'], item['tier'] = predictions[index]
+                if with_response:
+                    prepared = prepare_llm_input(content)
+                    item['response'] = generate_response_admitted(prepared.text)
+                    item['llm_input'] = prepared.stats()
+                    if item['response'] is None:
+                        item['degraded'] = True
+            results.append(item)
+
+        return jsonify({'count': len(results), 'model_version': model_version, 'results': results}), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao processar lote de emails: {e}", exc_info=True)
+        return jsonify({'error': 'Erro ao processar lote de emails'}), 500
+
+# Carrega o modelo e as dependências pesadas; retorna o tempo de cada etapa em ms
+def warmup():
+    timings = {}
+
+    def step(name, func):
+        start = perf_counter()
+        func()
+        timings[name] = round((perf_counter() - start) * 1000, 3)
+
+    step('model', lambda: active_model.get()[1].predict(['aquecimento']))
+    if cascade_model is not None:
+        step('cascade_model', lambda: cascade_model.predict(['aquecimento']))
+    step('pdf', lambda: __import__('pdfplumber'))
+    step('llm_client', lambda: llm_client.session)
+    return timings
+
+# Rota de warm-up: pode ser chamada após o deploy ou periodicamente para evitar cold starts
+@app.route('/warmup', methods=['GET', 'POST'])
+def warmup_route():
+    try:
+        timings = warmup()
+    except Exception as e:
+        logger.error(f"Erro no warm-up: {e}", exc_info=True)
+        return jsonify({'error': 'Erro ao carregar o modelo'}), 500
+    return jsonify({'status': 'ok', 'model_version': active_model.version, 'timings_ms': timings}), 200
+
+if MODEL_PRELOAD:
+    logger.info(f"Warm-up concluído: {warmup()}")
+
 # Inicialização do servidor (para rodar no Render)
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))  # Render define a porta automaticamente
@@ -0,0 +1,386 @@
+"""
+Modo de serviço assíncrono (ASGI) da API, com o mesmo contrato de /process da versão Flask.
+
+Cada requisição passa a maior parte do tempo esperando o LLM. Aqui essa espera não
+ocupa um worker: o LLM é chamado com um cliente não bloqueante (AsyncLLMClient) e
+apenas o trabalho de CPU (extração de PDF, classificação, pré-processamento e cache
+em disco) vai para um pool de threads. Assim um único processo, com uma única cópia
+do modelo, mantém centenas de requisições em andamento.
+
+    uvicorn asgi:app --app-dir src --host 0.0.0.0 --port 8000
+
+Modelo, caches, pré-processamento, jobs e métricas são os mesmos de src/app.py.
+"""
+import os
+import asyncio
+import logging
+import contextvars
+from functools import wraps
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Match, Route
+
+import app as core
+from admission import AdmissionRejected, PRIORITY_CLASSIFY, PRIORITY_REPLY
+from jobs import JobQueueFull, InvalidCallbackUrl
+from llm_client import AsyncLLMClient, CircuitOpenError
+from metrics import ADMISSION_REJECTIONS, CIRCUIT_OPEN, ERRORS, FALLBACKS, finish_request, render_metrics, stage_timer, start_request
+
+logger = logging.getLogger(__name__)
+
+# Threads para o trabalho de CPU; a espera pelo LLM não ocupa nenhuma delas
+cpu_executor = ThreadPoolExecutor(max_workers=int(os.getenv('ASGI_CPU_WORKERS', os.cpu_count() or 4)),
+                                  thread_name_prefix='asgi-cpu')
+
+# Cliente não bloqueante; o limite de conexões acompanha o número de requisições simultâneas
+llm_client = AsyncLLMClient.from_env()
+llm_client.pool_size = int(os.getenv('ASGI_LLM_POOL_SIZE', 200))
+
+
+# Controle de admissão: o mesmo de app.py (limite por cliente, fila de prioridade e limite de
+# chamadas ao LLM), com padrões que acompanham o pool de conexões em vez dos workers síncronos
+core.admission.max_in_flight = int(os.getenv('ADMISSION_MAX_IN_FLIGHT', llm_client.pool_size))
+core.admission.max_llm_in_flight = int(os.getenv('ADMISSION_MAX_LLM_IN_FLIGHT', llm_client.pool_size))
+
+# A espera na fila de admissão bloqueia uma thread: usa threads próprias (uma por posição da
+# fila, mais algumas para as admissões imediatas), sem ocupar o pool de CPU
+admission_executor = ThreadPoolExecutor(max_workers=core.admission.max_queue + 4, thread_name_prefix='asgi-admission')
+
+
+# Executa uma função bloqueante no pool de CPU, preservando o contexto (tempos por etapa)
+async def run_blocking(func, *args):
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(cpu_executor, context.run, func, *args)
+
+
+# Reserva uma vaga na fila de admissão sem bloquear o event loop
+async def acquire_admission(priority):
+    future = asyncio.get_running_loop().run_in_executor(admission_executor, core.admission.acquire, priority)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # Cliente desconectado durante a espera: a vaga, se concedida, é devolvida
+        future.add_done_callback(
+            lambda f: core.admission.release(f.result()) if not f.cancelled() and f.exception() is None else None)
+        raise
+
+
+# Cliente da requisição para o limite por cliente. Atrás de proxy, o uvicorn substitui o endereço
+# da conexão pelo do X-Forwarded-For apenas para os proxies de --forwarded-allow-ips
+def client_key(request):
+    return request.client.host if request.client else 'unknown'
+
+
+# Resposta 429 com Retry-After para requisições recusadas
+def too_many_requests(error):
+    ADMISSION_REJECTIONS.labels(error.reason).inc()
+    return JSONResponse({'error': 'Servidor sobrecarregado, tente novamente em instantes',
+                         'retry_after': error.retry_after}, 429, headers={'Retry-After': str(error.retry_after)})
+
+
+# Versão assíncrona de app.admission_control: em respostas em streaming, a vaga é liberada ao fim do envio
+def admission_control(priority_of):
+    def decorator(endpoint):
+        @wraps(endpoint)
+        async def wrapper(request):
+            try:
+                core.rate_limiter.acquire(client_key(request))
+                ticket = await acquire_admission(await priority_of(request))
+            except AdmissionRejected as e:
+                return too_many_requests(e)
+            try:
+                response = await endpoint(request)
+            except BaseException:
+                core.admission.release(ticket)
+                raise
+            if isinstance(response, StreamingResponse):
+                response.background = BackgroundTask(core.admission.release, ticket)
+            else:
+                core.admission.release(ticket)
+            return response
+        return wrapper
+    return decorator
+
+
+# Opções da requisição (formulário ou JSON); o Starlette guarda o corpo já lido para a rota
+async def request_options(request):
+    try:
+        if request.headers.get('content-type', '').startswith('multipart/form-data'):
+            return await request.form()
+        data = await request.json()
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+# Classificação sem resposta (modo assíncrono) passa à frente na fila de admissão
+async def process_priority(request):
+    options = await request_options(request)
+    is_async = core.parse_bool(request.query_params.get('async', options.get('async', False)))
+    return PRIORITY_CLASSIFY if is_async else PRIORITY_REPLY
+
+
+async def reply_priority(request):
+    return PRIORITY_REPLY
+
+
+# Versão assíncrona de app.generate_response: mesmo cache e mesmas respostas padrão
+async def generate_response(content):
+    cache_key = core.response_cache.make_key(content, core.LLM_MODEL, core.SYSTEM_PROMPT)
+    cached = await run_blocking(core.lookup_cached_response, cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        with stage_timer('llm'):
+            reply = await llm_client.chat(core.build_messages(content), max_tokens=100)
+        await run_blocking(core.response_cache.set, cache_key, reply)
+        return reply
+    except CircuitOpenError:
+        logger.warning("LLM indisponível (circuit breaker aberto), usando resposta padrão")
+        FALLBACKS.labels('circuit_open').inc()
+        return core.FALLBACK_RESPONSE
+    except Exception as e:
+        logger.error(f"Erro ao gerar resposta: {e}")
+        FALLBACKS.labels('llm_error').inc()
+        return core.FALLBACK_RESPONSE
+
+
+# Versão assíncrona de app.generate_response_admitted: com as chamadas ao LLM saturadas,
+# devolve apenas uma resposta já em cache, ou None (requisição degradada: só a categoria)
+async def generate_response_admitted(content):
+    if not core.admission.try_acquire_llm():
+        cache_key = core.response_cache.make_key(content, core.LLM_MODEL, core.SYSTEM_PROMPT)
+        cached = await run_blocking(core.lookup_cached_response, cache_key)
+        if cached is None:
+            FALLBACKS.labels('llm_saturated').inc()
+        return cached
+    try:
+        return await generate_response(content)
+    finally:
+        core.admission.release_llm()
+
+
+# Versão assíncrona de app.stream_response (com o mesmo `status["complete"]`)
+async def stream_response(content, status=None):
+    status = {} if status is None else status
+    status['complete'] = False
+    cache_key = core.response_cache.make_key(content, core.LLM_MODEL, core.SYSTEM_PROMPT)
+    cached = await run_blocking(core.lookup_cached_response, cache_key)
+    if cached is not None:
+        status['complete'] = True
+        yield cached
+        return
+
+    parts = []
+    try:
+        async for token in llm_client.stream_chat(core.build_messages(content), max_tokens=100):
+            parts.append(token)
+            yield token
+        await run_blocking(core.response_cache.set, cache_key, "".join(parts))
+        status['complete'] = True
+    except CircuitOpenError:
+        logger.warning("LLM indisponível (circuit breaker aberto), usando resposta padrão")
+        FALLBACKS.labels('circuit_open').inc()
+        yield core.FALLBACK_RESPONSE
+    except Exception as e:
+        logger.error(f"Erro ao gerar resposta em streaming: {e}")
+        ERRORS.labels('llm_stream').inc()
+        if not parts:
+            FALLBACKS.labels('llm_error').inc()
+            yield core.FALLBACK_RESPONSE
+
+
+# Lê o conteúdo do email (arquivo enviado ou JSON) e as opções da requisição
+async def read_email_content(request):
+    if request.headers.get('content-type', '').startswith('multipart/form-data'):
+        form = await request.form()
+        file = form.get('file')
+        if file is not None and hasattr(file, 'filename'):
+            if file.filename.endswith('.pdf'):
+                return await run_blocking(core.extract_text_from_pdf, file.file), form
+            data = await file.read()
+            with stage_timer('decode'):
+                return data.decode('utf-8'), form
+    with stage_timer('decode'):
+        options = await request.json()
+    return options.get('email', ''), options
+
+
+# Classificação e pré-processamento de um email (executado no pool de CPU)
+def classify_and_prepare(content):
+    model_version, model = core.active_model.get()
+    category, tier = core.classify_email_with_tier(content, model)
+    return model_version, category, tier, core.prepare_llm_input(content)
+
+
+@admission_control(process_priority)
+async def process_email(request):
+    try:
+        content, options = await read_email_content(request)
+
+        if not content.strip():
+            return JSONResponse({'error': 'Texto do email é obrigatório'}, 400)
+
+        is_async = core.parse_bool(request.query_params.get('async', options.get('async', False)))
+        callback_url = options.get('callback_url') if is_async else None
+        if callback_url:
+            try:
+                core.job_runner.validate_callback_url(callback_url)
+            except InvalidCallbackUrl as e:
+                return JSONResponse({'error': str(e)}, 400)
+
+        if not is_async:
+            match = await run_blocking(core.lookup_near_duplicate, content)
+            if match is not None:
+                return JSONResponse({**match, 'near_duplicate': True}, 200)
+
+        model_version, category, tier, prepared = await run_blocking(classify_and_prepare, content)
+
+        # Modo assíncrono: os jobs rodam no JobRunner, como na versão Flask
+        if is_async:
+            try:
+                job_id = core.job_runner.submit(
+                    lambda: core.generate_response(prepared.text),
+                    {'category': category, 'model_version': model_version, 'tier': tier, 'llm_input': prepared.stats()},
+                    callback_url=callback_url,
+                )
+            except JobQueueFull:
+                return too_many_requests(AdmissionRejected('job_queue_full', core.admission.retry_after()))
+            return JSONResponse({'category': category, 'model_version': model_version, 'tier': tier,
+                                 'llm_input': prepared.stats(), 'job_id': job_id, 'status': 'pending'}, 202)
+
+        response_content = await generate_response_admitted(prepared.text)
+        if response_content is None:
+            # LLM saturado: devolve a categoria sem resposta
+            return JSONResponse({'category': category, 'response': None, 'model_version': model_version,
+                                 'tier': tier, 'llm_input': prepared.stats(), 'degraded': True}, 200)
+        core.remember_near_duplicate(content, category, response_content, model_version, tier)
+
+        return JSONResponse({'category': category, 'response': response_content, 'model_version': model_version,
+                             'tier': tier, 'llm_input': prepared.stats()}, 200)
+
+    except Exception as e:
+        logger.error(f"Erro ao processar o email: {e}", exc_info=True)
+        ERRORS.labels('process').inc()
+        return JSONResponse({'error': 'Erro ao processar o email'}, 500)
+
+
+@admission_control(reply_priority)
+async def process_email_stream(request):
+    try:
+        content, _ = await read_email_content(request)
+        if not content.strip():
+            return JSONResponse({'error': 'Texto do email é obrigatório'}, 400)
+        match = await run_blocking(core.lookup_near_duplicate, content)
+        if match is None:
+            model_version, category, tier, prepared = await run_blocking(classify_and_prepare, content)
+    except Exception as e:
+        logger.error(f"Erro ao processar o email: {e}", exc_info=True)
+        return JSONResponse({'error': 'Erro ao processar o email'}, 500)
+
+    async def events():
+        if match is not None:
+            yield core.sse_event('category', {'category': match['category'], 'model_version': match['model_version'],
+                                              'tier': match['tier'], 'near_duplicate': True})
+            yield core.sse_event('token', {'token': match['response']})
+            yield core.sse_event('done', {})
+            return
+
+        if not core.admission.try_acquire_llm():
+            # LLM saturado: apenas a categoria (ou a resposta em cache)
+            cache_key = core.response_cache.make_key(prepared.text, core.LLM_MODEL, core.SYSTEM_PROMPT)
+            cached = await run_blocking(core.lookup_cached_response, cache_key)
+            if cached is None:
+                FALLBACKS.labels('llm_saturated').inc()
+            yield core.sse_event('category', {'category': category, 'model_version': model_version, 'tier': tier,
+                                              'llm_input': prepared.stats(), 'degraded': cached is None})
+            if cached is not None:
+                yield core.sse_event('token', {'token': cached})
+            yield core.sse_event('done', {})
+            return
+
+        try:
+            yield core.sse_event('category', {'category': category, 'model_version': model_version, 'tier': tier,
+                                              'llm_input': prepared.stats()})
+            parts, status = [], {}
+            async for token in stream_response(prepared.text, status):
+                parts.append(token)
+                yield core.sse_event('token', {'token': token})
+            yield core.sse_event('done', {})
+            if status['complete']:
+                core.remember_near_duplicate(content, category, "".join(parts), model_version, tier)
+        finally:
+            core.admission.release_llm()
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return StreamingResponse(events(), media_type='text/event-stream', headers=headers)
+
+
+async def get_job(request):
+    job = await run_blocking(core.job_runner.get, request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({'error': 'Job não encontrado'}, 404)
+    return JSONResponse(job, 200)
+
+
+async def metrics(request):
+    CIRCUIT_OPEN.set(1 if llm_client.breaker.state == llm_client.breaker.OPEN else 0)
+    body, content_type = render_metrics()
+    return Response(body, headers={'Content-Type': content_type})
+
+
+async def cache_stats(request):
+    return JSONResponse({**core.response_cache.stats(), 'near_duplicates': core.near_duplicates.stats()}, 200)
+
+
+async def warmup_route(request):
+    try:
+        timings = await run_blocking(core.warmup)
+    except Exception as e:
+        logger.error(f"Erro no warm-up: {e}", exc_info=True)
+        return JSONResponse({'error': 'Erro ao carregar o modelo'}, 500)
+    return JSONResponse({'status': 'ok', 'model_version': core.active_model.version, 'timings_ms': timings}, 200)
+
+
+# Coleta de latência por requisição, com o mesmo rótulo de endpoint da versão Flask
+class RequestMetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        started = start_request()
+        response = await call_next(request)
+        route = next((r for r in request.app.routes if r.matches(request.scope)[0] == Match.FULL), None)
+        endpoint = route.path.replace('{', '<').replace('}', '>') if route else 'unmatched'
+        finish_request(endpoint, response.status_code, started, request.headers.get('X-Request-ID'))
+        return response
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Com MODEL_PRELOAD=True o warm-up já acontece na importação de app.py
+    yield
+    await llm_client.aclose()
+
+
+app = Starlette(
+    routes=[
+        Route('/process', process_email, methods=['POST']),
+        Route('/process/stream', process_email_stream, methods=['POST']),
+        Route('/jobs/{job_id}', get_job, methods=['GET']),
+        Route('/metrics', metrics, methods=['GET']),
+        Route('/cache/stats', cache_stats, methods=['GET']),
+        Route('/warmup', warmup_route, methods=['GET', 'POST']),
+    ],
+    middleware=[Middleware(RequestMetricsMiddleware)],
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host='0.0.0.0', port=int(os.getenv('PORT', 8000)))
@@ -0,0 +1,347 @@
+"""
+Classificação em massa de emails exportados, sem passar pela API HTTP.
+
+Entradas aceitas: arquivos mbox, diretórios com .eml/.txt/.pdf e CSVs.
+Os documentos são lidos sob demanda, agrupados em lotes para predição
+vetorizada e distribuídos em um pool de processos. Os resultados são gravados
+incrementalmente em CSV ou Parquet e a execução pode ser retomada com --resume.
+
+    python src/bulk_classify.py caixa.mbox -o resultados.csv
+    python src/bulk_classify.py emails.csv --text-column text -o resultados.parquet --workers 8
+"""
+import os
+import csv
+import shutil
+import json
+import email
+import logging
+import argparse
+import mailbox
+import multiprocessing
+from email import policy
+from itertools import islice
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from config import MODEL_PATH
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+OUTPUT_COLUMNS = ["id", "category", "confidence", "model_version", "error"]
+TEXT_SUFFIXES = {".eml", ".txt", ".pdf"}
+
+# Módulo da API carregado uma vez por processo (modelo e funções de extração)
+_app = None
+
+# Com --model, o arquivo usado no lugar da versão ativa do registro (carregado uma vez por processo)
+_model_path = None
+_fixed_model = None
+
+
+def get_app():
+    global _app
+    if _app is None:
+        # Sem MODEL_PATH no ambiente, o app usaria 'model.pkl' relativo à pasta atual
+        os.environ.setdefault("MODEL_PATH", str(MODEL_PATH))
+        import app as _loaded
+        _app = _loaded
+    return _app
+
+
+def set_model_path(path):
+    # Também é o initializer do pool: com fork, o modelo já carregado é herdado e mantido
+    global _model_path, _fixed_model
+    if path != _model_path:
+        _model_path, _fixed_model = path, None
+
+
+def get_model():
+    """
+    Retorna (versão, modelo): o arquivo de --model ou a versão ativa do registro
+    (sem versão ativa, o arquivo de MODEL_PATH).
+    """
+    global _fixed_model
+    if _model_path is None:
+        return get_app().active_model.get()
+    if _fixed_model is None:
+        import joblib
+        from model_registry import FixedModel
+
+        _fixed_model = FixedModel(f"file:{Path(_model_path).name}", joblib.load(_model_path, mmap_mode="r"))
+    return _fixed_model.get()
+
+
+# Leitura das entradas: cada item é (id, tipo, conteúdo), convertido em texto nos workers
+
+def iter_mbox(path):
+    box = mailbox.mbox(path, create=False)
+    for index, key in enumerate(box.iterkeys()):
+        yield str(index), "eml_bytes", box.get_bytes(key)
+
+
+def iter_directory(path):
+    root = Path(path)
+    # Ordem determinística, necessária para retomar a execução
+    for file in sorted(p for p in root.rglob("*") if p.is_file() and p.suffix.lower() in TEXT_SUFFIXES):
+        yield str(file.relative_to(root)), file.suffix.lower().lstrip(".") + "_path", str(file)
+
+
+def iter_csv(path, text_column, id_column=None, chunksize=10000):
+    columns = [text_column] + ([id_column] if id_column else [])
+    offset = 0
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize, dtype=str, keep_default_na=False):
+        ids = chunk[id_column] if id_column else range(offset, offset + len(chunk))
+        for doc_id, text in zip(ids, chunk[text_column]):
+            yield str(doc_id), "text", text
+        offset += len(chunk)
+
+
+def iter_documents(path, input_format, text_column, id_column):
+    if input_format == "auto":
+        if os.path.isdir(path):
+            input_format = "dir"
+        elif path.lower().endswith(".csv"):
+            input_format = "csv"
+        else:
+            input_format = "mbox"
+    if input_format == "dir":
+        return iter_directory(path)
+    if input_format == "csv":
+        return iter_csv(path, text_column, id_column)
+    return iter_mbox(path)
+
+
+def message_text(message):
+    """
+    Extrai assunto e corpo (partes text/plain) de uma mensagem de email.
+    """
+    parts = [message.get("subject", "")]
+    for part in message.walk():
+        if part.get_content_type() == "text/plain" and not part.is_attachment():
+            try:
+                parts.append(part.get_content())
+            except (LookupError, UnicodeDecodeError):
+                parts.append(part.get_payload(decode=True).decode("utf-8", errors="replace"))
+    return "\n".join(p for p in parts if p)
+
+
+def to_text(kind, payload):
+    if kind == "text":
+        return payload
+    if kind == "eml_bytes":
+        return message_text(email.message_from_bytes(payload, policy=policy.default))
+    if kind == "eml_path":
+        with open(payload, "rb") as f:
+            return message_text(email.message_from_binary_file(f, policy=policy.default))
+    if kind == "pdf_path":
+        with open(payload, "rb") as f:
+            return get_app().extract_text_from_pdf(f)
+    with open(payload, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def classify_batch(items):
+    """
+    Converte um lote em texto e classifica com uma única predição vetorizada.
+    Executada nos workers do pool.
+    """
+    app = get_app()
+    rows, texts, positions = [], [], []
+    for doc_id, kind, payload in items:
+        try:
+            text = to_text(kind, payload)
+        except Exception as e:
+            rows.append({"id": doc_id, "error": f"Erro ao ler documento: {e}"})
+            continue
+        if not text.strip():
+            rows.append({"id": doc_id, "error": "Texto do email é obrigatório"})
+            continue
+        positions.append(len(rows))
+        rows.append({"id": doc_id})
+        texts.append(text)
+
+    model_version, model = get_model()
+    for position, (category, confidence) in zip(positions, app.classify_emails(texts, model)):
+        rows[position].update(category=category, confidence=confidence, model_version=model_version)
+    return rows
+
+
+def ordered_map(executor, func, items, max_pending):
+    """
+    Como executor.map, mas mantém no máximo `max_pending` lotes em andamento,
+    para que a entrada continue sendo lida sob demanda.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_batches(items, size):
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class CsvOutput:
+    """
+    Grava os resultados em CSV; o tamanho do arquivo no checkpoint permite
+    descartar linhas escritas após o último checkpoint.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def open(self, resume_position=None):
+        if resume_position is not None and self.path.exists():
+            with open(self.path, "r+b") as f:
+                f.truncate(resume_position)
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_COLUMNS)
+        if self._file.tell() == 0:
+            self._writer.writeheader()
+
+    def write(self, rows, start):
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetOutput:
+    """
+    Grava os resultados em um diretório Parquet, com um arquivo por lote
+    nomeado pela posição inicial do lote na entrada.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def open(self, resume_position=None):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("Saída Parquet requer o pacote pyarrow (pip install pyarrow)")
+        self.path.mkdir(parents=True, exist_ok=True)
+        if resume_position is not None:
+            for part in self.path.glob("part-*.parquet"):
+                if int(part.stem.split("-")[1]) >= resume_position:
+                    part.unlink()
+
+    def write(self, rows, start):
+        frame = pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+        frame.to_parquet(self.path / f"part-{start:012d}.parquet", index=False)
+        return start + len(rows)
+
+    def close(self):
+        pass
+
+
+class Checkpoint:
+    """
+    Guarda quantos documentos já foram gravados e a posição correspondente na saída.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def load(self):
+        if not self.path.exists():
+            return None
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, data):
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+
+def run(args):
+    output_format = args.output_format
+    if output_format == "auto":
+        output_format = "parquet" if args.output.endswith(".parquet") else "csv"
+    output = ParquetOutput(args.output) if output_format == "parquet" else CsvOutput(args.output)
+    checkpoint = Checkpoint(f"{args.output}.checkpoint.json")
+
+    state = checkpoint.load() if args.resume else None
+    if state is None and os.path.exists(args.output) and not args.overwrite:
+        raise SystemExit(f"Saída já existe: {args.output} (use --resume ou --overwrite)")
+    if state is None and os.path.isdir(args.output):
+        shutil.rmtree(args.output)
+    elif state is None and os.path.isfile(args.output):
+        os.remove(args.output)
+
+    processed = state["processed"] if state else 0
+    output.open(resume_position=state["position"] if state else None)
+    if processed:
+        logger.info(f"Retomando após {processed} documento(s)")
+
+    documents = islice(iter_documents(args.input, args.input_format, args.text_column, args.id_column), processed, None)
+    batches = iter_batches(documents, args.batch_size)
+
+    # Carrega o modelo antes de criar o pool: com fork, os workers compartilham a memória
+    set_model_path(args.model)
+    get_model()
+
+    pool = None
+    if args.workers > 1:
+        context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+        pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=context,
+                                   initializer=set_model_path, initargs=(args.model,))
+        results = ordered_map(pool, classify_batch, batches, max_pending=args.workers * 2)
+    else:
+        results = map(classify_batch, batches)
+
+    completed = False
+    try:
+        for rows in results:
+            position = output.write(rows, processed)
+            processed += len(rows)
+            checkpoint.save({"input": args.input, "processed": processed, "position": position})
+            logger.info(f"{processed} documento(s) classificados")
+        completed = True
+    finally:
+        output.close()
+        if pool is not None:
+            # Ao concluir, espera os workers encerrarem (sem esperar, a saída do interpretador pode
+            # falhar com "Bad file descriptor"); em caso de erro, descarta os lotes pendentes
+            pool.shutdown(wait=completed, cancel_futures=not completed)
+
+    logger.info(f"Resultados salvos em: {args.output}")
+    return processed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Classificação em massa de emails exportados")
+    parser.add_argument("input", help="Arquivo mbox, diretório (.eml/.txt/.pdf) ou CSV")
+    parser.add_argument("-o", "--output", required=True, help="Arquivo CSV ou diretório .parquet de saída")
+    parser.add_argument("--input-format", choices=["auto", "mbox", "dir", "csv"], default="auto")
+    parser.add_argument("--output-format", choices=["auto", "csv", "parquet"], default="auto")
+    parser.add_argument("--text-column", default="text", help="Coluna de texto do CSV")
+    parser.add_argument("--id-column", default=None, help="Coluna de identificação do CSV")
+    parser.add_argument("--model", default=None,
+                        help="Modelo (.joblib) usado no lugar da versão ativa do registro "
+                             "(padrão: versão ativa ou, sem ela, MODEL_PATH)")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--resume", action="store_true", help="Retoma a partir do último checkpoint")
+    parser.add_argument("--overwrite", action="store_true", help="Sobrescreve a saída existente")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,39 @@
+"""
+Regra da cascata de classificadores, compartilhada pela API (CLASSIFIER_BACKEND=cascade)
+e por benchmarks/bench_models.py.
+"""
+from contextlib import nullcontext
+
+
+def cascade_predict(fast, heavy, contents, threshold, timer=None, on_error=None):
+    """
+    O modelo rápido classifica todos os emails e apenas os de confiança abaixo de `threshold`
+    são reclassificados por `heavy`, em uma única chamada. Retorna uma lista de tuplas
+    (categoria, confiança, nível), com nível "fast" ou "transformer".
+
+    `timer(etapa)` mede cada nível (etapas cascade_fast e cascade_transformer). Se `heavy`
+    falhar e `on_error` for informado, ele recebe a exceção e valem as respostas do modelo rápido.
+    """
+    timer = timer or (lambda stage: nullcontext())
+    with timer('cascade_fast'):
+        probabilities = fast.predict_proba(contents)
+    categories = fast.classes_[probabilities.argmax(axis=1)].tolist()
+    confidences = probabilities.max(axis=1).tolist()
+    tiers = ['fast'] * len(contents)
+
+    uncertain = [i for i, confidence in enumerate(confidences) if confidence < threshold]
+    if uncertain:
+        try:
+            with timer('cascade_transformer'):
+                rows = heavy.predict_proba([contents[i] for i in uncertain])
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(e)
+        else:
+            for i, row in zip(uncertain, rows):
+                categories[i] = heavy.classes_[row.argmax()].item()
+                confidences[i] = float(row.max())
+                tiers[i] = 'transformer'
+
+    return list(zip(categories, confidences, tiers))
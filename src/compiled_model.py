@@ -0,0 +1,213 @@
+import re
+import zlib
+import unicodedata
+
+import numpy as np
+
+
+class CompiledModel:
+    """
+    Forma compacta do pipeline TF-IDF + MultinomialNB, baseada apenas em arrays numpy
+    (sem scikit-learn na inferência).
+
+    - Vocabulário: tabela de hashes (crc32 ordenados + coluna de cada termo). Cada candidato
+      encontrado é conferido com os bytes do termo, guardados em um único bloco, então não
+      há falsos positivos e as predições são as mesmas do pipeline original.
+    - IDF e log-probabilidades do NB em float32 (`feature_log_prob` em linhas por termo).
+    - Um único tokenizador pré-compilado, com as mesmas regras do TfidfVectorizer
+      (minúsculas, acentos, stop words e n-gramas).
+    - A pontuação de um lote é um único produto esparso: pesos TF-IDF x log-probabilidades.
+
+    Salvo com joblib sem compressão, os arrays são carregados com memory-mapping e
+    compartilhados entre os workers, como os demais artefatos do registro.
+    Expõe `predict`, `predict_proba` e `classes_`, como os modelos do scikit-learn.
+    """
+
+    def __init__(self, token_pattern, lowercase, strip_accents, stop_words, ngram_range, binary, sublinear_tf,
+                 norm, term_hashes, term_columns, term_offsets, term_blob, idf, feature_log_prob,
+                 class_log_prior, classes):
+        self.token_pattern = re.compile(token_pattern)
+        self.lowercase = lowercase
+        self.strip_accents = strip_accents
+        self.stop_words = frozenset(stop_words or ())
+        self.ngram_range = tuple(ngram_range)
+        self.binary = binary
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self.term_hashes = term_hashes
+        self.term_columns = term_columns
+        self.term_offsets = term_offsets
+        self.term_blob = term_blob
+        self.idf = idf
+        self.feature_log_prob = feature_log_prob
+        self.class_log_prior = class_log_prior
+        self.classes_ = classes
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """
+        Compila um Pipeline ajustado (TfidfVectorizer + MultinomialNB).
+        Lança ValueError para configurações que não podem ser reproduzidas exatamente.
+        """
+        steps = [step for _, step in pipeline.steps]
+        if len(steps) != 2:
+            raise ValueError("Pipeline deve ter exatamente um vetorizador e um classificador")
+        vectorizer, clf = steps
+        if type(vectorizer).__name__ != "TfidfVectorizer" or not hasattr(vectorizer, "vocabulary_"):
+            raise ValueError(f"Vetorizador não suportado: {type(vectorizer).__name__} (use TfidfVectorizer)")
+        if not hasattr(clf, "feature_log_prob_") or type(clf).__name__ != "MultinomialNB":
+            raise ValueError(f"Classificador não suportado: {type(clf).__name__} (use MultinomialNB)")
+        if vectorizer.analyzer != "word" or vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+            raise ValueError("Apenas o analisador padrão de palavras pode ser compilado")
+        if vectorizer.input != "content" or callable(vectorizer.strip_accents):
+            raise ValueError("Configuração do vetorizador não suportada")
+
+        # Termos na ordem das colunas e seus bytes em um único bloco
+        terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        encoded = [term.encode("utf-8") for term in terms]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(term) for term in encoded])
+
+        hashes = np.array([zlib.crc32(term) for term in encoded], dtype=np.uint32)
+        order = np.argsort(hashes, kind="stable")
+
+        return cls(
+            token_pattern=vectorizer.token_pattern,
+            lowercase=vectorizer.lowercase,
+            strip_accents=vectorizer.strip_accents,
+            stop_words=sorted(vectorizer.get_stop_words() or ()),
+            ngram_range=vectorizer.ngram_range,
+            binary=vectorizer.binary,
+            sublinear_tf=vectorizer.sublinear_tf,
+            norm=vectorizer.norm,
+            term_hashes=hashes[order],
+            term_columns=order.astype(np.int32),
+            term_offsets=offsets,
+            term_blob=b"".join(encoded),
+            idf=np.asarray(vectorizer.idf_ if vectorizer.use_idf else np.ones(len(terms)), dtype=np.float32),
+            feature_log_prob=np.ascontiguousarray(clf.feature_log_prob_.T, dtype=np.float32),
+            class_log_prior=np.asarray(clf.class_log_prior_, dtype=np.float32),
+            classes=np.asarray(clf.classes_),
+        )
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["token_pattern"] = self.token_pattern.pattern
+        return state
+
+    def __setstate__(self, state):
+        state["token_pattern"] = re.compile(state["token_pattern"])
+        self.__dict__.update(state)
+
+    @property
+    def n_features(self):
+        return len(self.idf)
+
+    def _preprocess(self, text):
+        if self.lowercase:
+            text = text.lower()
+        if self.strip_accents == "unicode":
+            normalized = unicodedata.normalize("NFKD", text)
+            if normalized != text:
+                text = "".join(c for c in normalized if not unicodedata.combining(c))
+        elif self.strip_accents == "ascii":
+            text = unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode("ASCII")
+        return text
+
+    def analyze(self, text):
+        """
+        Tokens e n-gramas do texto, na mesma ordem do TfidfVectorizer.
+        """
+        tokens = self.token_pattern.findall(self._preprocess(text))
+        if self.stop_words:
+            tokens = [token for token in tokens if token not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        original, tokens = tokens, (list(tokens) if min_n == 1 else [])
+        for n in range(max(min_n, 2), min(max_n, len(original)) + 1):
+            tokens.extend(" ".join(original[i:i + n]) for i in range(len(original) - n + 1))
+        return tokens
+
+    def _columns(self, tokens):
+        """
+        Para cada token, a coluna do vocabulário ou -1 se o token não estiver no vocabulário.
+        """
+        columns = np.full(len(tokens), -1, dtype=np.int64)
+        if not tokens or not len(self.term_hashes):
+            return columns
+        encoded = [token.encode("utf-8") for token in tokens]
+        keys = np.fromiter((zlib.crc32(token) for token in encoded), dtype=np.uint32, count=len(encoded))
+        positions = np.minimum(np.searchsorted(self.term_hashes, keys), len(self.term_hashes) - 1)
+        hits = np.flatnonzero(self.term_hashes[positions] == keys)
+        if not len(hits):
+            return columns
+
+        candidates = self.term_columns[positions[hits]]
+        starts, ends = self.term_offsets[candidates], self.term_offsets[candidates + 1]
+        blob = self.term_blob
+        for i, position, column, start, end in zip(hits.tolist(), positions[hits].tolist(), candidates.tolist(),
+                                                   starts.tolist(), ends.tolist()):
+            if blob[start:end] == encoded[i]:
+                columns[i] = column
+            else:
+                column = self._probe(position + 1, int(keys[i]), encoded[i])
+                if column is not None:
+                    columns[i] = column
+        return columns
+
+    def _probe(self, position, key, token):
+        # Termos diferentes com o mesmo crc32 ficam em posições vizinhas da tabela
+        while position < len(self.term_hashes) and self.term_hashes[position] == key:
+            column = int(self.term_columns[position])
+            if self.term_blob[self.term_offsets[column]:self.term_offsets[column + 1]] == token:
+                return column
+            position += 1
+        return None
+
+    def joint_log_likelihood(self, texts):
+        texts = list(texts)
+        # Tokens de todo o lote, consultados no vocabulário de uma só vez
+        tokens, lengths = [], []
+        for text in texts:
+            analyzed = self.analyze(text)
+            tokens.extend(analyzed)
+            lengths.append(len(analyzed))
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        # Cada token distinto é consultado uma única vez
+        distinct = list(dict.fromkeys(tokens))
+        lookup = dict(zip(distinct, self._columns(distinct).tolist()))
+        columns = np.fromiter(map(lookup.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        known = columns >= 0
+        rows, columns = rows[known], columns[known]
+
+        jll = np.tile(self.class_log_prior.astype(np.float64), (len(texts), 1))
+        if not len(columns):
+            return jll
+
+        # Contagem de cada (email, termo), em ordem de coluna dentro do email
+        cells, counts = np.unique(rows * self.n_features + columns, return_counts=True)
+        rows, columns = cells // self.n_features, cells % self.n_features
+        values = np.ones(len(cells)) if self.binary else counts.astype(np.float64)
+        if self.sublinear_tf:
+            values = np.log(values) + 1
+        values *= self.idf[columns]
+        if self.norm == "l2":
+            values /= np.sqrt(np.bincount(rows, weights=values ** 2, minlength=len(texts)))[rows]
+        elif self.norm == "l1":
+            values /= np.bincount(rows, weights=np.abs(values), minlength=len(texts))[rows]
+
+        # Produto esparso: cada termo contribui com peso x log-probabilidade para cada classe
+        contributions = values[:, None] * self.feature_log_prob[columns]
+        for k in range(len(self.classes_)):
+            jll[:, k] += np.bincount(rows, weights=contributions[:, k], minlength=len(texts))
+        return jll
+
+    def predict_proba(self, texts):
+        jll = self.joint_log_likelihood(texts)
+        jll -= jll.max(axis=1, keepdims=True)
+        probabilities = np.exp(jll)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, texts):
+        return self.classes_[self.joint_log_likelihood(texts).argmax(axis=1)]
@@ -19,8 +19,12 @@ def get_env_variable(name, default=None):
         raise ValueError(f"Variável de ambiente '{name}' não encontrada. Verifique o arquivo .env.")
     return value
 
-# Chave da API da OpenAI (obrigatória)
-OPENAI_API_KEY = get_env_variable("OPENAI_API_KEY")
+# Chave da API da OpenAI (obrigatória): validada apenas quando usada, para que
+# importar o config (ex.: MODEL_PATH nos scripts de treino) não falhe sem a chave
+def __getattr__(name):
+    if name == "OPENAI_API_KEY":
+        return get_env_variable("OPENAI_API_KEY")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Caminho para o modelo de classificação
 MODEL_PATH = os.path.join(BASE_DIR, "models/email-classifier/model.joblib")
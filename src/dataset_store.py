@@ -0,0 +1,267 @@
+"""
+Armazenamento colunar do dataset de treinamento (Parquet) e carregador compartilhado
+por prepare_training_data.py, train_model.py, tune_model.py e models/email-classifier.py.
+
+O dataset é um diretório de partes Parquet imutáveis (`part-000000.parquet`, ...).
+Cada acréscimo grava uma nova parte, sem reler nem reescrever as anteriores. Na leitura,
+os arquivos são mapeados em memória e apenas as colunas e os row groups necessários
+são lidos (o número de linhas vem dos metadados, sem ler os dados).
+
+Enquanto o CSV não for convertido, o carregador lê o CSV com a mesma interface.
+Para converter:
+
+    python src/dataset_store.py --from-csv data/email_training_data.csv
+
+Requer pyarrow.
+"""
+import os
+import hashlib
+import logging
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data"
+CSV_PATH = DATA_DIR / "email_training_data.csv"
+DATASET_DIR = DATA_DIR / "email_training_data"
+
+# Tamanho dos blocos lidos do CSV e dos row groups gravados
+CHUNK_SIZE = 50000
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("O dataset em Parquet requer o pacote pyarrow (pip install pyarrow)") from e
+    return pyarrow, pyarrow.parquet
+
+
+class DatasetStore:
+    """
+    Dataset em partes Parquet, apenas com acréscimos. As linhas mantêm a ordem de chegada
+    (a linha N é a mesma do CSV original), o que permite ler a partir de uma posição.
+    """
+
+    PART_PATTERN = "part-*.parquet"
+
+    def __init__(self, path, row_group_size=CHUNK_SIZE, compression="zstd"):
+        self.path = Path(path)
+        self.row_group_size = row_group_size
+        self.compression = compression
+
+    def parts(self):
+        return sorted(self.path.glob(self.PART_PATTERN))
+
+    def exists(self):
+        return bool(self.parts())
+
+    def append(self, df):
+        """
+        Grava `df` como uma nova parte e retorna o caminho dela (None se `df` estiver vazio).
+        """
+        if df.empty:
+            return None
+        pa, pq = _pyarrow()
+        self.path.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+
+        # Grava em um arquivo temporário e publica com link: a parte só aparece completa,
+        # e um nome já usado (outro processo) nunca é sobrescrito
+        tmp = self.path / f".tmp-{os.getpid()}-{os.urandom(4).hex()}.parquet"
+        pq.write_table(table, tmp, row_group_size=self.row_group_size, compression=self.compression)
+        try:
+            number = len(self.parts())
+            while True:
+                part = self.path / f"part-{number:06d}.parquet"
+                try:
+                    os.link(tmp, part)
+                    return part
+                except FileExistsError:
+                    number += 1
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _row_groups(self):
+        # (arquivo, row group, primeira linha, número de linhas), lidos apenas dos metadados
+        _, pq = _pyarrow()
+        groups, offset = [], 0
+        for part in self.parts():
+            metadata = pq.read_metadata(part)
+            for index in range(metadata.num_row_groups):
+                rows = metadata.row_group(index).num_rows
+                groups.append((part, index, offset, rows))
+                offset += rows
+        return groups
+
+    def num_rows(self):
+        _, pq = _pyarrow()
+        return sum(pq.read_metadata(part).num_rows for part in self.parts())
+
+    def iter_tables(self, columns=None, start=0, stop=None):
+        """
+        Tabelas Arrow com as linhas [start, stop), uma por row group, lidas com memory-mapping.
+        """
+        _, pq = _pyarrow()
+        files = {}
+        for part, index, first, rows in self._row_groups():
+            if first + rows <= start or (stop is not None and first >= stop):
+                continue
+            if part not in files:
+                files[part] = pq.ParquetFile(part, memory_map=True)
+            table = files[part].read_row_group(index, columns=list(columns) if columns else None)
+            begin = max(start - first, 0)
+            end = rows if stop is None else min(stop - first, rows)
+            yield table.slice(begin, end - begin)
+
+    def read_table(self, columns=None, start=0, stop=None):
+        pa, pq = _pyarrow()
+        tables = list(self.iter_tables(columns, start, stop))
+        if tables:
+            return pa.concat_tables(tables)
+        # Nenhuma linha no intervalo: tabela vazia com o esquema do dataset
+        parts = self.parts()
+        if not parts:
+            return pa.table({column: [] for column in columns or ()})
+        schema = pq.read_schema(parts[0])
+        if columns:
+            schema = pa.schema([schema.field(column) for column in columns])
+        return schema.empty_table()
+
+    def read(self, columns=None, start=0, stop=None):
+        return self.read_table(columns, start, stop).to_pandas()
+
+    def iter_batches(self, columns=None, batch_size=CHUNK_SIZE, start=0):
+        """
+        DataFrames de `batch_size` linhas a partir de `start` (como read_csv com chunksize),
+        independentemente do tamanho das partes e dos row groups.
+        """
+        pa, _ = _pyarrow()
+        pending, size = [], 0
+        for table in self.iter_tables(columns, start):
+            pending.append(table)
+            size += table.num_rows
+            while size >= batch_size:
+                merged = pa.concat_tables(pending)
+                yield merged.slice(0, batch_size).to_pandas()
+                rest = merged.slice(batch_size)
+                pending, size = [rest], rest.num_rows
+        if size:
+            yield pa.concat_tables(pending).to_pandas()
+
+    def fingerprint(self):
+        """
+        Identifica o conteúdo do dataset (as partes são imutáveis: nomes e tamanhos bastam).
+        """
+        digest = hashlib.sha256()
+        for part in self.parts():
+            digest.update(f"{part.name}:{part.stat().st_size}\n".encode())
+        return digest.hexdigest()
+
+
+class CsvDataset:
+    """
+    O dataset em CSV, com a mesma interface de leitura de DatasetStore.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def exists(self):
+        return self.path.exists()
+
+    def _read_csv(self, columns=None, start=0, **kwargs):
+        return pd.read_csv(self.path, usecols=list(columns) if columns else None,
+                           skiprows=range(1, start + 1) if start else None,
+                           dtype={"text": str}, keep_default_na=False, **kwargs)
+
+    def num_rows(self):
+        return sum(len(chunk) for chunk in self._read_csv(["label"], chunksize=CHUNK_SIZE))
+
+    def read(self, columns=None, start=0, stop=None):
+        return self._read_csv(columns, start, nrows=None if stop is None else max(stop - start, 0))
+
+    def read_table(self, columns=None, start=0, stop=None):
+        pa, _ = _pyarrow()
+        return pa.Table.from_pandas(self.read(columns, start, stop), preserve_index=False)
+
+    def iter_batches(self, columns=None, batch_size=CHUNK_SIZE, start=0):
+        yield from self._read_csv(columns, start, chunksize=batch_size)
+
+    def fingerprint(self):
+        digest = hashlib.sha256()
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+
+class SingleFileStore(DatasetStore):
+    """
+    Um único arquivo Parquet (ex.: corpus externo), lido como um DatasetStore.
+    """
+
+    def parts(self):
+        return [self.path] if self.path.exists() else []
+
+    def append(self, df):
+        raise ValueError("Acréscimos são feitos em diretórios de partes, não em um arquivo Parquet isolado")
+
+
+def open_dataset(path=None):
+    """
+    Abre um dataset: diretório de partes Parquet (inclusive a saída de bulk_classify.py) ou
+    arquivo .parquet -> DatasetStore; .csv -> CsvDataset.
+    Sem `path`, o dataset de treinamento: o Parquet em data/email_training_data/, se já
+    convertido, senão data/email_training_data.csv.
+    """
+    if path is None:
+        store = DatasetStore(DATASET_DIR)
+        return store if store.exists() else CsvDataset(CSV_PATH)
+    path = Path(path)
+    if path.suffix == ".csv":
+        return CsvDataset(path)
+    if path.suffix == ".parquet" and not path.is_dir():
+        return SingleFileStore(path)
+    return DatasetStore(path)
+
+
+def convert_csv(csv_path=CSV_PATH, dataset_dir=DATASET_DIR, chunksize=CHUNK_SIZE, overwrite=False):
+    """
+    Converte o CSV em partes Parquet (uma parte por bloco de `chunksize` linhas),
+    mantendo a ordem das linhas. Retorna o número de linhas convertidas.
+    """
+    store = DatasetStore(dataset_dir, row_group_size=chunksize)
+    if store.exists():
+        if not overwrite:
+            raise FileExistsError(f"Dataset Parquet já existe: {dataset_dir} (use --overwrite)")
+        for part in store.parts():
+            part.unlink()
+
+    total = 0
+    for chunk in CsvDataset(csv_path).iter_batches(batch_size=chunksize):
+        store.append(chunk)
+        total += len(chunk)
+        logger.info(f"{total} registro(s) convertidos")
+    return total
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Converte o dataset de treinamento para Parquet")
+    parser.add_argument("--from-csv", type=Path, default=CSV_PATH, help="CSV de origem")
+    parser.add_argument("--output", type=Path, default=DATASET_DIR, help="Diretório das partes Parquet")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="Linhas por parte")
+    parser.add_argument("--overwrite", action="store_true", help="Substitui um dataset Parquet existente")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    args = parse_args()
+    rows = convert_csv(args.from_csv, args.output, args.chunksize, args.overwrite)
+    logger.info(f"{rows} registro(s) salvos em: {args.output}")
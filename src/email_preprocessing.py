@@ -0,0 +1,177 @@
+import os
+import re
+from dataclasses import dataclass
+
+# Estimativa de tokens sem depender do tokenizer do provedor (~4 caracteres por token)
+CHARS_PER_TOKEN = 4
+
+# Início do histórico citado em respostas: tudo a partir daqui é descartado
+RE_REPLY_HEADER = re.compile(
+    r"^\s*(?:"
+    r"em .{0,120}escreveu:\s*$"                      # Em 10/05/2024, Fulano <x@y.com> escreveu:
+    r"|on .{0,120}wrote:\s*$"                         # On Mon, May 10, 2024, John wrote:
+    r"|-{2,}\s*(?:mensagem original|original message)\s*-{2,}"
+    r"|_{10,}\s*$"                                    # Separador do Outlook
+    r"|(?:de|from):\s.+\n\s*(?:enviad[ao]|sent|data|date):\s"
+    r")",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Cabeçalho de encaminhamento: o marcador e os campos são removidos, o conteúdo encaminhado é mantido
+RE_FORWARD_MARKER = re.compile(
+    r"^\s*-{2,}\s*(?:mensagem encaminhada|forwarded message)\s*-{2,}\s*$", re.IGNORECASE | re.MULTILINE
+)
+RE_HEADER_FIELD = re.compile(r"^\s*(?:de|from|para|to|cc|assunto|subject|data|date|enviad[ao]|sent):\s", re.IGNORECASE)
+
+# Assinaturas: delimitador padrão ("-- ") e rodapés de dispositivos móveis
+RE_SIGNATURE = re.compile(
+    r"^(?:--\s*$|enviado do meu |sent from my |obter o outlook para )", re.IGNORECASE | re.MULTILINE
+)
+
+# Despedidas: o que vem depois (nome, cargo, telefone) é descartado se for curto e não for texto corrido
+RE_SIGN_OFF = re.compile(
+    r"^\s*(?:atenciosamente|att\.?|abraços?|abs\.?|cordialmente|saudações|grato|grata|obrigad[oa]"
+    r"|best regards|regards|thanks|cheers)[,.!]?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+MAX_SIGNATURE_LINES = 6
+# Linhas de assinatura (nome, cargo, contato) têm poucas palavras em minúsculas e não terminam frases
+RE_LOWERCASE_WORD = re.compile(r"(?<!\S)[a-zà-ÿ]+\b")
+
+# Parágrafos de aviso legal / rodapés automáticos (removidos apenas do final do email)
+RE_DISCLAIMER = re.compile(
+    r"aviso legal|disclaimer|antes de imprimir|before printing|destinatário\(s\)|intended recipient"
+    r"|(?:mensagem|e-?mail|informaç(?:ão|ões)|conteúdo|anexos?)\b.{0,60}\bconfidencia"
+    r"|confidential(?:ity)? (?:notice|information)|this (?:e-?mail|message)\b.{0,60}\bconfidential"
+    r"|esta mensagem (?:e seus anexos )?(?:pode conter|é destinada|são)",
+    re.IGNORECASE,
+)
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class PreprocessedEmail:
+    """
+    Texto enviado ao LLM e a economia de tokens em relação ao email original.
+    """
+    text: str
+    original_tokens: int
+    tokens: int
+    truncated: bool = False
+
+    @property
+    def saved_tokens(self):
+        return self.original_tokens - self.tokens
+
+    def stats(self):
+        return {
+            "original_tokens": self.original_tokens,
+            "tokens": self.tokens,
+            "saved_tokens": self.saved_tokens,
+            "truncated": self.truncated,
+        }
+
+
+def strip_quoted(text: str) -> str:
+    """
+    Remove o histórico citado (linhas com ">" e tudo após o cabeçalho de resposta).
+    """
+    match = RE_REPLY_HEADER.search(text)
+    if match and text[:match.start()].strip():
+        text = text[:match.start()]
+    return "\n".join(line for line in text.splitlines() if not line.lstrip().startswith(">"))
+
+
+def strip_forward_headers(text: str) -> str:
+    lines = text.splitlines()
+    result, in_header = [], False
+    for line in lines:
+        if RE_FORWARD_MARKER.match(line):
+            in_header = True
+            continue
+        if in_header and (RE_HEADER_FIELD.match(line) or not line.strip()):
+            continue
+        in_header = False
+        result.append(line)
+    return "\n".join(result)
+
+
+def _is_signature(tail: str) -> bool:
+    lines = [line.strip() for line in tail.splitlines() if line.strip()]
+    if len(lines) > MAX_SIGNATURE_LINES:
+        return False
+    for line in lines:
+        words = line.split()
+        if len(RE_LOWERCASE_WORD.findall(line)) >= 4 or (len(words) >= 3 and line[-1] in ".!?…"):
+            return False
+    return True
+
+
+def strip_signature(text: str) -> str:
+    match = RE_SIGNATURE.search(text)
+    if match and text[:match.start()].strip():
+        text = text[:match.start()]
+    # Despedida seguida apenas de uma assinatura: o restante é descartado. Se depois
+    # dela ainda houver texto corrido ("Obrigado!\n\nMas ainda..."), nada é cortado
+    for match in reversed(list(RE_SIGN_OFF.finditer(text))):
+        if text[:match.start()].strip() and _is_signature(text[match.end():]):
+            text = text[:match.start()]
+        break
+    return text
+
+
+def strip_disclaimers(text: str) -> str:
+    """
+    Remove os avisos legais do final do email (o primeiro parágrafo é sempre mantido).
+    """
+    paragraphs = re.split(r"\n\s*\n", text.strip())
+    end = len(paragraphs)
+    while end > 1 and RE_DISCLAIMER.search(paragraphs[end - 1]):
+        end -= 1
+    return "\n\n".join(paragraphs[:end])
+
+def fit_to_budget(text: str, max_tokens: int):
+    """
+    Corta o texto no limite de tokens (em um espaço, quando possível). Retorna (texto, cortado).
+    """
+    limit = max_tokens * CHARS_PER_TOKEN
+    if max_tokens <= 0 or len(text) <= limit:
+        return text, False
+    cut = text.rfind(" ", 0, limit - 4)
+    return text[:cut if cut > limit // 2 else limit - 4].rstrip() + " [...]", True
+
+
+class EmailPreprocessor:
+    """
+    Prepara o email antes do LLM: remove histórico citado, cabeçalhos de encaminhamento,
+    assinaturas e avisos legais, e ajusta o texto ao orçamento de tokens de entrada.
+    """
+
+    def __init__(self, max_input_tokens=1000, enabled=True):
+        self.max_input_tokens = max_input_tokens
+        self.enabled = enabled
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_input_tokens=int(os.getenv("LLM_MAX_INPUT_TOKENS", 1000)),
+            enabled=os.getenv("EMAIL_PREPROCESSING_ENABLED", "True") == "True",
+        )
+
+    def process(self, content: str) -> PreprocessedEmail:
+        original_tokens = estimate_tokens(content)
+        if not self.enabled:
+            return PreprocessedEmail(content, original_tokens, original_tokens)
+
+        text = content.replace("\r\n", "\n")
+        # Encaminhamentos primeiro: seus cabeçalhos (De:/Data:) não devem ser tomados por histórico citado
+        text = strip_forward_headers(text)
+        text = strip_quoted(text)
+        # Avisos legais antes da assinatura: assim a assinatura passa a ser o final do email
+        text = strip_disclaimers(text)
+        text = strip_signature(text)
+        text = re.sub(r"\n{3,}", "\n\n", text).strip() or content.strip()
+        text, truncated = fit_to_budget(text, self.max_input_tokens)
+        return PreprocessedEmail(text, original_tokens, estimate_tokens(text), truncated)
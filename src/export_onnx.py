@@ -0,0 +1,172 @@
+"""
+Exporta o classificador BERT ajustado (models/email-classifier.py) para ONNX e
+gera uma versão quantizada em int8 (quantização dinâmica) para inferência na CPU.
+
+Ao final, compara acurácia e latência do modelo PyTorch (float), do ONNX float e do
+ONNX int8 em um conjunto de avaliação e salva o relatório junto com os artefatos.
+
+    python src/export_onnx.py --model-dir models/email-classifier --output models/email-classifier-onnx
+
+Requer torch, transformers, onnx e onnxruntime. A API usa o resultado com
+CLASSIFIER_BACKEND=onnx (ver src/onnx_classifier.py).
+"""
+import json
+import logging
+import argparse
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from config import BASE_DIR
+from train_model import TEST_SIZE, RANDOM_STATE
+from onnx_classifier import OnnxClassifier, FLOAT_FILE, QUANTIZED_FILE
+from dataset_store import open_dataset
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_DIR = BASE_DIR / "models/email-classifier"
+DEFAULT_OUTPUT_DIR = BASE_DIR / "models/email-classifier-onnx"
+REPORT_FILE = "export_report.json"
+
+
+def export_float(model_dir, output_dir, max_length, opset):
+    """
+    Exporta o modelo para ONNX com eixos dinâmicos de lote e sequência (padding dinâmico).
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+    model = AutoModelForSequenceClassification.from_pretrained(str(model_dir)).eval()
+
+    sample = tokenizer(["exemplo de email"], padding="longest", truncation=True,
+                       max_length=max_length, return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(output_dir / FLOAT_FILE),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+
+    # Tokenizer e config (id2label) acompanham o modelo exportado
+    tokenizer.save_pretrained(str(output_dir))
+    model.config.save_pretrained(str(output_dir))
+    logger.info(f"Modelo ONNX (float) salvo em: {output_dir / FLOAT_FILE}")
+    return model, tokenizer
+
+
+def quantize(output_dir):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(str(output_dir / FLOAT_FILE), str(output_dir / QUANTIZED_FILE), weight_type=QuantType.QInt8)
+    logger.info(f"Modelo ONNX (int8) salvo em: {output_dir / QUANTIZED_FILE}")
+
+
+class TorchClassifier:
+    """
+    Modelo PyTorch original com a mesma interface de predição, usado como referência.
+    """
+
+    def __init__(self, model, tokenizer, max_length):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+
+    def predict(self, texts):
+        import torch
+
+        encoded = self.tokenizer(list(texts), padding="longest", truncation=True,
+                                 max_length=self.max_length, return_tensors="pt")
+        with torch.no_grad():
+            return self.model(**encoded).logits.argmax(dim=-1).numpy()
+
+
+def benchmark(engine, texts, labels, batch_size, latency_samples):
+    predictions = np.concatenate([engine.predict(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)])
+
+    latencies = []
+    for text in texts[:latency_samples]:
+        start = perf_counter()
+        engine.predict([text])
+        latencies.append((perf_counter() - start) * 1000)
+
+    return predictions, {
+        "accuracy": float(accuracy_score(labels, predictions)),
+        "latency_p50_ms": float(np.percentile(latencies, 50)),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def load_eval_set(eval_csv=None):
+    # Sem arquivo, o dataset de treinamento (Parquet convertido ou CSV)
+    data = open_dataset(eval_csv).read(["text", "label"])
+    # Mesmo particionamento de src/train_model.py
+    _, X_test, _, y_test = train_test_split(
+        data["text"], data["label"], test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=data["label"]
+    )
+    return X_test.tolist(), y_test.to_numpy()
+
+
+def export_onnx(model_dir=DEFAULT_MODEL_DIR, output_dir=DEFAULT_OUTPUT_DIR, max_length=128, opset=17,
+                eval_csv=None, batch_size=32, latency_samples=100):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    model, tokenizer = export_float(Path(model_dir), output_dir, max_length, opset)
+    quantize(output_dir)
+
+    texts, labels = load_eval_set(eval_csv)
+    engines = {
+        "torch_float": TorchClassifier(model, tokenizer, max_length),
+        "onnx_float": OnnxClassifier(output_dir, FLOAT_FILE, max_length, batch_size),
+        "onnx_int8": OnnxClassifier(output_dir, QUANTIZED_FILE, max_length, batch_size),
+    }
+
+    report = {"max_length": max_length, "eval_size": len(texts), "engines": {}}
+    predictions = {}
+    for name, engine in engines.items():
+        predictions[name], report["engines"][name] = benchmark(engine, texts, labels, batch_size, latency_samples)
+        result = report["engines"][name]
+        logger.info(f"{name:<12} acurácia={result['accuracy']:.4f} "
+                    f"p50={result['latency_p50_ms']:.2f}ms p95={result['latency_p95_ms']:.2f}ms")
+
+    # Proporção de predições iguais às do modelo original
+    report["int8_agreement"] = float((predictions["onnx_int8"] == predictions["torch_float"]).mean())
+    report["size_mb"] = {
+        name: (output_dir / file).stat().st_size / 2 ** 20 for name, file in (("onnx_float", FLOAT_FILE), ("onnx_int8", QUANTIZED_FILE))
+    }
+    logger.info(f"Concordância int8 x float: {report['int8_agreement']:.4f}")
+
+    with open(output_dir / REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info(f"Relatório salvo em: {output_dir / REPORT_FILE}")
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta o classificador BERT para ONNX (int8)")
+    parser.add_argument("--model-dir", type=Path, default=DEFAULT_MODEL_DIR, help="Modelo ajustado (save_pretrained)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--max-length", type=int, default=128, help="Tamanho máximo da sequência (tokens)")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--eval-csv", type=Path, default=None, help="CSV ou Parquet (padrão: dataset de treinamento)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency-samples", type=int, default=100)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    export_onnx(args.model_dir, args.output, args.max_length, args.opset, args.eval_csv,
+                args.batch_size, args.latency_samples)
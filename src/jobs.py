@@ -0,0 +1,189 @@
+import os
+import uuid
+import logging
+import tempfile
+import threading
+from time import time
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+from cachelib import FileSystemCache
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """
+    Lançada quando o pool de jobs já tem o máximo de tarefas pendentes.
+    """
+
+
+class InvalidCallbackUrl(ValueError):
+    """
+    Lançada quando o callback_url não usa https ou aponta para um host fora da lista permitida.
+    """
+
+
+class MemoryJobStore:
+    """
+    Armazena os jobs em memória, no próprio worker.
+    Adequado para um único processo; com vários workers use FileSystemJobStore.
+    """
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def save(self, job):
+        with self._lock:
+            self._jobs[job["id"]] = (time() + self.ttl, dict(job))
+            self._remove_expired()
+
+    def get(self, job_id):
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None or entry[0] < time():
+                return None
+            return dict(entry[1])
+
+    def _remove_expired(self):
+        now = time()
+        for job_id in [k for k, (expires, _) in self._jobs.items() if expires < now]:
+            del self._jobs[job_id]
+
+
+class FileSystemJobStore:
+    """
+    Armazena os jobs em disco (cachelib.FileSystemCache), permitindo que qualquer
+    worker do gunicorn responda à consulta de status.
+    """
+
+    def __init__(self, path, ttl=3600, threshold=10000):
+        self._cache = FileSystemCache(path, threshold=threshold, default_timeout=ttl)
+
+    def save(self, job):
+        self._cache.set(job["id"], dict(job))
+
+    def get(self, job_id):
+        return self._cache.get(job_id)
+
+
+def create_job_store():
+    """
+    Cria o armazenamento de jobs configurado em JOB_STORE ("memory" ou "filesystem").
+    """
+    kind = os.getenv("JOB_STORE", "memory")
+    ttl = int(os.getenv("JOB_TTL", 3600))
+    if kind == "memory":
+        return MemoryJobStore(ttl=ttl)
+    if kind == "filesystem":
+        path = os.getenv("JOB_STORE_DIR", os.path.join(tempfile.gettempdir(), "autou-jobs"))
+        return FileSystemJobStore(path, ttl=ttl)
+    raise ValueError(f"JOB_STORE inválido: {kind}")
+
+
+class JobRunner:
+    """
+    Executa tarefas em um pool de threads limitado e registra o andamento no
+    armazenamento de jobs. Quando há mais de `max_pending` jobs aguardando ou em
+    execução, novos envios são recusados com JobQueueFull.
+
+    Callbacks só são enviados por https para os hosts de `callback_allowed_hosts`
+    (o endereço vem do cliente; sem a lista, qualquer servidor interno poderia ser chamado).
+    Com a lista vazia, callbacks são recusados.
+    """
+
+    def __init__(self, store, max_workers=4, max_pending=100, callback_timeout=5, callback_allowed_hosts=()):
+        self.store = store
+        self.max_workers = max_workers
+        self.callback_timeout = callback_timeout
+        self.callback_allowed_hosts = frozenset(host.strip().lower() for host in callback_allowed_hosts if host.strip())
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            create_job_store(),
+            max_workers=int(os.getenv("JOB_WORKERS", 4)),
+            max_pending=int(os.getenv("JOB_QUEUE_SIZE", 100)),
+            callback_timeout=float(os.getenv("JOB_CALLBACK_TIMEOUT", 5)),
+            callback_allowed_hosts=os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(","),
+        )
+
+    def _get_executor(self):
+        # Criado sob demanda para não compartilhar threads entre processos após o fork
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="email-job")
+            return self._executor
+
+    def validate_callback_url(self, url):
+        """
+        Lança InvalidCallbackUrl se o callback não for https para um host permitido.
+        """
+        try:
+            parts = urlsplit(url)
+        except (TypeError, ValueError, AttributeError) as e:
+            raise InvalidCallbackUrl("callback_url inválido") from e
+        if parts.scheme != "https":
+            raise InvalidCallbackUrl("callback_url deve usar https")
+        if (parts.hostname or "").lower() not in self.callback_allowed_hosts:
+            raise InvalidCallbackUrl("Host do callback_url não permitido")
+
+    def submit(self, func, data=None, callback_url=None):
+        """
+        Agenda `func` e retorna o id do job. O resultado de `func` é salvo em "response".
+        Lança InvalidCallbackUrl se `callback_url` não for permitido (ver validate_callback_url).
+        """
+        if callback_url:
+            self.validate_callback_url(callback_url)
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull("Fila de jobs cheia")
+
+        job = {"id": uuid.uuid4().hex, "status": "pending", "created_at": time(), **(data or {})}
+        try:
+            self.store.save(job)
+            self._get_executor().submit(self._run, job, func, callback_url)
+        except Exception:
+            self._slots.release()
+            raise
+        return job["id"]
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def _run(self, job, func, callback_url):
+        try:
+            job["status"] = "running"
+            self.store.save(job)
+            job["response"] = func()
+            job["status"] = "done"
+        except Exception as e:
+            logger.error(f"Erro ao executar job {job['id']}: {e}", exc_info=True)
+            job["status"] = "failed"
+            job["error"] = "Erro ao gerar resposta"
+        finally:
+            job["finished_at"] = time()
+            self.store.save(job)
+            self._slots.release()
+
+        if callback_url:
+            self._send_callback(callback_url, job)
+
+    def _send_callback(self, url, job):
+        import requests  # Importado sob demanda: só é usado quando há callback
+
+        try:
+            # Sem seguir redirecionamentos: o destino final precisa ser o host validado
+            requests.post(url, json=job, timeout=self.callback_timeout, allow_redirects=False)
+        except Exception as e:
+            logger.error(f"Erro ao enviar callback do job {job['id']}: {e}")
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
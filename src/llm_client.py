@@ -0,0 +1,330 @@
+import os
+import json
+import asyncio
+import random
+import logging
+import threading
+from time import monotonic, sleep
+
+logger = logging.getLogger(__name__)
+
+# Status HTTP que indicam falha temporária do provedor
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """
+    Falha ao obter uma resposta do LLM após esgotar as tentativas.
+    """
+
+
+class CircuitOpenError(LLMError):
+    """
+    Lançada sem chamar o provedor enquanto o circuit breaker está aberto.
+    """
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples: abre após `failure_threshold` falhas consecutivas e,
+    depois de `reset_timeout` segundos, libera uma única chamada de teste (meio aberto).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN  # Apenas esta chamada passa até haver resultado
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("Circuit breaker do LLM aberto")
+                self._state = self.OPEN
+                self._opened_at = monotonic()
+
+
+class LLMClient:
+    """
+    Cliente da API de Chat Completions com conexões reutilizadas, timeouts,
+    novas tentativas com jitter e circuit breaker.
+    Cada processo (worker do gunicorn) mantém sua própria sessão HTTP.
+    """
+
+    def __init__(self, api_key=None, base_url="https://api.openai.com/v1", model="gpt-3.5-turbo",
+                 connect_timeout=3.05, read_timeout=30.0, max_retries=2, backoff_base=0.5,
+                 backoff_max=8.0, pool_size=10, breaker=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.breaker = breaker or CircuitBreaker()
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+            model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
+            connect_timeout=float(os.getenv("LLM_CONNECT_TIMEOUT", 3.05)),
+            read_timeout=float(os.getenv("LLM_READ_TIMEOUT", 30)),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", 2)),
+            backoff_base=float(os.getenv("LLM_BACKOFF_BASE", 0.5)),
+            backoff_max=float(os.getenv("LLM_BACKOFF_MAX", 8)),
+            pool_size=int(os.getenv("LLM_POOL_SIZE", 10)),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", 5)),
+                reset_timeout=float(os.getenv("LLM_BREAKER_RESET", 30)),
+            ),
+        )
+
+    @property
+    def session(self):
+        # Uma sessão por processo: conexões não podem ser compartilhadas após o fork
+        with self._lock:
+            if self._session is None or self._session_pid != os.getpid():
+                # requests é importado na primeira chamada ao provedor (inicialização mais rápida)
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if self.api_key:
+                    session.headers["Authorization"] = f"Bearer {self.api_key}"
+                self._session = session
+                self._session_pid = os.getpid()
+            return self._session
+
+    def _backoff(self, attempt):
+        # Full jitter: espera aleatória entre 0 e o limite exponencial
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _post(self, payload, stream=False):
+        import requests
+
+        if not self.breaker.allow():
+            raise CircuitOpenError("Circuit breaker aberto")
+
+        url = f"{self.base_url}/chat/completions"
+        last_error = None
+        succeeded = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    sleep(self._backoff(attempt - 1))
+                try:
+                    response = self.session.post(url, json=payload, timeout=self.timeout, stream=stream)
+                except requests.RequestException as e:
+                    last_error = e
+                    continue
+                if response.status_code in RETRYABLE_STATUS:
+                    last_error = LLMError(f"Status {response.status_code} do provedor")
+                    response.close()
+                    continue
+                # Erros do cliente (ex.: requisição inválida) não indicam provedor degradado
+                self.breaker.record_success()
+                succeeded = True
+                if response.status_code >= 400:
+                    response.close()
+                    raise LLMError(f"Status {response.status_code} do provedor")
+                return response
+            raise LLMError(f"Falha após {self.max_retries + 1} tentativa(s): {last_error}")
+        finally:
+            # Qualquer saída sem sucesso (inclusive exceções inesperadas) conta como falha:
+            # sem resultado, a chamada de teste do meio aberto deixaria o breaker fechado para sempre
+            if not succeeded:
+                self.breaker.record_failure()
+
+    def _payload(self, messages, max_tokens, stream=False):
+        payload = {"model": self.model, "messages": messages, "max_tokens": max_tokens}
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def chat(self, messages, max_tokens=100):
+        """
+        Retorna o texto completo da resposta.
+        """
+        import requests
+
+        response = self._post(self._payload(messages, max_tokens))
+        try:
+            return response.json()["choices"][0]["message"]["content"]
+        except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+            self.breaker.record_failure()
+            raise LLMError(f"Resposta inválida do provedor: {e}")
+
+    def stream_chat(self, messages, max_tokens=100):
+        """
+        Gera os tokens da resposta à medida que chegam (streaming SSE do provedor).
+        Novas tentativas só acontecem antes do primeiro byte; falhas no meio do streaming
+        contam para o circuit breaker e são lançadas como LLMError.
+        """
+        import requests
+
+        response = self._post(self._payload(messages, max_tokens, stream=True), stream=True)
+        with response:
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {})
+                    if delta.get("content"):
+                        yield delta["content"]
+            except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+                self.breaker.record_failure()
+                raise LLMError(f"Falha durante o streaming: {e}") from e
+
+
+class AsyncLLMClient(LLMClient):
+    """
+    Versão não bloqueante do cliente (httpx.AsyncClient), usada pelo modo ASGI (src/asgi.py).
+    Mantém as mesmas novas tentativas, backoff e circuit breaker; enquanto aguarda o
+    provedor, o event loop continua atendendo outras requisições.
+
+    As `pool_size` conexões são divididas entre vários clientes httpx de até
+    `CONNECTIONS_PER_CLIENT` conexões, usados em rodízio: o custo de distribuir as
+    requisições pendentes no pool do httpcore cresce com o produto pendentes x conexões
+    e, com centenas de chamadas simultâneas em um único pool, passa a dominar o event loop.
+    Os clientes pertencem ao event loop em que foram criados e devem ser fechados com `aclose()`.
+    """
+
+    CONNECTIONS_PER_CLIENT = 16
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._clients = []
+        self._next_client = 0
+
+    def _create_clients(self):
+        import httpx
+
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        count = max(1, -(-self.pool_size // self.CONNECTIONS_PER_CLIENT))
+        connections = -(-self.pool_size // count)
+        ssl_context = httpx.create_ssl_context()  # Certificados carregados uma única vez para todos os clientes
+        return [
+            httpx.AsyncClient(
+                headers=headers,
+                verify=ssl_context,
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+            )
+            for _ in range(count)
+        ]
+
+    @property
+    def client(self):
+        if not self._clients:
+            self._clients = self._create_clients()
+        self._next_client = (self._next_client + 1) % len(self._clients)
+        return self._clients[self._next_client]
+
+    async def aclose(self):
+        clients, self._clients = self._clients, []
+        for client in clients:
+            await client.aclose()
+
+    async def _post(self, payload, stream=False):
+        import httpx
+
+        if not self.breaker.allow():
+            raise CircuitOpenError("Circuit breaker aberto")
+
+        url = f"{self.base_url}/chat/completions"
+        last_error = None
+        succeeded = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    await asyncio.sleep(self._backoff(attempt - 1))
+                try:
+                    client = self.client
+                    response = await client.send(client.build_request("POST", url, json=payload), stream=stream)
+                except httpx.HTTPError as e:
+                    last_error = e
+                    continue
+                if response.status_code in RETRYABLE_STATUS:
+                    last_error = LLMError(f"Status {response.status_code} do provedor")
+                    await response.aclose()
+                    continue
+                self.breaker.record_success()
+                succeeded = True
+                if response.status_code >= 400:
+                    await response.aclose()
+                    raise LLMError(f"Status {response.status_code} do provedor")
+                return response
+            raise LLMError(f"Falha após {self.max_retries + 1} tentativa(s): {last_error}")
+        finally:
+            # Inclui o cancelamento da chamada de teste do meio aberto (ver LLMClient._post)
+            if not succeeded:
+                self.breaker.record_failure()
+
+    async def chat(self, messages, max_tokens=100):
+        response = await self._post(self._payload(messages, max_tokens))
+        try:
+            return response.json()["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError) as e:
+            self.breaker.record_failure()
+            raise LLMError(f"Resposta inválida do provedor: {e}")
+
+    async def stream_chat(self, messages, max_tokens=100):
+        import httpx
+
+        response = await self._post(self._payload(messages, max_tokens, stream=True), stream=True)
+        try:
+            async for line in response.aiter_lines():
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {})
+                if delta.get("content"):
+                    yield delta["content"]
+        except (httpx.HTTPError, ValueError, KeyError, IndexError) as e:
+            self.breaker.record_failure()
+            raise LLMError(f"Falha durante o streaming: {e}") from e
+        finally:
+            await response.aclose()
@@ -0,0 +1,159 @@
+import os
+import json
+import logging
+from time import perf_counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+# Com PROMETHEUS_MULTIPROC_DIR definido (ver gunicorn.conf.py), cada worker grava
+# suas métricas em arquivos nesse diretório e /metrics agrega todos os workers.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# Logs estruturados com o tempo de cada etapa da requisição (opcional)
+TIMING_LOG = os.getenv("REQUEST_TIMING_LOG", "False") == "True"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+STAGE_LATENCY = Histogram(
+    "email_stage_duration_seconds",
+    "Latência de cada etapa do processamento de emails",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_LATENCY = Histogram(
+    "email_request_duration_seconds",
+    "Latência total das requisições por endpoint",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter("email_requests_total", "Requisições atendidas", ["endpoint", "status"])
+CACHE_EVENTS = Counter("email_response_cache_total", "Consultas ao cache de respostas", ["result"])
+FALLBACKS = Counter("email_fallbacks_total", "Respostas padrão devolvidas no lugar do LLM", ["reason"])
+ERRORS = Counter("email_errors_total", "Erros por etapa do processamento", ["stage"])
+CLASSIFIER_TIER = Counter(
+    "email_classifier_tier_total",
+    "Emails classificados por nível (fast = TF-IDF/NB, transformer = BERT)",
+    ["tier"],
+)
+LLM_INPUT_TOKENS = Counter(
+    "email_llm_input_tokens_total",
+    "Tokens de entrada do LLM (estimados): original = email recebido, sent = após o pré-processamento",
+    ["kind"],
+)
+PDF_PAGE_LATENCY = Histogram(
+    "email_pdf_page_duration_seconds",
+    "Tempo de extração de texto por página de PDF",
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "email_admission_in_flight",
+    "Requisições (request) e chamadas ao LLM (llm) em andamento",
+    ["kind"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "email_admission_queue_depth",
+    "Requisições aguardando vaga na fila de admissão, por prioridade",
+    ["priority"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_REJECTIONS = Counter(
+    "email_admission_rejections_total",
+    "Requisições recusadas com 429 (rate_limit, queue_full, queue_timeout, job_queue_full)",
+    ["reason"],
+)
+PROFILES = Counter(
+    "email_profiles_total",
+    "Perfis de requisição salvos (forced = cabeçalho de administração, sampled = amostragem)",
+    ["trigger"],
+)
+CIRCUIT_OPEN = Gauge(
+    "email_llm_circuit_open",
+    "1 quando o circuit breaker do LLM está aberto",
+    multiprocess_mode="livemax",  # Ignora workers encerrados (o valor de um worker morto ficaria preso)
+)
+
+# Tempos das etapas da requisição atual (usado no log estruturado)
+_request_timings = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def stage_timer(stage):
+    """
+    Mede a duração de uma etapa e conta erros ocorridos nela.
+    """
+    start = perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS.labels(stage).inc()
+        raise
+    finally:
+        observe_stage(stage, perf_counter() - start)
+
+
+def observe_stage(stage, seconds):
+    STAGE_LATENCY.labels(stage).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def current_timings():
+    """
+    Cópia dos tempos (em segundos) das etapas já concluídas na requisição atual.
+    """
+    return dict(_request_timings.get() or {})
+
+
+def start_request():
+    """
+    Inicia a coleta de tempos da requisição atual.
+    """
+    _request_timings.set({})
+    return perf_counter()
+
+
+def finish_request(endpoint, status, started, request_id=None):
+    """
+    Registra a requisição e, se REQUEST_TIMING_LOG=True, grava um log JSON com os tempos.
+    """
+    elapsed = perf_counter() - started
+    REQUEST_LATENCY.labels(endpoint).observe(elapsed)
+    REQUESTS.labels(endpoint, str(status)).inc()
+    timings = _request_timings.get() or {}
+    _request_timings.set(None)
+    if TIMING_LOG:
+        logger.info(json.dumps({
+            "event": "request_timing",
+            "request_id": request_id,
+            "endpoint": endpoint,
+            "status": status,
+            "total_ms": round(elapsed * 1000, 3),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+        }))
+
+
+def render_metrics():
+    """
+    Retorna (conteúdo, content-type) no formato de texto do Prometheus.
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
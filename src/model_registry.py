@@ -0,0 +1,178 @@
+import os
+import json
+import uuid
+import shutil
+import logging
+import threading
+from pathlib import Path
+from time import monotonic, strftime
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Registro de versões do modelo de classificação em disco:
+
+        <root>/versions/<versão>/model.joblib
+        <root>/versions/<versão>/metadata.json
+        <root>/ACTIVE   (nome da versão ativa)
+
+    Os artefatos são salvos sem compressão para que os arrays numpy possam ser
+    carregados com memory-mapping e compartilhados entre os workers.
+    """
+
+    MODEL_FILE = "model.joblib"
+    METADATA_FILE = "metadata.json"
+
+    def __init__(self, root, mmap_mode="r"):
+        self.root = Path(root)
+        self.versions_dir = self.root / "versions"
+        self.active_file = self.root / "ACTIVE"
+        self.mmap_mode = mmap_mode
+
+    def publish(self, model, metadata=None, version=None, activate=True):
+        """
+        Salva uma nova versão do modelo e, opcionalmente, a torna ativa.
+        """
+        version = version or f"{strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        final_dir = self.versions_dir / version
+        if final_dir.exists():
+            raise ValueError(f"Versão já existe no registro: {version}")
+
+        # Escreve em um diretório temporário e renomeia: a versão aparece completa ou não aparece
+        tmp_dir = self.versions_dir / f".tmp-{uuid.uuid4().hex}"
+        tmp_dir.mkdir(parents=True)
+        try:
+            import joblib
+
+            joblib.dump(model, tmp_dir / self.MODEL_FILE)
+            with open(tmp_dir / self.METADATA_FILE, "w", encoding="utf-8") as f:
+                json.dump({"version": version, **(metadata or {})}, f, ensure_ascii=False, indent=2, default=str)
+            os.rename(tmp_dir, final_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Versão {version} publicada no registro de modelos")
+        if activate:
+            self.activate(version)
+        return version
+
+    def versions(self):
+        if not self.versions_dir.exists():
+            return []
+        return sorted(p.name for p in self.versions_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+    def metadata(self, version):
+        with open(self.versions_dir / version / self.METADATA_FILE, encoding="utf-8") as f:
+            return json.load(f)
+
+    def active_version(self):
+        try:
+            return self.active_file.read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def activate(self, version):
+        """
+        Marca `version` como ativa, substituindo o arquivo ACTIVE de forma atômica.
+        """
+        if not (self.versions_dir / version / self.MODEL_FILE).exists():
+            raise ValueError(f"Versão não encontrada no registro: {version}")
+        tmp_file = self.root / f".ACTIVE-{uuid.uuid4().hex}"
+        tmp_file.write_text(version, encoding="utf-8")
+        os.replace(tmp_file, self.active_file)
+        logger.info(f"Versão ativa do modelo: {version}")
+
+    def load(self, version):
+        import joblib  # Importado sob demanda (inicialização mais rápida da API)
+
+        return joblib.load(self.versions_dir / version / self.MODEL_FILE, mmap_mode=self.mmap_mode)
+
+
+class ActiveModel:
+    """
+    Mantém o modelo ativo do worker e o troca sem interromper requisições em andamento:
+    cada requisição obtém uma referência (versão, modelo) e a troca apenas substitui
+    essa referência. Mudanças no arquivo ACTIVE são verificadas a cada `check_interval`
+    segundos. Sem versão ativa no registro, usa `fallback_loader`.
+    """
+
+    def __init__(self, registry, fallback_loader=None, check_interval=2.0):
+        self.registry = registry
+        self.fallback_loader = fallback_loader
+        self.check_interval = check_interval
+        self._current = None
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _active_signature(self):
+        try:
+            stat = self.registry.active_file.stat()
+            return stat.st_mtime_ns, stat.st_ino
+        except FileNotFoundError:
+            return None
+
+    def get(self):
+        """
+        Retorna a tupla (versão, modelo) ativa.
+        """
+        if self._current is None:
+            self.reload()
+        elif self.check_interval >= 0 and monotonic() >= self._next_check:
+            self._next_check = monotonic() + self.check_interval
+            if self._active_signature() != self._signature:
+                try:
+                    self.reload()
+                except Exception as e:
+                    logger.error(f"Erro ao recarregar modelo, mantendo versão {self._current[0]}: {e}")
+        return self._current
+
+    @property
+    def version(self):
+        return self.get()[0]
+
+    def reload(self, version=None):
+        """
+        Carrega a versão ativa (ou ativa `version`) e a torna o modelo do worker.
+        """
+        with self._lock:
+            if version is not None:
+                self.registry.activate(version)
+            signature = self._active_signature()
+            active = self.registry.active_version()
+            if active is not None:
+                model = self.registry.load(active)
+            elif self.fallback_loader is not None:
+                active, model = "legacy", self.fallback_loader()
+            else:
+                raise FileNotFoundError(f"Nenhuma versão ativa em {self.registry.root}")
+
+            self._current = (active, model)
+            self._signature = signature
+            self._next_check = monotonic() + self.check_interval
+            logger.info(f"Modelo ativo no worker: {active}")
+            return self._current
+
+
+class FixedModel:
+    """
+    Modelo fixo, fora do registro (ex.: backend ONNX), com a mesma interface de ActiveModel.
+    """
+
+    def __init__(self, version, model):
+        self._current = (version, model)
+
+    def get(self):
+        return self._current
+
+    @property
+    def version(self):
+        return self._current[0]
+
+    def reload(self, version=None):
+        if version is not None:
+            raise ValueError(f"O modelo {self._current[0]} não usa o registro de versões")
+        return self._current
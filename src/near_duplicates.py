@@ -0,0 +1,139 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+from text_utils import clean_text
+
+SIGNATURE_BITS = 64
+
+
+def simhash(text: str) -> int:
+    """
+    Assinatura SimHash de 64 bits sobre unigramas e bigramas do texto limpo
+    (sem números, pontuação e maiúsculas). Textos parecidos geram assinaturas
+    com poucos bits diferentes.
+    """
+    return simhash_tokens(clean_text(text).split())
+
+
+def simhash_tokens(tokens) -> int:
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    import numpy as np
+
+    digests = b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in features)
+    # Cada linha: os 64 bits do hash de uma feature; o bit da assinatura vem da maioria
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    majority = bits.sum(axis=0) * 2 > len(features)
+    return int(np.packbits(majority, bitorder="little").view("<u8")[0])
+
+class NearDuplicateIndex:
+    """
+    Índice dos emails recentes já respondidos, para reaproveitar categoria e resposta
+    de emails quase idênticos (ex.: o mesmo modelo de notificação com outro número de caso).
+
+    Dois emails são considerados quase duplicados quando suas assinaturas SimHash
+    diferem em no máximo `max_distance` bits. A busca divide a assinatura em
+    `max_distance + 1` faixas: pelo princípio da casa dos pombos, qualquer assinatura
+    dentro da distância compartilha ao menos uma faixa idêntica, então apenas os
+    candidatos dessas faixas são comparados. O índice é local ao worker e mantém
+    os `max_items` emails mais recentes (LRU).
+    """
+
+    def __init__(self, threshold=0.95, max_items=10000, min_tokens=8, enabled=True):
+        self.enabled = enabled
+        self.max_distance = int(SIGNATURE_BITS * (1 - threshold))
+        self.max_items = max_items
+        self.min_tokens = min_tokens
+        self._bands = self.max_distance + 1
+        self._band_bits = -(-SIGNATURE_BITS // self._bands)  # Arredonda para cima
+        self._entries = OrderedDict()  # assinatura -> valor
+        self._buckets = [dict() for _ in range(self._bands)]  # faixa -> {valor da faixa: {assinaturas}}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            threshold=float(os.getenv("NEAR_DUP_THRESHOLD", 0.95)),
+            max_items=int(os.getenv("NEAR_DUP_MAX_ITEMS", 10000)),
+            min_tokens=int(os.getenv("NEAR_DUP_MIN_TOKENS", 8)),
+            enabled=os.getenv("NEAR_DUP_ENABLED", "True") == "True",
+        )
+
+    def _band_keys(self, signature):
+        mask = (1 << self._band_bits) - 1
+        return [(signature >> (band * self._band_bits)) & mask for band in range(self._bands)]
+
+    def signature(self, text):
+        """
+        Retorna a assinatura do texto, ou None se ele for curto demais para uma comparação confiável.
+        """
+        if not self.enabled:
+            return None
+        tokens = clean_text(text).split()
+        if len(tokens) < self.min_tokens:
+            return None
+        return simhash_tokens(tokens)
+
+    def lookup(self, text):
+        """
+        Retorna o valor armazenado para o email mais próximo dentro do limiar, ou None.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        with self._lock:
+            best, best_distance = None, self.max_distance + 1
+            for band, key in enumerate(self._band_keys(signature)):
+                for candidate in self._buckets[band].get(key, ()):
+                    distance = bin(signature ^ candidate).count("1")
+                    if distance < best_distance:
+                        best, best_distance = candidate, distance
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best)
+            return self._entries[best]
+
+    def add(self, text, value):
+        signature = self.signature(text)
+        if signature is None:
+            return
+        with self._lock:
+            if signature not in self._entries:
+                for band, key in enumerate(self._band_keys(signature)):
+                    self._buckets[band].setdefault(key, set()).add(signature)
+            self._entries[signature] = value
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.max_items:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, signature):
+        del self._entries[signature]
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band][key]
+            bucket.discard(signature)
+            if not bucket:
+                del self._buckets[band][key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for bucket in self._buckets:
+                bucket.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "items": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "max_distance": self.max_distance,
+            }
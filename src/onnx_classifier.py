@@ -0,0 +1,115 @@
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Arquivos gerados por src/export_onnx.py
+QUANTIZED_FILE = "model.int8.onnx"
+FLOAT_FILE = "model.onnx"
+
+
+class OnnxClassifier:
+    """
+    Classificador BERT exportado para ONNX (quantizado em int8), executado com onnxruntime na CPU.
+
+    Expõe a mesma interface usada pela API para os modelos do scikit-learn
+    (`predict`, `predict_proba` e `classes_`). Cada lote é tokenizado com padding
+    dinâmico (até o maior texto do lote, limitado a `max_length`), e os textos são
+    ordenados por tamanho antes de formar os lotes para reduzir o padding.
+    A sessão do onnxruntime é criada uma vez por processo (worker do gunicorn).
+    """
+
+    def __init__(self, model_dir, model_file=QUANTIZED_FILE, max_length=128, batch_size=32, threads=0):
+        self.model_dir = Path(model_dir)
+        self.model_file = model_file
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.threads = threads
+        self._session = None
+        self._session_pid = None
+        self._tokenizer = None
+        self._lock = threading.Lock()
+        self.classes_ = np.arange(self._num_labels())
+
+    @classmethod
+    def from_env(cls, base_dir):
+        return cls(
+            model_dir=os.getenv("ONNX_MODEL_DIR", os.path.join(base_dir, "models", "email-classifier-onnx")),
+            model_file=os.getenv("ONNX_MODEL_FILE", QUANTIZED_FILE),
+            max_length=int(os.getenv("ONNX_MAX_LENGTH", 128)),
+            batch_size=int(os.getenv("ONNX_BATCH_SIZE", 32)),
+            threads=int(os.getenv("ONNX_THREADS", 0)),
+        )
+
+    def _num_labels(self):
+        config_path = self.model_dir / "config.json"
+        if config_path.exists():
+            with open(config_path, encoding="utf-8") as f:
+                return len(json.load(f).get("id2label", {})) or 2
+        return 2
+
+    def _load(self):
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise RuntimeError("Backend ONNX requer os pacotes onnxruntime e transformers") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        session = ort.InferenceSession(
+            str(self.model_dir / self.model_file), options, providers=["CPUExecutionProvider"]
+        )
+        if self._tokenizer is None:
+            self._tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        logger.info(f"Modelo ONNX carregado: {self.model_dir / self.model_file}")
+        return session
+
+    @property
+    def session(self):
+        # Sessões do onnxruntime não devem ser herdadas via fork: uma por processo
+        with self._lock:
+            if self._session is None or self._session_pid != os.getpid():
+                self._session = self._load()
+                self._session_pid = os.getpid()
+            return self._session
+
+    def load(self):
+        """
+        Carrega sessão e tokenizer antecipadamente (evita latência na primeira requisição).
+        """
+        self.session
+        return self
+
+    def _logits(self, texts):
+        session = self.session
+        input_names = {i.name for i in session.get_inputs()}
+        encoded = self._tokenizer(
+            texts, padding="longest", truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        feed = {name: value.astype(np.int64) for name, value in encoded.items() if name in input_names}
+        return session.run(None, feed)[0]
+
+    def predict_proba(self, texts):
+        texts = list(texts)
+        # Ordena por tamanho para que cada lote tenha textos de comprimento parecido
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        probabilities = np.empty((len(texts), len(self.classes_)), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            logits = self._logits([texts[i] for i in indices])
+            logits = logits - logits.max(axis=1, keepdims=True)
+            exp = np.exp(logits)
+            probabilities[indices] = exp / exp.sum(axis=1, keepdims=True)
+        return probabilities
+
+    def predict(self, texts):
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
+
@@ -0,0 +1,211 @@
+import io
+import os
+import logging
+import threading
+import multiprocessing
+from dataclasses import dataclass, field
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+# pdfplumber é importado apenas quando um PDF é extraído (inicialização mais rápida)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExtractionResult:
+    """
+    Resultado da extração de um PDF.
+    """
+    text: str = ""
+    page_count: int = 0
+    pages_read: int = 0
+    truncated: bool = False
+    timed_out: bool = False
+    page_seconds: list = field(default_factory=list)
+
+
+class PageTimingStats:
+    """
+    Acumula o tempo de extração por página (contagem, soma e máximo), por processo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds):
+        with self._lock:
+            self.pages += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pages": self.pages,
+                "total_seconds": self.total_seconds,
+                "max_seconds": self.max_seconds,
+                "mean_seconds": self.total_seconds / self.pages if self.pages else 0.0,
+            }
+
+
+page_timings = PageTimingStats()
+
+
+# Extrai o texto de um intervalo de páginas, uma única vez por página.
+# Fica no nível do módulo para poder ser enviada a um pool de processos.
+def extract_pages(data, page_numbers):
+    import pdfplumber
+
+    results = []
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for number in page_numbers:
+            start = perf_counter()
+            text = pdf.pages[number].extract_text() or ""
+            results.append((number, text, perf_counter() - start))
+    return results
+
+
+class PdfExtractor:
+    """
+    Extrai texto de PDFs respeitando limites de páginas, caracteres e tempo.
+    Apenas as primeiras páginas importam para a classificação, então a extração
+    para assim que um dos limites é atingido. Com `workers > 0`, as páginas são
+    distribuídas em um pool de processos.
+
+    Sem workers, o tempo limite é verificado entre as páginas: uma página patológica
+    não é interrompida. Com workers, o limite é rígido: ao esgotar o tempo, os processos
+    do pool são encerrados e o próximo PDF usa um pool novo.
+    """
+
+    def __init__(self, max_pages=10, max_chars=20000, timeout=10.0, workers=0, pages_per_task=2):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.workers = workers
+        self.pages_per_task = max(1, pages_per_task)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_pages=int(os.getenv("PDF_MAX_PAGES", 10)),
+            max_chars=int(os.getenv("PDF_MAX_CHARS", 20000)),
+            timeout=float(os.getenv("PDF_TIMEOUT", 10)),
+            workers=int(os.getenv("PDF_WORKERS", 0)),
+            pages_per_task=int(os.getenv("PDF_PAGES_PER_TASK", 2)),
+        )
+
+    def _get_pool(self):
+        # Criado sob demanda, com "spawn" para não herdar threads do worker web
+        with self._lock:
+            if self._pool is None:
+                context = multiprocessing.get_context("spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._pool
+
+    def extract(self, source):
+        """
+        Extrai o texto de `source` (bytes ou objeto com read()).
+        """
+        import pdfplumber
+
+        data = source if isinstance(source, (bytes, bytearray)) else source.read()
+        deadline = perf_counter() + self.timeout
+        result = ExtractionResult()
+        parts = []
+        chars = 0
+
+        with pdfplumber.open(io.BytesIO(data)) as pdf:
+            result.page_count = len(pdf.pages)
+            numbers = list(range(min(result.page_count, self.max_pages)))
+            result.truncated = len(numbers) < result.page_count
+
+            if self.workers > 0 and numbers:
+                pages = self._extract_parallel(data, numbers, deadline, result)
+            else:
+                pages = self._extract_serial(pdf, numbers, deadline, result)
+
+            for number, text, seconds in pages:
+                page_timings.record(seconds)
+                result.page_seconds.append(seconds)
+                result.pages_read += 1
+                if text:
+                    parts.append(text)
+                    chars += len(text) + 1
+                if chars >= self.max_chars:
+                    result.truncated = result.truncated or result.pages_read < result.page_count
+                    break
+
+        result.text = " ".join(parts)[:self.max_chars]
+        if result.timed_out:
+            logger.warning(f"Extração de PDF interrompida por tempo após {result.pages_read} página(s)")
+        logger.debug(f"PDF extraído: {result.pages_read}/{result.page_count} páginas em {sum(result.page_seconds):.3f}s")
+        return result
+
+    # As funções abaixo são geradores: o consumidor interrompe a iteração ao
+    # atingir o limite de caracteres, evitando extrair as páginas restantes
+    def _extract_serial(self, pdf, numbers, deadline, result):
+        for number in numbers:
+            if perf_counter() > deadline:
+                result.timed_out = True
+                return
+            start = perf_counter()
+            text = pdf.pages[number].extract_text() or ""
+            yield number, text, perf_counter() - start
+
+    def _extract_parallel(self, data, numbers, deadline, result):
+        chunks = [numbers[i:i + self.pages_per_task] for i in range(0, len(numbers), self.pages_per_task)]
+        pool = self._get_pool()
+        futures = [pool.submit(extract_pages, data, chunk) for chunk in chunks]
+        retried = False
+        try:
+            # Resultados consumidos na ordem das páginas
+            index = 0
+            while index < len(futures):
+                try:
+                    pages = futures[index].result(timeout=max(0.0, deadline - perf_counter()))
+                except BrokenProcessPool:
+                    # Pool encerrado por um tempo esgotado em outra requisição (ou processo morto):
+                    # as tarefas restantes são reenviadas, uma única vez, a um pool novo
+                    if retried:
+                        raise
+                    retried = True
+                    self._discard_pool(pool)
+                    pool = self._get_pool()
+                    futures[index:] = [pool.submit(extract_pages, data, chunk) for chunk in chunks[index:]]
+                    continue
+                yield from pages
+                index += 1
+        except FutureTimeoutError:
+            result.timed_out = True
+            # cancel() não interrompe tarefas já em execução: o pool é descartado
+            self._discard_pool(pool)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _discard_pool(self, pool):
+        """
+        Encerra os processos de `pool` (inclusive tarefas travadas) e o tira de uso.
+        """
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        # O executor não expõe os processos (terminate_workers só existe no Python 3.14+)
+        processes = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        logger.warning(f"Pool de extração de PDF descartado ({len(processes)} processo(s) encerrados)")
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -1,8 +1,11 @@
 import pandas as pd
 import os
-import re
+import hashlib
 import logging
+import argparse
 from pathlib import Path
+from text_utils import RE_NUMBERS, RE_SPACES, RE_PUNCTUATION, clean_text  # noqa: F401
+from dataset_store import DatasetStore, open_dataset, DATASET_DIR
 
 # Configuração do logger
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -13,27 +16,65 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 OUTPUT_PATH = DATA_DIR / "email_training_data.csv"
 
+# Depois de convertido (src/dataset_store.py), o dataset recebe os acréscimos em Parquet
+def default_output_path() -> Path:
+    return DATASET_DIR if DatasetStore(DATASET_DIR).exists() else OUTPUT_PATH
+
+# Tamanho dos blocos lidos de fontes externas
+CHUNK_SIZE = 50000
+
 # Verifica se a pasta de dados existe, caso contrário, cria
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-# Compilação de regex para melhor performance
-RE_NUMBERS = re.compile(r'\d+')
-RE_SPACES = re.compile(r'\s+')
-RE_PUNCTUATION = re.compile(r'[^\w\s]')
+def clean_text_series(texts: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de clean_text para uma coluna inteira (mesmo resultado).
+    """
+    texts = texts.fillna("").astype(str).str.lower()
+    texts = texts.str.replace(RE_NUMBERS, '', regex=True)
+    texts = texts.str.replace(RE_SPACES, ' ', regex=True)
+    texts = texts.str.replace(RE_PUNCTUATION, '', regex=True)
+    return texts.str.strip()
+
+def content_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    Hash do conteúdo de cada linha (texto limpo + label), usado na deduplicação.
+    """
+    keys = df["text"] + "\t" + df["label"].astype(str)
+    return keys.map(lambda key: hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest())
 
-def clean_text(text: str) -> str:
+class HashIndex:
     """
-    Limpa e normaliza o texto:
-    - Converte para minúsculas
-    - Remove números
-    - Remove espaços extras
-    - Remove pontuação
+    Índice persistente dos hashes das linhas já presentes no dataset
+    (arquivo texto ao lado do CSV ou do diretório Parquet, um hash por linha, apenas com acréscimos).
+    Se o índice não existir, é reconstruído lendo o dataset em blocos.
     """
-    text = text.lower()
-    text = RE_NUMBERS.sub('', text)  # Remove números
-    text = RE_SPACES.sub(' ', text)  # Remove espaços extras
-    text = RE_PUNCTUATION.sub('', text)  # Remove pontuação
-    return text.strip()
+
+    def __init__(self, dataset_path: Path):
+        self.dataset_path = Path(dataset_path)
+        self.path = self.dataset_path.with_suffix(".hashes")
+        self.hashes = set()
+
+    def load(self, chunksize: int = CHUNK_SIZE):
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.hashes = {line.strip() for line in f if line.strip()}
+            return self
+        dataset = open_dataset(self.dataset_path)
+        if dataset.exists():
+            logger.info(f"Reconstruindo índice de hashes de {self.dataset_path}")
+            for chunk in dataset.iter_batches(["text", "label"], chunksize):
+                self.add(content_hashes(chunk))
+        return self
+
+    def add(self, hashes):
+        hashes = list(hashes)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(f"{h}\n" for h in hashes)
+        self.hashes.update(hashes)
+
+    def __len__(self):
+        return len(self.hashes)
 
 def get_training_data() -> pd.DataFrame:
     """
@@ -54,36 +95,85 @@ def get_training_data() -> pd.DataFrame:
         ("Você já experimentou o novo restaurante da esquina?", 0),
     ]
     df = pd.DataFrame(data, columns=["text", "label"])
-    df["text"] = df["text"].apply(clean_text)
+    df["text"] = clean_text_series(df["text"])
     return df
 
-def append_to_dataset(new_data: pd.DataFrame, output_path: Path) -> pd.DataFrame:
+def append_to_dataset(new_data: pd.DataFrame, output_path: Path, index: HashIndex = None) -> pd.DataFrame:
+    """
+    Acrescenta ao final do dataset as linhas de `new_data` (já limpas) que ainda não
+    estão no índice de hashes, sem reler nem reescrever os dados existentes. Em um
+    dataset Parquet (diretório), as linhas novas formam uma nova parte.
+    Retorna as linhas efetivamente adicionadas.
     """
-    Adiciona novos dados ao dataset existente (se o arquivo já existir).
+    index = index if index is not None else HashIndex(output_path).load()
+    new_data = new_data[["text", "label"]]
+    hashes = content_hashes(new_data)
+    is_new = ~hashes.isin(index.hashes) & ~hashes.duplicated()
+    added = new_data[is_new]
+    if not added.empty:
+        if output_path.suffix == ".csv":
+            added.to_csv(output_path, mode="a", header=not output_path.exists(), index=False)
+        else:
+            DatasetStore(output_path).append(added)
+        index.add(hashes[is_new])
+    return added
+
+def iter_source_chunks(source: Path, text_column: str = "text", label_column: str = "label",
+                       chunksize: int = CHUNK_SIZE):
     """
-    if output_path.exists():
-        existing_data = pd.read_csv(output_path)
-        updated_data = pd.concat([existing_data, new_data], ignore_index=True).drop_duplicates()
+    Lê uma fonte externa (CSV ou Parquet) em blocos e devolve DataFrames limpos com as colunas text e label.
+    """
+    if Path(source).suffix == ".csv":
+        chunks = pd.read_csv(source, usecols=[text_column, label_column], chunksize=chunksize,
+                             dtype={text_column: str}, keep_default_na=False)
     else:
-        updated_data = new_data
-    return updated_data
+        chunks = open_dataset(source).iter_batches([text_column, label_column], chunksize)
+    for chunk in chunks:
+        df = pd.DataFrame({"text": clean_text_series(chunk[text_column]), "label": chunk[label_column]})
+        yield df[df["text"] != ""]
 
-def prepare_training_data():
-    try:
-        # Obter dados de exemplo e normalizar
-        df = get_training_data()
+def ingest_source(source: Path, output_path: Path = None, text_column: str = "text",
+                  label_column: str = "label", chunksize: int = CHUNK_SIZE) -> int:
+    """
+    Ingestão em blocos de uma fonte grande: limpa, deduplica e acrescenta ao dataset.
+    Retorna o número de linhas adicionadas.
+    """
+    output_path = Path(output_path) if output_path is not None else default_output_path()
+    index = HashIndex(output_path).load(chunksize)
+    total = 0
+    for chunk in iter_source_chunks(source, text_column, label_column, chunksize):
+        total += len(append_to_dataset(chunk, output_path, index))
+        logger.info(f"{total} registro(s) novo(s) adicionados")
+    return total
 
-        # Adicionar ao dataset existente (evitando duplicatas)
-        df = append_to_dataset(df, OUTPUT_PATH)
+def prepare_training_data(source: Path = None, text_column: str = "text", label_column: str = "label",
+                          chunksize: int = CHUNK_SIZE):
+    try:
+        output_path = default_output_path()
+        if source is not None:
+            # Fonte externa, lida em blocos
+            added = ingest_source(source, output_path, text_column, label_column, chunksize)
+        else:
+            # Obter dados de exemplo e normalizar; adicionar ao dataset existente (evitando duplicatas)
+            added = len(append_to_dataset(get_training_data(), output_path))
 
-        # Salvar como CSV
-        df.to_csv(OUTPUT_PATH, index=False)
-        logger.info(f"Dados de treinamento salvos em: {OUTPUT_PATH}")
-        logger.info(f"Total de registros: {len(df)}")
-        logger.info(f"Distribuição das labels:\n{df['label'].value_counts()}")
+        logger.info(f"Dados de treinamento salvos em: {output_path}")
+        logger.info(f"Registros adicionados: {added}")
+        # O dataset pode ter linhas repetidas anteriores ao índice: total de linhas e de textos únicos
+        logger.info(f"Total de registros: {open_dataset(output_path).num_rows()}")
+        logger.info(f"Registros únicos: {len(HashIndex(output_path).load())}")
 
     except Exception as e:
         logger.error(f"Erro ao preparar dados de treinamento: {e}", exc_info=True)
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prepara o dataset de treinamento")
+    parser.add_argument("--source", type=Path, default=None, help="CSV ou Parquet externo com emails rotulados")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    return parser.parse_args(argv)
+
 if __name__ == '__main__':
-    prepare_training_data()
\ No newline at end of file
+    args = parse_args()
+    prepare_training_data(args.source, args.text_column, args.label_column, args.chunksize)
\ No newline at end of file
@@ -0,0 +1,225 @@
+import os
+import sys
+import json
+import random
+import logging
+import threading
+from pathlib import Path
+from time import perf_counter, strftime
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class StackSampler(threading.Thread):
+    """
+    Profiler por amostragem: a cada `interval` segundos registra a pilha da thread alvo.
+    O resultado fica no formato "folded" (uma pilha por linha, com o número de amostras),
+    lido por flamegraph.pl, speedscope e similares.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class Capture:
+    """
+    Perfil de uma requisição em andamento (ver RequestProfiler.start).
+    """
+
+    def __init__(self, trigger, profiler):
+        self.trigger = trigger
+        self.profiler = profiler
+        self.started = perf_counter()
+
+
+class RequestProfiler:
+    """
+    Perfil sob demanda de requisições.
+
+    Uma requisição é perfilada quando é forçada (cabeçalho de administração) ou sorteada
+    com probabilidade `sample_rate`. O perfil (cProfile ou amostragem de pilha) é salvo,
+    com os tempos por etapa e metadados da requisição sem o conteúdo do email, quando a
+    requisição foi forçada ou levou mais de `slow_ms`. Os arquivos ficam em `directory`,
+    que guarda no máximo `max_profiles` perfis: os mais antigos são apagados (anel).
+
+    Desativado, `enabled` é False e quem decora as rotas não deve envolver a função
+    (nenhum custo por requisição).
+    """
+
+    MODES = ("cprofile", "sampling")
+
+    def __init__(self, directory, enabled=False, sample_rate=0.0, slow_ms=1000.0, max_profiles=50,
+                 mode="cprofile", interval=0.005):
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de profiling inválido: {mode} (use {' ou '.join(self.MODES)})")
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.max_profiles = max_profiles
+        self.mode = mode
+        self.interval = interval
+        # Um único cProfile por processo (no Python 3.12+ dois perfis simultâneos falham)
+        self._cprofile_lock = threading.Lock()
+        self._ring_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, base_dir):
+        return cls(
+            directory=os.getenv("PROFILE_DIR", os.path.join(base_dir, "profiles")),
+            enabled=os.getenv("PROFILE_ENABLED", "False") == "True",
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", 0)),
+            slow_ms=float(os.getenv("PROFILE_SLOW_MS", 1000)),
+            max_profiles=int(os.getenv("PROFILE_MAX_FILES", 50)),
+            mode=os.getenv("PROFILE_MODE", "cprofile"),
+            interval=float(os.getenv("PROFILE_SAMPLING_INTERVAL", 0.005)),
+        )
+
+    def start(self, forced=False):
+        """
+        Inicia o perfil da requisição atual se ela foi forçada ou sorteada. Retorna a Capture
+        a ser passada para `finish()`, ou None se a requisição não será perfilada.
+        """
+        if forced:
+            trigger = "forced"
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            trigger = "sampled"
+        else:
+            return None
+
+        if self.mode == "sampling":
+            profiler = StackSampler(threading.get_ident(), self.interval)
+            profiler.start()
+            return Capture(trigger, profiler)
+
+        if not self._cprofile_lock.acquire(blocking=False):
+            logger.debug("Outra requisição já está sendo perfilada; perfil ignorado")
+            return None
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except Exception:
+            self._cprofile_lock.release()
+            raise
+        return Capture(trigger, profiler)
+
+    def finish(self, capture, stages=None, metadata=None):
+        """
+        Encerra o perfil e o salva se a requisição foi forçada ou lenta.
+        Retorna o identificador do perfil salvo, ou None.
+        """
+        elapsed_ms = (perf_counter() - capture.started) * 1000
+        if isinstance(capture.profiler, StackSampler):
+            capture.profiler.stop()
+        else:
+            capture.profiler.disable()
+            self._cprofile_lock.release()
+
+        if capture.trigger != "forced" and elapsed_ms < self.slow_ms:
+            return None
+        try:
+            return self._save(capture, elapsed_ms, stages or {}, metadata or {})
+        except OSError as e:
+            logger.warning(f"Erro ao salvar o perfil da requisição: {e}")
+            return None
+
+    def _save(self, capture, elapsed_ms, stages, metadata):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = f"{strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{random.getrandbits(32):08x}"
+        summary = {
+            "profile_id": profile_id,
+            "trigger": capture.trigger,
+            "slow": elapsed_ms >= self.slow_ms,
+            "mode": "sampling" if isinstance(capture.profiler, StackSampler) else "cprofile",
+            "elapsed_ms": round(elapsed_ms, 3),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()},
+            "request": metadata,
+        }
+
+        if isinstance(capture.profiler, StackSampler):
+            summary["profile_file"] = f"{profile_id}.folded"
+            summary["samples"] = sum(capture.profiler.samples.values())
+            (self.directory / summary["profile_file"]).write_text(capture.profiler.folded(), encoding="utf-8")
+        else:
+            import pstats
+
+            summary["profile_file"] = f"{profile_id}.prof"
+            stats = pstats.Stats(capture.profiler)
+            stats.dump_stats(self.directory / summary["profile_file"])
+            summary["top_functions"] = top_functions(stats)
+
+        # O JSON é gravado por último: sua presença indica um perfil completo
+        with open(self.directory / f"{profile_id}.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        self._trim()
+        logger.info(f"Perfil da requisição salvo: {profile_id} ({capture.trigger}, {elapsed_ms:.1f}ms)")
+        return profile_id
+
+    def _summaries(self):
+        # Resumos salvos, do mais antigo para o mais recente. O diretório pode ser compartilhado
+        # pelos workers, então arquivos podem sumir durante a varredura
+        summaries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                summaries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        return [path for _, path in sorted(summaries)]
+
+    def _trim(self):
+        # Mantém apenas os `max_profiles` perfis mais recentes
+        with self._ring_lock:
+            summaries = self._summaries()
+            for summary in summaries[:max(0, len(summaries) - self.max_profiles)]:
+                for path in self.directory.glob(f"{summary.stem}.*"):
+                    path.unlink(missing_ok=True)
+
+    def list_profiles(self):
+        """
+        Resumos dos perfis salvos, do mais recente para o mais antigo.
+        """
+        profiles = []
+        for path in reversed(self._summaries()):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Apagado pelo anel ou ainda sendo gravado
+        return profiles
+
+
+def top_functions(stats, limit=15):
+    """
+    Funções com maior tempo acumulado em um pstats.Stats.
+    """
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {"function": f"{name} ({os.path.basename(filename)}:{line})", "calls": calls,
+         "total_ms": round(total * 1000, 3), "cumulative_ms": round(cumulative * 1000, 3)}
+        for (filename, line, name), (_, calls, total, cumulative, _) in rows
+    ]
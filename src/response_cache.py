@@ -0,0 +1,195 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from time import time
+
+from cachelib import BaseCache, FileSystemCache
+
+logger = logging.getLogger(__name__)
+
+
+# Normaliza o conteúdo do email para que variações triviais gerem a mesma chave
+def normalize_content(content: str) -> str:
+    content = unicodedata.normalize("NFC", content)
+    return " ".join(content.split()).lower()
+
+
+class LRUMemoryCache(BaseCache):
+    """
+    Cache em memória com expiração (TTL) e remoção LRU, seguro para threads.
+    Usado como primeiro nível, local a cada worker.
+    """
+
+    def __init__(self, threshold: int = 1024, default_timeout: int = 300):
+        BaseCache.__init__(self, default_timeout)
+        self._cache = OrderedDict()
+        self._threshold = threshold
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _normalize_timeout(self, timeout):
+        timeout = BaseCache._normalize_timeout(self, timeout)
+        if timeout > 0:
+            timeout = time() + timeout
+        return timeout
+
+    def get(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires and expires < time():
+                del self._cache[key]
+                self.evictions += 1
+                return None
+            self._cache.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        if self._threshold <= 0:
+            return False
+        expires = self._normalize_timeout(timeout)
+        with self._lock:
+            self._cache[key] = (expires, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._threshold:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def delete(self, key):
+        with self._lock:
+            return self._cache.pop(key, None) is not None
+
+    def has(self, key):
+        return self.get(key) is not None
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+        return True
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class CountingFileSystemCache(FileSystemCache):
+    """
+    FileSystemCache do cachelib que contabiliza os itens removidos na poda
+    (expirados ou mais antigos quando o limite de arquivos é atingido).
+    """
+
+    evictions = 0
+
+    def _prune(self):
+        before = self._file_count
+        super()._prune()
+        self.evictions += max(0, before - self._file_count)
+
+
+class ResponseCache:
+    """
+    Cache de respostas geradas pelo LLM em dois níveis:
+    - memória (LRU + TTL), local ao worker;
+    - disco (cachelib.FileSystemCache), compartilhado por todos os workers do gunicorn.
+
+    Apenas respostas geradas com sucesso devem ser armazenadas; os contadores
+    de hits, misses e remoções são por worker.
+    """
+
+    def __init__(self, cache_dir=None, ttl=86400, max_items=10000, memory_items=1024, enabled=True):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.memory = LRUMemoryCache(threshold=memory_items, default_timeout=ttl)
+        self.disk = CountingFileSystemCache(cache_dir, threshold=max_items, default_timeout=ttl) if cache_dir else None
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Cria o cache a partir das variáveis de ambiente RESPONSE_CACHE_*.
+        Um RESPONSE_CACHE_DIR vazio desativa o nível em disco.
+        """
+        default_dir = os.path.join(tempfile.gettempdir(), "autou-response-cache")
+        return cls(
+            cache_dir=os.getenv("RESPONSE_CACHE_DIR", default_dir) or None,
+            ttl=int(os.getenv("RESPONSE_CACHE_TTL", 86400)),
+            max_items=int(os.getenv("RESPONSE_CACHE_MAX_ITEMS", 10000)),
+            memory_items=int(os.getenv("RESPONSE_CACHE_MEMORY_ITEMS", 1024)),
+            enabled=os.getenv("RESPONSE_CACHE_ENABLED", "True") == "True",
+        )
+
+    @staticmethod
+    def make_key(content, model, prompt):
+        """
+        Gera a chave a partir do conteúdo normalizado, do modelo e do prompt de sistema.
+        """
+        payload = json.dumps([normalize_content(content), model, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, key):
+        return self.lookup(key)[0]
+
+    def lookup(self, key):
+        """
+        Retorna (valor, nível), onde nível é "memory", "disk" ou None (miss).
+        """
+        if not self.enabled:
+            return None, None
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value, "memory"
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self._count("disk_hits")
+                self.memory.set(key, value)
+                return value, "disk"
+        self._count("misses")
+        return None, None
+
+    def set(self, key, value):
+        if not self.enabled or value is None:
+            return
+        self._count("sets")
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        """
+        Retorna os contadores do cache (por worker).
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["memory_evictions"] = self.memory.evictions
+        stats["disk_evictions"] = self.disk.evictions if self.disk is not None else 0
+        stats["evictions"] = stats["memory_evictions"] + stats["disk_evictions"]
+        stats["memory_items"] = len(self.memory)
+        stats["enabled"] = self.enabled
+        return stats
@@ -0,0 +1,20 @@
+import re
+
+# Compilação de regex para melhor performance
+RE_NUMBERS = re.compile(r'\d+')
+RE_SPACES = re.compile(r'\s+')
+RE_PUNCTUATION = re.compile(r'[^\w\s]')
+
+def clean_text(text: str) -> str:
+    """
+    Limpa e normaliza o texto:
+    - Converte para minúsculas
+    - Remove números
+    - Remove espaços extras
+    - Remove pontuação
+    """
+    text = text.lower()
+    text = RE_NUMBERS.sub('', text)  # Remove números
+    text = RE_SPACES.sub(' ', text)  # Remove espaços extras
+    text = RE_PUNCTUATION.sub('', text)  # Remove pontuação
+    return text.strip()
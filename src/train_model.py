@@ -1,13 +1,17 @@
 import pandas as pd
 import joblib
 import logging
+import argparse
 from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from config import MODEL_PATH, BASE_DIR
+from model_registry import ModelRegistry
+from compiled_model import CompiledModel
+from dataset_store import open_dataset
 
 # Configuração do logger
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -17,13 +21,25 @@ logger = logging.getLogger(__name__)
 TEST_SIZE = 0.2
 RANDOM_STATE = 42
 
+# Registro de versões lido pela API (recarregado sem reiniciar os workers)
+REGISTRY_DIR = BASE_DIR / "models/registry"
+
+# Forma compilada do pipeline (src/compiled_model.py), publicada no registro no lugar do pipeline
+COMPILED_MODEL_PATH = Path(MODEL_PATH).with_name("model.compiled.joblib")
+
+# Modo incremental: vetorizador sem estado e classes fixas (0 = improdutivo, 1 = produtivo)
+CLASSES = [0, 1]
+N_FEATURES = 2 ** 18
+CHUNK_SIZE = 50000
+
 # Função para avaliar o modelo
 def evaluate_model(model, X_test, y_test):
     """
     Avalia o modelo usando métricas de classificação.
     """
-    y_pred = model.predict(X_test)
-    
+    return evaluate_model_predictions(y_test, model.predict(X_test))
+
+def evaluate_model_predictions(y_test, y_pred):
     metrics = {
         "Acurácia": accuracy_score(y_test, y_pred),
         "Precisão": precision_score(y_test, y_pred, average='weighted'),
@@ -36,15 +52,44 @@ def evaluate_model(model, X_test, y_test):
 
     return metrics
 
+def export_compiled(model, X_verify, path=None):
+    """
+    Compila o pipeline em um CompiledModel, confere se as predições são idênticas
+    às do pipeline em X_verify e salva o artefato (por padrão em COMPILED_MODEL_PATH).
+    Retorna o modelo compilado.
+    """
+    path = path or COMPILED_MODEL_PATH
+    compiled = CompiledModel.from_pipeline(model)
+    mismatches = int((compiled.predict(X_verify) != model.predict(X_verify)).sum()) if len(X_verify) else 0
+    if mismatches:
+        raise ValueError(f"Modelo compilado diverge do pipeline em {mismatches} de {len(X_verify)} emails")
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(compiled, path)
+    logger.info(f"Modelo compilado ({compiled.n_features} termos, predições idênticas em {len(X_verify)} emails) "
+                f"salvo em: {path}")
+    return compiled
+
+def compile_for_serving(model, X_verify):
+    """
+    Forma publicada no registro: o CompiledModel (mais rápido e menor) ou, se a compilação
+    não for possível, o próprio pipeline. Retorna (modelo, formato).
+    """
+    try:
+        return export_compiled(model, X_verify), "compiled"
+    except ValueError as e:
+        logger.warning(f"Modelo não compilado, publicando o pipeline: {e}")
+        return model, "pipeline"
+
 # Função principal
-def train_model():
+def train_model(compile_model=True):
     try:
-        # Carregar dados
-        train_data_path = BASE_DIR / "data/email_training_data.csv"
-        if not train_data_path.exists():
-            raise FileNotFoundError(f"Arquivo de dados não encontrado: {train_data_path}")
+        # Carregar dados (apenas as colunas usadas)
+        dataset = open_dataset()
+        if not dataset.exists():
+            raise FileNotFoundError(f"Arquivo de dados não encontrado: {dataset.path}")
 
-        train_data = pd.read_csv(train_data_path)
+        train_data = dataset.read(["text", "label"])
         logger.info(f"Total de registros carregados: {len(train_data)}")
 
         # Verificar balanceamento das classes
@@ -78,15 +123,139 @@ def train_model():
 
         # Avaliar modelo
         logger.info("Avaliando modelo no conjunto de teste...")
-        evaluate_model(model, X_test, y_test)
+        metrics = evaluate_model(model, X_test, y_test)
 
         # Salvar modelo
-        MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+        Path(MODEL_PATH).parent.mkdir(parents=True, exist_ok=True)
         joblib.dump(model, MODEL_PATH)
         logger.info(f"Modelo salvo em: {MODEL_PATH}")
 
+        # Publica a forma compilada (mais rápida e menor); se não for possível, o próprio pipeline
+        served, model_format = compile_for_serving(model, train_data["text"]) if compile_model else (model, "pipeline")
+
+        # Publicar nova versão no registro (a API troca o modelo ativo automaticamente)
+        version = ModelRegistry(REGISTRY_DIR).publish(
+            served, metadata={"metrics": metrics, "train_size": len(X_train), "format": model_format}
+        )
+        logger.info(f"Versão publicada no registro: {version}")
+
     except Exception as e:
         logger.error(f"Erro ao treinar o modelo: {e}", exc_info=True)
 
+def build_incremental_model(n_features=N_FEATURES):
+    """
+    Pipeline para treino incremental: o HashingVectorizer não precisa ver o corpus
+    (sem vocabulário), então os blocos podem ser processados um a um com partial_fit.
+    """
+    vectorizer = HashingVectorizer(
+        n_features=n_features,
+        alternate_sign=False,  # MultinomialNB exige valores não negativos
+        ngram_range=(1, 2),
+        norm="l2",
+    )
+    return Pipeline([
+        ("hashing", vectorizer),
+        ("clf", MultinomialNB(alpha=0.1)),
+    ])
+
+def load_incremental_base(registry):
+    """
+    Retorna (modelo, linhas já vistas) da versão ativa, se ela foi treinada no modo incremental.
+    """
+    version = registry.active_version()
+    if version is None:
+        return None, 0
+    training = registry.metadata(version).get("training", {})
+    if training.get("mode") != "incremental":
+        return None, 0
+    logger.info(f"Continuando a partir da versão {version} ({training['rows_seen']} registros vistos)")
+    return joblib.load(registry.versions_dir / version / registry.MODEL_FILE), training["rows_seen"]
+
+def train_incremental(source=None, chunksize=CHUNK_SIZE, from_scratch=False):
+    """
+    Treina (ou atualiza) o modelo lendo os dados em blocos, com memória limitada.
+
+    Sem `source`, lê o dataset principal a partir da última linha já vista pela versão
+    ativa (o dataset só recebe acréscimos). Com `source`, usa apenas os emails desse CSV ou Parquet.
+    As métricas são calculadas de forma progressiva: cada bloco é avaliado antes de ser
+    usado no treino. Com `source`, é necessária uma versão ativa incremental (não há modelo
+    novo treinado só com esses emails). O modelo é publicado apenas no registro; retorna a
+    versão publicada, ou None se não houver registros novos (ou em caso de erro).
+    """
+    try:
+        registry = ModelRegistry(REGISTRY_DIR)
+        model, rows_seen = (None, 0) if from_scratch else load_incremental_base(registry)
+        if model is None:
+            if source is not None:
+                # Um modelo novo treinado só com os emails de --source substituiria o modelo ativo
+                raise ValueError("--source atualiza um modelo incremental existente, mas a versão ativa não foi "
+                                 "treinada no modo incremental; treine antes com o dataset principal (sem --source)")
+            model = build_incremental_model()
+        vectorizer, clf = model.named_steps["hashing"], model.named_steps["clf"]
+
+        dataset = open_dataset(source)
+        if not dataset.exists():
+            raise FileNotFoundError(f"Arquivo de dados não encontrado: {dataset.path}")
+        # No dataset principal, começa na primeira linha que a versão ativa ainda não viu
+        # (no Parquet, as partes e row groups anteriores nem são lidos)
+        start = rows_seen if source is None else 0
+
+        y_true, y_pred, new_rows = [], [], 0
+        for chunk in dataset.iter_batches(["text", "label"], chunksize, start=start):
+            if chunk.empty:
+                continue
+            X = vectorizer.transform(chunk["text"])
+            if hasattr(clf, "classes_"):
+                y_true.extend(chunk["label"].tolist())
+                y_pred.extend(clf.predict(X).tolist())
+            clf.partial_fit(X, chunk["label"], classes=CLASSES)
+            new_rows += len(chunk)
+            logger.info(f"{new_rows} registro(s) novo(s) processados")
+
+        if new_rows == 0:
+            logger.info("Nenhum registro novo; modelo mantido")
+            return None
+
+        metrics = {}
+        if y_true:
+            logger.info("Avaliação progressiva (cada bloco avaliado antes do treino):")
+            metrics = evaluate_model_predictions(y_true, y_pred)
+
+        # Publicado apenas no registro: MODEL_PATH guarda o pipeline TF-IDF de train_model
+        # (usado por --export-compiled e como modelo padrão da API)
+        training = {
+            "mode": "incremental",
+            # Só o dataset principal avança o ponteiro de leitura
+            "rows_seen": rows_seen + new_rows if source is None else rows_seen,
+            "new_rows": new_rows,
+            "source": str(dataset.path),
+        }
+        version = registry.publish(model, metadata={"metrics": metrics, "train_size": new_rows, "training": training})
+        logger.info(f"Versão publicada no registro: {version}")
+        return version
+
+    except Exception as e:
+        logger.error(f"Erro ao treinar o modelo: {e}", exc_info=True)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Treina o modelo de classificação de emails")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Treina em blocos com HashingVectorizer + partial_fit, continuando a versão ativa")
+    parser.add_argument("--source", default=None, help="CSV ou Parquet apenas com os novos emails rotulados (modo incremental)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--from-scratch", action="store_true", help="Ignora a versão ativa no modo incremental")
+    parser.add_argument("--no-compile", action="store_true", help="Publica o pipeline do scikit-learn sem compilar")
+    parser.add_argument("--export-compiled", action="store_true",
+                        help="Apenas compila o modelo de MODEL_PATH (sem treinar) e salva em COMPILED_MODEL_PATH")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    args = parse_args()
+    if args.export_compiled:
+        dataset = open_dataset()
+        texts = dataset.read(["text"])["text"] if dataset.exists() else pd.Series([], dtype=str)
+        export_compiled(joblib.load(MODEL_PATH), texts)
+    elif args.incremental:
+        train_incremental(args.source, args.chunksize, args.from_scratch)
+    else:
+        train_model(compile_model=not args.no_compile)
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Busca de hiperparâmetros do pipeline TF-IDF + MultinomialNB com validação cruzada.
+
+Os candidatos são avaliados em paralelo (todos os núcleos) e o pipeline usa
+`memory=` para guardar em disco os TF-IDF já ajustados: candidatos que diferem
+apenas nos parâmetros do classificador reaproveitam a vetorização do mesmo fold.
+O melhor modelo é avaliado no conjunto de teste e publicado no registro, na forma
+compilada (src/compiled_model.py) como em train_model.py.
+
+    python src/tune_model.py --cv 5
+"""
+import os
+import json
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from joblib import Memory
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from train_model import REGISTRY_DIR, TEST_SIZE, RANDOM_STATE, evaluate_model, compile_for_serving
+from dataset_store import open_dataset
+from model_registry import ModelRegistry
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Espaço de busca: parâmetros do TF-IDF (caros, em cache) e do classificador (baratos)
+PARAM_GRID = {
+    "tfidf__max_df": [0.9, 0.95, 1.0],
+    "tfidf__min_df": [1, 2],
+    "tfidf__ngram_range": [(1, 1), (1, 2)],
+    "clf__alpha": [0.01, 0.1, 0.5, 1.0],
+}
+
+SCORING = {"f1": "f1_weighted", "accuracy": "accuracy"}
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "autou-tuning-cache")
+
+
+def build_pipeline(memory=None):
+    return Pipeline([
+        ("tfidf", TfidfVectorizer()),
+        ("clf", MultinomialNB()),
+    ], memory=memory)
+
+
+def json_params(params):
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in params.items()}
+
+
+def candidate_report(search, fold_size):
+    """
+    Uma linha por candidato: qualidade na validação cruzada e latência de inferência
+    por documento (tempo médio de score do fold de validação dividido pelo seu tamanho).
+    """
+    results = search.cv_results_
+    rows = []
+    for i, params in enumerate(results["params"]):
+        rows.append({
+            "rank": int(results["rank_test_f1"][i]),
+            "params": json_params(params),
+            "f1": float(results["mean_test_f1"][i]),
+            "f1_std": float(results["std_test_f1"][i]),
+            "accuracy": float(results["mean_test_accuracy"][i]),
+            "fit_seconds": float(results["mean_fit_time"][i]),
+            "latency_us_per_doc": float(results["mean_score_time"][i]) / fold_size * 1e6,
+        })
+    return sorted(rows, key=lambda row: (row["rank"], row["latency_us_per_doc"]))
+
+
+def single_document_latency(model, texts, repeat=200):
+    """
+    Latência média (µs) de uma predição com um único documento, como na API.
+    """
+    texts = list(texts)[:repeat]
+    start = perf_counter()
+    for text in texts:
+        model.predict([text])
+    return (perf_counter() - start) / len(texts) * 1e6
+
+
+def tune_model(cv=5, n_jobs=-1, cache_dir=DEFAULT_CACHE_DIR, report_path=None, activate=True, compile_model=True,
+               param_grid=PARAM_GRID):
+    train_data = open_dataset().read(["text", "label"])
+    logger.info(f"Total de registros carregados: {len(train_data)}")
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        train_data["text"], train_data["label"], test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=train_data["label"]
+    )
+
+    # Número de folds limitado pela menor classe no conjunto de treino
+    folds = max(2, min(cv, int(y_train.value_counts().min())))
+    if folds != cv:
+        logger.warning(f"Usando {folds} folds (classe minoritária com poucos exemplos)")
+
+    memory = Memory(cache_dir, verbose=0)
+    search = GridSearchCV(
+        build_pipeline(memory),
+        param_grid,
+        scoring=SCORING,
+        refit="f1",
+        cv=StratifiedKFold(n_splits=folds, shuffle=True, random_state=RANDOM_STATE),
+        n_jobs=n_jobs,
+        error_score="raise",
+    )
+    start = perf_counter()
+    search.fit(X_train, y_train)
+    logger.info(f"Busca concluída em {perf_counter() - start:.1f}s ({len(search.cv_results_['params'])} candidatos)")
+
+    candidates = candidate_report(search, fold_size=len(X_train) / folds)
+    for row in candidates:
+        logger.info(
+            f"#{row['rank']:<3} f1={row['f1']:.4f}±{row['f1_std']:.4f} acc={row['accuracy']:.4f} "
+            f"{row['latency_us_per_doc']:.1f}µs/doc {row['params']}"
+        )
+
+    # O pipeline final não deve depender do diretório de cache
+    model = search.best_estimator_
+    model.set_params(memory=None)
+    logger.info(f"Melhores parâmetros: {search.best_params_}")
+    logger.info("Avaliando melhor modelo no conjunto de teste...")
+    metrics = evaluate_model(model, X_test, y_test)
+    latency = single_document_latency(model, X_test)
+    logger.info(f"Latência de inferência (1 documento): {latency:.1f}µs")
+
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"candidates": candidates, "test_metrics": metrics, "latency_us": latency}, f,
+                      ensure_ascii=False, indent=2)
+        logger.info(f"Relatório salvo em: {report_path}")
+
+    # Mesma forma publicada por train_model: compilada, ou o pipeline se não for possível
+    served, model_format = compile_for_serving(model, train_data["text"]) if compile_model else (model, "pipeline")
+
+    version = ModelRegistry(REGISTRY_DIR).publish(served, metadata={
+        "metrics": metrics,
+        "train_size": len(X_train),
+        "format": model_format,
+        "tuning": {
+            "best_params": json_params(search.best_params_),
+            "cv_f1": float(search.best_score_),
+            "folds": folds,
+            "latency_us": latency,
+        },
+    }, activate=activate)
+    logger.info(f"Versão publicada no registro: {version}")
+    return version
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros do classificador")
+    parser.add_argument("--cv", type=int, default=5, help="Número de folds da validação cruzada")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Processos paralelos (-1 = todos os núcleos)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Cache das etapas de vetorização")
+    parser.add_argument("--report", type=Path, default=None, help="Arquivo JSON com o resultado de cada candidato")
+    parser.add_argument("--no-activate", action="store_true", help="Publica sem ativar a nova versão")
+    parser.add_argument("--no-compile", action="store_true", help="Publica o pipeline do scikit-learn sem compilar")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    tune_model(args.cv, args.n_jobs, args.cache_dir, args.report, activate=not args.no_activate,
+               compile_model=not args.no_compile)
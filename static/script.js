@@ -1,7 +1,8 @@
 // Constantes e Configurações
 const API_CONFIG = {
     ENDPOINTS: {
-        PROCESS: '/process'
+        PROCESS: '/process',
+        STREAM: '/process/stream'
     },
     TIMEOUT: 30000,
     MAX_RETRIES: 3,
@@ -66,9 +67,24 @@ const Utils = {
 
     generateRequestId() {
         return `${Date.now()}-${Math.random().toString(36).substr(2, 9)}`;
+    },
+
+    // Segundos do cabeçalho Retry-After (padrão: 1)
+    retryAfterSeconds(response) {
+        const seconds = parseInt(response.headers.get('Retry-After'), 10);
+        return Number.isFinite(seconds) && seconds > 0 ? seconds : 1;
     }
 };
 
+// Servidor sobrecarregado (429): não deve ser repetido antes do Retry-After
+class OverloadedError extends Error {
+    constructor(retryAfter) {
+        super(`Servidor sobrecarregado. Tente novamente em ${retryAfter}s.`);
+        this.name = 'OverloadedError';
+        this.retryAfter = retryAfter;
+    }
+}
+
 // Gerenciador de Notificações Melhorado
 const NotificationManager = {
     timeouts: {},
@@ -182,7 +198,13 @@ const ApiService = {
 
             if (!response.ok) {
                 if (response.status === 429) {
-                    throw new Error('Muitas requisições. Tente novamente mais tarde.');
+                    // Servidor sobrecarregado: espera o tempo indicado em Retry-After antes de tentar de novo
+                    const retryAfter = Utils.retryAfterSeconds(response);
+                    if (retryCount < API_CONFIG.MAX_RETRIES) {
+                        await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+                        return this.sendRequest(content, retryCount + 1);
+                    }
+                    throw new OverloadedError(retryAfter);
                 }
                 throw new Error(`Erro no servidor: ${response.statusText}`);
             }
@@ -201,6 +223,10 @@ const ApiService = {
                 throw new Error('Operação cancelada');
             }
 
+            if (error instanceof OverloadedError) {
+                throw error;
+            }
+
             if (retryCount < API_CONFIG.MAX_RETRIES) {
                 await new Promise(resolve => setTimeout(resolve, API_CONFIG.RETRY_DELAY * (retryCount + 1)));
                 return this.sendRequest(content, retryCount + 1);
@@ -211,6 +237,82 @@ const ApiService = {
     }
 };
 
+// Streaming da resposta via Server-Sent Events
+const StreamService = {
+    // Converte um bloco SSE ("event: ...\ndata: ...") em { event, data }
+    parseEvent(block) {
+        let event = 'message';
+        const data = [];
+        for (const line of block.split('\n')) {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) data.push(line.slice(5).trim());
+        }
+        return { event, data: data.length ? JSON.parse(data.join('\n')) : {} };
+    },
+
+    // Envia o email e chama onCategory/onToken conforme os eventos chegam.
+    // Sem novas tentativas: o timeout vale apenas até o primeiro evento.
+    async sendRequest(content, { onCategory, onToken }) {
+        const controller = state.abortController || new AbortController();
+        const timer = setTimeout(() => controller.abort(), API_CONFIG.TIMEOUT);
+
+        try {
+            const response = await fetch(window.location.origin + API_CONFIG.ENDPOINTS.STREAM, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream',
+                    'X-Request-ID': Utils.generateRequestId()
+                },
+                body: JSON.stringify({ email: content }),
+                signal: controller.signal
+            });
+
+            if (!response.ok) {
+                if (response.status === 429) {
+                    throw new OverloadedError(Utils.retryAfterSeconds(response));
+                }
+                const result = await response.json().catch(() => ({}));
+                throw new Error(result.error || `Erro no servidor: ${response.statusText}`);
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let reply = '';
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                clearTimeout(timer);
+                buffer += decoder.decode(value, { stream: true });
+
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const { event, data } = this.parseEvent(buffer.slice(0, boundary));
+                    buffer = buffer.slice(boundary + 2);
+
+                    if (event === 'category') onCategory(data.category, data.degraded);
+                    else if (event === 'token') {
+                        reply += data.token;
+                        onToken(data.token, reply);
+                    }
+                    else if (event === 'error') throw new Error(data.error);
+                }
+            }
+            return reply;
+
+        } catch (error) {
+            if (error.name === 'AbortError') {
+                throw new Error('Tempo de resposta esgotado');
+            }
+            throw error;
+        } finally {
+            clearTimeout(timer);
+        }
+    }
+};
+
 // Processamento Principal Melhorado
 async function processEmail() {
     if (state.isProcessing) return;
@@ -226,10 +328,22 @@ async function processEmail() {
         }
 
         StateManager.setLoading(true);
-        const result = await ApiService.sendRequest(content);
-        
-        NotificationManager.success('Email processado com sucesso!');
-        showResponseModal(result.category, result.response);
+        let degradedResponse = false;
+        await StreamService.sendRequest(content, {
+            onCategory: (category, degraded) => {
+                degradedResponse = Boolean(degraded);
+                showResponseModal(
+                    category, degraded ? 'Resposta indisponível no momento (servidor sobrecarregado). Tente novamente em instantes.' : ''
+                );
+            },
+            onToken: (token, reply) => { elements.suggestedResponse.value = reply; }
+        });
+
+        if (degradedResponse) {
+            NotificationManager.error('Email classificado, mas a resposta sugerida não pôde ser gerada agora.');
+        } else {
+            NotificationManager.success('Email processado com sucesso!');
+        }
 
     } catch (error) {
         NotificationManager.error(error.message);
@@ -3,11 +3,27 @@ import os
 import unittest
 from io import BytesIO
 import logging
+import tempfile
+import time
+from unittest import mock
+
+# Cache de respostas isolado para os testes
+os.environ.setdefault('RESPONSE_CACHE_DIR', tempfile.mkdtemp())
+
+# Registro de modelos vazio: a API usa o modelo de MODEL_PATH (versão "legacy")
+os.environ.setdefault('MODEL_REGISTRY_DIR', tempfile.mkdtemp())
+
+# LLM apontando para uma porta local fechada: as chamadas falham rapidamente e usam o fallback
+os.environ.setdefault('OPENAI_BASE_URL', 'http://127.0.0.1:9')
+os.environ.setdefault('LLM_MAX_RETRIES', '0')
+
+# Sem limite por cliente: todas as requisições dos testes vêm do mesmo endereço
+os.environ.setdefault('RATE_LIMIT_PER_SECOND', '0')
 
 # Adicionar o diretório src ao sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from src.app import app
+from src.app import app, response_cache, LLM_MODEL, SYSTEM_PROMPT
 
 class TestApp(unittest.TestCase):
     
@@ -146,5 +162,395 @@ class TestApp(unittest.TestCase):
         app.config['MODEL_PATH'] = original_model_path
         self.logger.info("Teste de tratamento de erro no modelo concluído com sucesso.")
 
+    def test_batch_classification_preserves_order(self):
+        """
+        Testa se o endpoint em lote classifica todos os emails e mantém a ordem da entrada.
+        """
+        emails = [
+            'Preciso de suporte técnico urgente. O sistema está fora do ar desde às 14h.',
+            {'id': 'abc', 'email': 'Feliz aniversário! Espero que tenha um dia maravilhoso.'},
+            '',
+        ]
+
+        response = self.app.post('/process/batch', json=emails)
+        self.assertEqual(response.status_code, 200)
+        results = response.json['results']
+        self.assertEqual(response.json['count'], 3)
+        self.assertEqual([item['index'] for item in results], [0, 1, 2])
+        self.assertIn('category', results[0])
+        self.assertIn('confidence', results[0])
+        self.assertNotIn('response', results[0])
+        self.assertEqual(results[1]['id'], 'abc')
+        self.assertIn('error', results[2])
+        self.logger.info("Teste de classificação em lote concluído com sucesso.")
+
+    def test_batch_ndjson_with_response(self):
+        """
+        Testa o envio de um lote em NDJSON com geração de resposta habilitada.
+        """
+        body = '{"email": "Solicito atualização sobre o caso aberto."}\n"Vamos marcar um café?"\n'
+
+        response = self.app.post('/process/batch?generate_response=true', data=body,
+                                 content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['count'], 2)
+        for item in response.json['results']:
+            self.assertIsInstance(item['response'], str)
+        self.logger.info("Teste de lote NDJSON concluído com sucesso.")
+
+    def test_batch_invalid_payload(self):
+        """
+        Testa a resposta da API para lotes vazios ou malformados.
+        """
+        self.assertEqual(self.app.post('/process/batch', json=[]).status_code, 400)
+        self.assertEqual(self.app.post('/process/batch', json={'emails': 'x'}).status_code, 400)
+        response = self.app.post('/process/batch', data='{quebrado', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        self.logger.info("Teste de lote inválido concluído com sucesso.")
+
+    def test_cached_response_is_reused(self):
+        """
+        Testa se uma resposta já armazenada no cache é reutilizada sem chamar o LLM.
+        """
+        content = 'Solicito atualização sobre o caso aberto na semana passada.'
+        response_cache.set(response_cache.make_key(content, LLM_MODEL, SYSTEM_PROMPT), 'Resposta em cache')
+
+        response = self.app.post('/process/batch?generate_response=true', json=['  ' + content.upper()])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['results'][0]['response'], 'Resposta em cache')
+
+        stats = self.app.get('/cache/stats')
+        self.assertEqual(stats.status_code, 200)
+        self.assertGreaterEqual(stats.json['hits'], 1)
+        self.logger.info("Teste de cache de respostas concluído com sucesso.")
+
+    def test_async_mode_returns_job(self):
+        """
+        Testa o modo assíncrono: categoria imediata e resposta consultada em /jobs/<id>.
+        """
+        email_produtivo = {
+            'email': 'Preciso agendar uma reunião para discutir o projeto XYZ.',
+            'async': True
+        }
+
+        response = self._post_email(email_produtivo)
+        self.assertEqual(response.status_code, 202)
+        self.assertIn('category', response.json)
+        job_id = response.json['job_id']
+
+        for _ in range(50):
+            job = self.app.get(f'/jobs/{job_id}')
+            if job.json['status'] in ('done', 'failed'):
+                break
+            time.sleep(0.1)
+        self.assertEqual(job.status_code, 200)
+        self.assertEqual(job.json['status'], 'done')
+        self.assertIsInstance(job.json['response'], str)
+        self.logger.info("Teste de modo assíncrono concluído com sucesso.")
+
+    def test_async_rejects_callback_outside_allowlist(self):
+        """
+        Testa se callbacks para hosts não permitidos ou sem https são recusados com 400.
+        """
+        from src.app import job_runner
+
+        with mock.patch.object(job_runner, 'callback_allowed_hosts', frozenset({'hooks.exemplo.com'})), \
+                mock.patch.object(job_runner, 'submit') as submit:
+            for url in ('http://hooks.exemplo.com/job', 'https://169.254.169.254/latest', 'https://localhost:8080/'):
+                response = self._post_email({'email': 'Preciso de suporte.', 'async': True, 'callback_url': url})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json)
+            submit.assert_not_called()
+        self.logger.info("Teste de callback não permitido concluído com sucesso.")
+
+    def test_unknown_job(self):
+        """
+        Testa a consulta de um job inexistente.
+        """
+        response = self.app.get('/jobs/inexistente')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.json)
+
+    def test_stream_sends_category_first(self):
+        """
+        Testa se o streaming envia a categoria como primeiro evento e termina com "done".
+        """
+        email_produtivo = {
+            'email': 'O relatório mensal de vendas está pronto para revisão.'
+        }
+
+        response = self.app.post('/process/stream', json=email_produtivo)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.mimetype == 'text/event-stream')
+
+        events = [block.split('\n')[0] for block in response.get_data(as_text=True).strip().split('\n\n')]
+        self.assertEqual(events[0], 'event: category')
+        self.assertIn('event: token', events)
+        self.assertEqual(events[-1], 'event: done')
+        self.logger.info("Teste de streaming concluído com sucesso.")
+
+    def test_interrupted_stream_is_not_reused(self):
+        """
+        Testa se uma resposta interrompida no meio do streaming não é guardada para emails quase idênticos.
+        """
+        from src.app import llm_client, near_duplicates
+
+        def broken_stream(*args, **kwargs):
+            yield 'Resposta '
+            raise ConnectionError('conexão perdida')
+
+        email = {'email': 'Solicito o reenvio do boleto do contrato 5521 com vencimento no dia 30 deste mês, por favor.'}
+        with mock.patch.object(llm_client, 'stream_chat', side_effect=broken_stream):
+            response = self.app.post('/process/stream', json=email)
+            body = response.get_data(as_text=True)
+        self.assertIn('Resposta ', body)
+        self.assertTrue(body.strip().endswith('data: {}'))
+        self.assertIsNone(near_duplicates.lookup(email['email']))
+
+        with mock.patch.object(llm_client, 'stream_chat', return_value=iter(['Resposta ', 'completa'])):
+            self.app.post('/process/stream', json=email).get_data()
+        self.assertEqual(near_duplicates.lookup(email['email'])['response'], 'Resposta completa')
+        self.logger.info("Teste de streaming interrompido concluído com sucesso.")
+
+    def test_stream_invalid_input(self):
+        """
+        Testa se o streaming rejeita emails vazios antes de abrir o fluxo de eventos.
+        """
+        response = self.app.post('/process/stream', json={'email': ' '})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json)
+
+    def test_response_includes_model_version(self):
+        """
+        Testa se a resposta de /process informa a versão do modelo usada.
+        """
+        response = self._post_email({'email': 'Solicito atualização sobre o caso aberto.'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('model_version', response.json)
+        self.logger.info("Teste de versão do modelo concluído com sucesso.")
+
+    def test_admin_model_routes(self):
+        """
+        Testa as rotas de administração do modelo, com e sem token.
+        """
+        self.assertEqual(self.app.post('/admin/model/reload').status_code, 403)
+
+        with mock.patch.dict(os.environ, {'ADMIN_TOKEN': 'segredo'}):
+            headers = {'X-Admin-Token': 'segredo'}
+            response = self.app.post('/admin/model/reload', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('active_version', response.json)
+
+            response = self.app.post('/admin/model/reload', headers=headers, json={'version': 'inexistente'})
+            self.assertEqual(response.status_code, 404)
+
+            response = self.app.get('/admin/model', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('versions', response.json)
+
+    def test_metrics_endpoint(self):
+        """
+        Testa se /metrics expõe as latências por etapa no formato do Prometheus.
+        """
+        self._post_email({'email': 'Preciso de suporte técnico urgente.'})
+
+        response = self.app.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn('email_stage_duration_seconds_bucket{le="0.001",stage="classification"}', body)
+        self.assertIn('email_stage_duration_seconds_count{stage="llm"}', body)
+        self.assertIn('email_requests_total{endpoint="/process",status="200"}', body)
+        self.assertIn('email_fallbacks_total', body)
+        self.logger.info("Teste de métricas concluído com sucesso.")
+
+    def test_cascade_escalates_uncertain_emails(self):
+        """
+        Testa a cascata: emails abaixo do limiar de confiança são enviados ao classificador pesado.
+        """
+        import numpy as np
+
+        heavy = mock.Mock(classes_=np.array([0, 1]))
+        heavy.predict_proba.side_effect = lambda texts: np.tile([0.1, 0.9], (len(texts), 1))
+
+        with mock.patch('src.app.cascade_model', heavy), mock.patch('src.app.CASCADE_THRESHOLD', 1.01):
+            response = self._post_email({'email': 'Preciso de suporte técnico urgente.'})
+            self.assertEqual(response.json['tier'], 'transformer')
+            self.assertEqual(response.json['category'], 1)
+
+            response = self.app.post('/process/batch', json=['Feliz aniversário!', 'Solicito atualização.'])
+            self.assertEqual([item['tier'] for item in response.json['results']], ['transformer'] * 2)
+
+        with mock.patch('src.app.cascade_model', heavy), mock.patch('src.app.CASCADE_THRESHOLD', 0.0):
+            response = self._post_email({'email': 'Preciso de suporte técnico urgente.'})
+            self.assertEqual(response.json['tier'], 'fast')
+
+        body = self.app.get('/metrics').get_data(as_text=True)
+        self.assertIn('email_classifier_tier_total{tier="transformer"}', body)
+        self.assertIn('email_stage_duration_seconds_count{stage="cascade_transformer"}', body)
+        self.logger.info("Teste da cascata de classificadores concluído com sucesso.")
+
+    def test_near_duplicate_reuses_reply(self):
+        """
+        Testa se um email quase idêntico a outro já respondido reaproveita categoria e resposta.
+        """
+        template = "Prezado cliente, o chamado número {} foi atualizado em {}. Acesse o portal para acompanhar a solicitação."
+        with mock.patch('src.app.generate_response', return_value='Resposta gerada') as generate:
+            first = self._post_email({'email': template.format(1234, '10/05/2024')})
+            self.assertNotIn('near_duplicate', first.json)
+
+            second = self._post_email({'email': template.format(9876, '22/07/2024')})
+            self.assertEqual(second.status_code, 200)
+            self.assertTrue(second.json['near_duplicate'])
+            self.assertEqual(second.json['response'], 'Resposta gerada')
+            self.assertEqual(second.json['category'], first.json['category'])
+            self.assertEqual(generate.call_count, 1)
+
+        stats = self.app.get('/cache/stats').json
+        self.assertGreaterEqual(stats['near_duplicates']['hits'], 1)
+        self.logger.info("Teste de emails quase idênticos concluído com sucesso.")
+
+    def test_warmup_endpoint(self):
+        """
+        Testa se /warmup carrega o modelo e informa o tempo de cada etapa.
+        """
+        response = self.app.post('/warmup')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['status'], 'ok')
+        self.assertIn('model', response.json['timings_ms'])
+        self.assertIn('model_version', response.json)
+        self.logger.info("Teste de warm-up concluído com sucesso.")
+
+    def test_llm_input_is_preprocessed(self):
+        """
+        Testa se o histórico citado é removido antes do LLM e se a economia de tokens é informada.
+        """
+        content = 'Preciso de acesso ao sistema de faturamento.\n\nOn Mon, May 10, 2024, Suporte wrote:\n> Mensagem anterior longa'
+        with mock.patch('src.app.generate_response', return_value='Resposta gerada') as generate:
+            response = self._post_email({'email': content})
+        self.assertEqual(response.status_code, 200)
+        generate.assert_called_once_with('Preciso de acesso ao sistema de faturamento.')
+        self.assertGreater(response.json['llm_input']['saved_tokens'], 0)
+        self.logger.info("Teste de pré-processamento do email concluído com sucesso.")
+
+    def test_asgi_process(self):
+        """
+        Testa o modo ASGI: mesmo contrato de /process, com o LLM chamado pelo cliente assíncrono.
+        """
+        from starlette.testclient import TestClient
+        from src import asgi
+
+        content = f'Solicito a segunda via do boleto do contrato {time.time_ns()}.'
+        with mock.patch.object(asgi.llm_client, 'chat', new=mock.AsyncMock(return_value='Resposta assíncrona')):
+            with TestClient(asgi.app) as client:
+                response = client.post('/process', json={'email': content})
+                empty = client.post('/process', json={'email': ' '})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['response'], 'Resposta assíncrona')
+        self.assertIn('category', response.json())
+        self.assertIn('llm_input', response.json())
+        self.assertEqual(empty.status_code, 400)
+        self.logger.info("Teste do modo ASGI concluído com sucesso.")
+
+    def test_admission_control(self):
+        """
+        Testa a degradação (categoria sem resposta) com o LLM saturado e o 429 com Retry-After com a fila cheia.
+        """
+        from src.app import admission
+        with mock.patch.object(admission, 'max_llm_in_flight', 0), \
+                mock.patch('src.app.generate_response') as generate:
+            response = self._post_email({'email': f'Preciso da segunda via da fatura {time.time_ns()}.'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json['degraded'])
+        self.assertIsNone(response.json['response'])
+        self.assertIn('category', response.json)
+        generate.assert_not_called()
+
+        with mock.patch.object(admission, 'max_in_flight', 0), mock.patch.object(admission, 'max_queue', 0):
+            response = self._post_email({'email': 'Preciso de suporte.'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response.headers['Retry-After']), 1)
+        self.logger.info("Teste de controle de admissão concluído com sucesso.")
+
+    def test_asgi_admission_control(self):
+        """
+        Testa se o modo ASGI aplica a mesma degradação, fila de admissão e limite por cliente da versão Flask.
+        """
+        from starlette.testclient import TestClient
+        from src import asgi
+
+        admission = asgi.core.admission
+        chat = mock.AsyncMock(return_value='Resposta assíncrona')
+        with mock.patch.object(asgi.llm_client, 'chat', new=chat), TestClient(asgi.app) as client:
+            with mock.patch.object(admission, 'max_llm_in_flight', 0):
+                response = client.post('/process', json={'email': f'Preciso da segunda via da fatura {time.time_ns()}.'})
+                stream = client.post('/process/stream', json={'email': f'Preciso do boleto {time.time_ns()}.'})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.json()['degraded'])
+            self.assertIsNone(response.json()['response'])
+            self.assertIn('"degraded": true', stream.text)
+            chat.assert_not_called()
+
+            with mock.patch.object(admission, 'max_in_flight', 0), mock.patch.object(admission, 'max_queue', 0):
+                response = client.post('/process', json={'email': 'Preciso de suporte.'})
+            self.assertEqual(response.status_code, 429)
+            self.assertGreaterEqual(int(response.headers['Retry-After']), 1)
+
+            with mock.patch.object(asgi.core, 'rate_limiter', asgi.core.RateLimiter(rate=0.001, burst=1)):
+                first = client.post('/process', json={'email': ''}, headers={'X-Forwarded-For': '198.51.100.1'})
+                second = client.post('/process', json={'email': ''}, headers={'X-Forwarded-For': '198.51.100.2'})
+            self.assertEqual(first.status_code, 400)
+            self.assertEqual(second.status_code, 429)
+
+        self.assertEqual(admission.stats()['in_flight'], 0)
+        self.assertEqual(admission.stats()['llm_in_flight'], 0)
+        self.logger.info("Teste de controle de admissão no modo ASGI concluído com sucesso.")
+
+    def test_rate_limit_ignores_spoofed_forwarded_for(self):
+        """
+        Testa se trocar o X-Forwarded-For a cada requisição não renova o limite por cliente.
+        """
+        from src.app import RateLimiter
+
+        with mock.patch('src.app.rate_limiter', RateLimiter(rate=0.001, burst=1)):
+            first = self.app.post('/process', json={'email': ''}, headers={'X-Forwarded-For': '198.51.100.1'})
+            second = self.app.post('/process', json={'email': ''}, headers={'X-Forwarded-For': '198.51.100.2'})
+        self.assertEqual(first.status_code, 400)
+        self.assertEqual(second.status_code, 429)
+        self.assertIn('Retry-After', second.headers)
+        self.logger.info("Teste de X-Forwarded-For forjado concluído com sucesso.")
+
+    def test_request_profiling(self):
+        """
+        Testa o perfil forçado pelo cabeçalho de administração: perfil salvo, tempos por etapa e email omitido.
+        """
+        import json
+        import src.app as app_module
+        from src.profiling import RequestProfiler
+
+        directory = tempfile.mkdtemp()
+        profiler = RequestProfiler(directory, enabled=True, slow_ms=60000)
+        with mock.patch.object(app_module, 'profiler', profiler), mock.patch.dict(os.environ, {'ADMIN_TOKEN': 'segredo'}):
+            def handler():
+                app_module.read_email_content()
+                return app_module.jsonify({'category': 'Produtivo'})
+
+            view = app_module.profiled(handler)
+            headers = {'X-Profile': '1', 'X-Admin-Token': 'segredo'}
+            with app.test_request_context('/process', method='POST', json={'email': 'Fatura confidencial'}, headers=headers):
+                app_module.start_request()
+                response = view()
+            with app.test_request_context('/process', method='POST', json={'email': 'Fatura confidencial'}):
+                self.assertNotIn('X-Profile-Id', view().headers)  # Sem o cabeçalho e abaixo do limite
+
+        profile_id = response.headers['X-Profile-Id']
+        with open(os.path.join(directory, f'{profile_id}.json'), encoding='utf-8') as f:
+            summary = json.load(f)
+        self.assertEqual(summary['trigger'], 'forced')
+        self.assertIn('decode', summary['stages_ms'])
+        self.assertEqual(summary['request']['email_chars'], len('Fatura confidencial'))
+        self.assertTrue(os.path.exists(os.path.join(directory, summary['profile_file'])))
+        self.assertNotIn('confidencial', json.dumps(summary))
+        self.logger.info("Teste de perfil de requisição concluído com sucesso.")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
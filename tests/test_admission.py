@@ -0,0 +1,112 @@
+import sys
+import os
+import time
+import threading
+import unittest
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.admission import (AdmissionController, AdmissionRejected, RateLimiter,
+                           PRIORITY_CLASSIFY, PRIORITY_REPLY)
+
+class TestAdmissionController(unittest.TestCase):
+
+    def _wait_queued(self, controller, count):
+        deadline = time.monotonic() + 2
+        while sum(controller.stats()["queued"].values()) < count and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def test_queue_full_rejects_immediately(self):
+        """
+        Testa se, com as vagas ocupadas e a fila cheia, a recusa é imediata e informa o Retry-After.
+        """
+        controller = AdmissionController(max_in_flight=1, max_queue=0)
+        ticket = controller.acquire()
+
+        start = time.monotonic()
+        with self.assertRaises(AdmissionRejected) as context:
+            controller.acquire()
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(context.exception.reason, "queue_full")
+        self.assertGreaterEqual(context.exception.retry_after, 1)
+
+        controller.release(ticket)
+        controller.release(controller.acquire())
+        self.assertEqual(controller.stats()["rejected"], {"queue_full": 1})
+
+    def test_queue_timeout(self):
+        """
+        Testa se a espera na fila é limitada por queue_timeout.
+        """
+        controller = AdmissionController(max_in_flight=1, max_queue=5, queue_timeout=0.05)
+        controller.acquire()
+        with self.assertRaises(AdmissionRejected) as context:
+            controller.acquire()
+        self.assertEqual(context.exception.reason, "queue_timeout")
+        self.assertEqual(controller.stats()["queued"], {"classify": 0, "reply": 0})
+
+    def test_classify_before_reply(self):
+        """
+        Testa se classificações na fila são admitidas antes de gerações de resposta mais antigas.
+        """
+        controller = AdmissionController(max_in_flight=1, max_queue=10)
+        ticket = controller.acquire()
+        order = []
+
+        def request(name, priority):
+            admitted = controller.acquire(priority)
+            order.append(name)
+            controller.release(admitted)
+
+        threads = [threading.Thread(target=request, args=("reply", PRIORITY_REPLY))]
+        threads[0].start()
+        self._wait_queued(controller, 1)
+        threads.append(threading.Thread(target=request, args=("classify", PRIORITY_CLASSIFY)))
+        threads[1].start()
+        self._wait_queued(controller, 2)
+
+        controller.release(ticket)
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(order, ["classify", "reply"])
+        self.assertEqual(controller.stats()["in_flight"], 0)
+
+    def test_llm_saturation(self):
+        """
+        Testa se, sem vagas para o LLM, a reserva falha sem esperar (degradação).
+        """
+        controller = AdmissionController(max_llm_in_flight=1)
+        self.assertTrue(controller.try_acquire_llm())
+        self.assertFalse(controller.try_acquire_llm())
+        controller.release_llm()
+        self.assertTrue(controller.try_acquire_llm())
+        self.assertEqual(controller.stats()["degraded"], 1)
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_burst_and_refill(self):
+        """
+        Testa o limite de rajada por cliente e a recarga ao longo do tempo.
+        """
+        limiter = RateLimiter(rate=20, burst=2)
+        limiter.acquire("a")
+        limiter.acquire("a")
+        with self.assertRaises(AdmissionRejected) as context:
+            limiter.acquire("a")
+        self.assertEqual(context.exception.reason, "rate_limit")
+
+        limiter.acquire("b")  # Outro cliente tem o próprio limite
+        time.sleep(0.06)
+        limiter.acquire("a")
+
+    def test_disabled(self):
+        """
+        Testa se rate=0 desativa o limite.
+        """
+        limiter = RateLimiter(rate=0, burst=1)
+        for _ in range(10):
+            limiter.acquire("a")
+
+if __name__ == '__main__':
+    unittest.main()
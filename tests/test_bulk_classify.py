@@ -0,0 +1,95 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import joblib
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src import bulk_classify
+from src.bulk_classify import parse_args, run
+
+EMAILS = [
+    "Preciso de suporte com o erro no sistema de faturamento.",
+    "Feliz aniversário! Tenha um ótimo dia.",
+    "Qual o status da minha solicitação de reembolso?",
+    "Obrigado pela ajuda de ontem, pessoal.",
+    "O relatório mensal de vendas está pronto para revisão.",
+]
+LABELS = [1, 0, 1, 0, 1]
+
+class TestBulkClassify(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.input = self.tmp_dir / "emails.csv"
+        pd.DataFrame({"text": EMAILS}).to_csv(self.input, index=False)
+        # Modelo próprio do teste: não depende do registro nem do MODEL_PATH da máquina
+        self.model_path = self.tmp_dir / "model.joblib"
+        joblib.dump(Pipeline([("tfidf", TfidfVectorizer()), ("clf", MultinomialNB())]).fit(EMAILS, LABELS),
+                    self.model_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _run(self, output, *extra):
+        return run(parse_args([str(self.input), "-o", str(output), "--batch-size", "2",
+                               "--model", str(self.model_path), *extra]))
+
+    def _interrupted_then_resumed(self, output):
+        # Falha no segundo lote: apenas o primeiro fica gravado no checkpoint
+        classify = bulk_classify.classify_batch
+        calls = []
+
+        def fail_second_batch(items):
+            calls.append(items)
+            if len(calls) == 2:
+                raise RuntimeError("interrompido")
+            return classify(items)
+
+        with mock.patch("src.bulk_classify.classify_batch", side_effect=fail_second_batch):
+            with self.assertRaises(RuntimeError):
+                self._run(output, "--workers", "1")
+        self.assertEqual(self._run(output, "--workers", "1", "--resume"), len(EMAILS))
+
+    def test_csv_round_trip_with_resume(self):
+        """
+        Testa a classificação de um CSV em CSV, retomada após uma interrupção sem linhas repetidas.
+        """
+        output = self.tmp_dir / "resultados.csv"
+        self._interrupted_then_resumed(output)
+        result = pd.read_csv(output, dtype={"id": str})
+        self.assertEqual(result["id"].tolist(), [str(i) for i in range(len(EMAILS))])
+        self.assertEqual(result["category"].tolist(), LABELS)
+        self.assertTrue((result["model_version"] == "file:model.joblib").all())
+        self.assertTrue(result["error"].isna().all())
+
+    def test_parquet_round_trip_with_resume(self):
+        """
+        Testa a saída em Parquet com retomada.
+        """
+        output = self.tmp_dir / "resultados.parquet"
+        self._interrupted_then_resumed(output)
+        result = pd.read_parquet(output).sort_values("id")
+        self.assertEqual(result["id"].tolist(), [str(i) for i in range(len(EMAILS))])
+        self.assertTrue(result["category"].notna().all())
+
+    def test_process_pool_matches_single_process(self):
+        """
+        Testa se o pool de processos produz os mesmos resultados, na mesma ordem.
+        """
+        self._run(self.tmp_dir / "um.csv", "--workers", "1")
+        self._run(self.tmp_dir / "dois.csv", "--workers", "2")
+        pd.testing.assert_frame_equal(pd.read_csv(self.tmp_dir / "um.csv"), pd.read_csv(self.tmp_dir / "dois.csv"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.cascade import cascade_predict
+
+class FixedProba:
+    """
+    Modelo com uma probabilidade fixa por texto.
+    """
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, probabilities):
+        self.probabilities = probabilities
+        self.calls = []
+
+    def predict_proba(self, texts):
+        self.calls.append(list(texts))
+        return np.array([self.probabilities[text] for text in texts])
+
+class Broken:
+    classes_ = np.array([0, 1])
+
+    def predict_proba(self, texts):
+        raise RuntimeError("modelo indisponível")
+
+class TestCascadePredict(unittest.TestCase):
+
+    def setUp(self):
+        self.fast = FixedProba({"a": [0.9, 0.1], "b": [0.4, 0.6], "c": [0.2, 0.8]})
+
+    def test_escalates_only_uncertain(self):
+        """
+        Testa se apenas os textos abaixo do limite vão ao modelo pesado, em uma única chamada.
+        """
+        heavy = FixedProba({"b": [0.95, 0.05], "c": [0.3, 0.7]})
+        results = cascade_predict(self.fast, heavy, ["a", "b", "c"], threshold=0.75)
+        self.assertEqual(heavy.calls, [["b"]])
+        self.assertEqual(results, [(0, 0.9, "fast"), (0, 0.95, "transformer"), (1, 0.8, "fast")])
+
+    def test_heavy_failure(self):
+        """
+        Testa se, com on_error, a falha do modelo pesado mantém as respostas rápidas; sem ele, a exceção sobe.
+        """
+        errors = []
+        results = cascade_predict(self.fast, Broken(), ["a", "b"], threshold=0.75, on_error=errors.append)
+        self.assertEqual(results, [(0, 0.9, "fast"), (1, 0.6, "fast")])
+        self.assertEqual(len(errors), 1)
+        with self.assertRaises(RuntimeError):
+            cascade_predict(self.fast, Broken(), ["a", "b"], threshold=0.75)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.compiled_model import CompiledModel
+
+TEXTS = [
+    "Preciso de suporte técnico no sistema de faturamento",
+    "Solicito atualização do chamado aberto ontem",
+    "Erro ao acessar o relatório mensal, favor verificar",
+    "Qual o prazo para a renovação do contrato?",
+    "Feliz aniversário! Tudo de bom para você",
+    "Obrigado pelo café da manhã, foi ótimo",
+    "Parabéns pela promoção, muito merecido",
+    "Bom final de semana a todos da equipe",
+]
+LABELS = [1, 1, 1, 1, 0, 0, 0, 0]
+UNSEEN = [
+    "Suporte urgente: o sistema não abre", "Parabéns e feliz natal", "", "!!!",
+    "ÓTIMO café, obrigado", "prazo do contrato e erro no relatório do sistema",
+]
+
+class TestCompiledModel(unittest.TestCase):
+
+    def _assert_same(self, vectorizer):
+        pipeline = Pipeline([("tfidf", vectorizer), ("clf", MultinomialNB(alpha=0.1))]).fit(TEXTS, LABELS)
+        compiled = CompiledModel.from_pipeline(pipeline)
+        texts = TEXTS + UNSEEN
+        np.testing.assert_array_equal(compiled.predict(texts), pipeline.predict(texts))
+        np.testing.assert_allclose(compiled.predict_proba(texts), pipeline.predict_proba(texts), atol=1e-5)
+        np.testing.assert_array_equal(compiled.classes_, pipeline.classes_)
+        return pipeline, compiled
+
+    def test_identical_predictions(self):
+        """
+        Testa se o modelo compilado prediz o mesmo que o pipeline em várias configurações do TF-IDF.
+        """
+        self._assert_same(TfidfVectorizer())
+        self._assert_same(TfidfVectorizer(ngram_range=(1, 2), stop_words=["de", "o", "a"], sublinear_tf=True))
+        self._assert_same(TfidfVectorizer(ngram_range=(2, 3), strip_accents="unicode", norm="l1"))
+        self._assert_same(TfidfVectorizer(lowercase=False, binary=True, use_idf=False, norm=None))
+
+    def test_compact_arrays(self):
+        """
+        Testa se o vocabulário, o IDF e as log-probabilidades são arrays compactos.
+        """
+        _, compiled = self._assert_same(TfidfVectorizer(ngram_range=(1, 2)))
+        self.assertEqual(compiled.idf.dtype, np.float32)
+        self.assertEqual(compiled.feature_log_prob.dtype, np.float32)
+        self.assertEqual(compiled.term_hashes.dtype, np.uint32)
+        self.assertEqual(compiled.feature_log_prob.shape, (compiled.n_features, 2))
+
+    def test_joblib_roundtrip_with_mmap(self):
+        """
+        Testa se o artefato salvo com joblib é carregado com memory-mapping e prediz o mesmo.
+        """
+        pipeline, compiled = self._assert_same(TfidfVectorizer(ngram_range=(1, 2)))
+        path = tempfile.mkdtemp()
+        try:
+            joblib.dump(compiled, os.path.join(path, "model.joblib"))
+            loaded = joblib.load(os.path.join(path, "model.joblib"), mmap_mode="r")
+            self.assertIsInstance(loaded.feature_log_prob, np.memmap)
+            np.testing.assert_array_equal(loaded.predict(UNSEEN), pipeline.predict(UNSEEN))
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def test_unsupported_pipeline(self):
+        """
+        Testa se pipelines que não podem ser reproduzidos exatamente são recusados.
+        """
+        hashing = Pipeline([("hashing", HashingVectorizer(alternate_sign=False)), ("clf", MultinomialNB())])
+        with self.assertRaises(ValueError):
+            CompiledModel.from_pipeline(hashing.fit(TEXTS, LABELS))
+        char = Pipeline([("tfidf", TfidfVectorizer(analyzer="char")), ("clf", MultinomialNB())])
+        with self.assertRaises(ValueError):
+            CompiledModel.from_pipeline(char.fit(TEXTS, LABELS))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.dataset_store import CsvDataset, DatasetStore, SingleFileStore, convert_csv, open_dataset
+
+class TestDatasetStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.csv = self.tmp_dir / "dataset.csv"
+        self.data = pd.DataFrame({"text": [f"email {i}" for i in range(23)], "label": [i % 2 for i in range(23)]})
+        self.data.loc[3, "text"] = ""  # Texto vazio não vira NaN
+        self.data.to_csv(self.csv, index=False)
+        self.store_dir = self.tmp_dir / "dataset"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_convert_csv_preserves_rows(self):
+        """
+        Testa se a conversão do CSV em partes Parquet preserva todas as linhas e não sobrescreve o dataset.
+        """
+        self.assertEqual(convert_csv(self.csv, self.store_dir, chunksize=5), 23)
+        store = open_dataset(self.store_dir)
+        self.assertIsInstance(store, DatasetStore)
+        self.assertEqual(len(store.parts()), 5)
+        self.assertEqual(store.num_rows(), 23)
+        pd.testing.assert_frame_equal(store.read(), CsvDataset(self.csv).read())
+        with self.assertRaises(FileExistsError):
+            convert_csv(self.csv, self.store_dir)
+
+    def test_reads_only_requested_rows_and_columns(self):
+        """
+        Testa a leitura de intervalos de linhas e colunas, igual à do CSV, e a leitura em blocos.
+        """
+        convert_csv(self.csv, self.store_dir, chunksize=5)
+        store, csv = DatasetStore(self.store_dir), CsvDataset(self.csv)
+        for start, stop in ((0, 3), (7, 12), (20, None), (30, None)):
+            pd.testing.assert_frame_equal(store.read(["text"], start, stop), csv.read(["text"], start, stop))
+        self.assertEqual(store.read(["label"], 30).columns.tolist(), ["label"])
+        self.assertEqual([len(b) for b in store.iter_batches(["text"], batch_size=4, start=9)], [4, 4, 4, 2])
+        self.assertEqual([len(b) for b in csv.iter_batches(["text"], batch_size=4, start=9)], [4, 4, 4, 2])
+
+    def test_append_adds_partition(self):
+        """
+        Testa se cada acréscimo grava uma nova parte, atualiza a contagem e muda a impressão digital.
+        """
+        store = DatasetStore(self.store_dir)
+        self.assertIsNone(store.append(self.data.head(0)))
+        store.append(self.data.head(10))
+        fingerprint = store.fingerprint()
+        part = store.append(self.data.tail(3))
+        self.assertEqual(part.name, "part-000001.parquet")
+        self.assertEqual(store.num_rows(), 13)
+        self.assertEqual(store.read(start=10)["text"].tolist(), self.data.tail(3)["text"].tolist())
+        self.assertNotEqual(store.fingerprint(), fingerprint)
+        self.assertEqual(list(self.store_dir.glob(".tmp-*")), [])
+
+    def test_single_parquet_file(self):
+        """
+        Testa a abertura de um único arquivo .parquet como dataset.
+        """
+        path = self.tmp_dir / "corpus.parquet"
+        self.data.to_parquet(path, index=False)
+        dataset = open_dataset(path)
+        self.assertIsInstance(dataset, SingleFileStore)
+        self.assertEqual(dataset.read(["text"], stop=2)["text"].tolist(), ["email 0", "email 1"])
+
+if __name__ == '__main__':
+    unittest.main()
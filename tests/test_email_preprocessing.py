@@ -0,0 +1,79 @@
+import sys
+import os
+import unittest
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.email_preprocessing import EmailPreprocessor
+
+REPLY = """Olá equipe,
+
+Preciso de suporte com o erro no módulo de relatórios.
+
+Atenciosamente,
+João Silva
+Analista Financeiro
+
+Esta mensagem e seus anexos são confidenciais e destinados exclusivamente ao destinatário.
+
+Em 10/05/2024 14:32, Suporte <suporte@empresa.com> escreveu:
+> Olá João, o chamado foi aberto.
+"""
+
+FORWARD = """Veja abaixo.
+
+---------- Forwarded message ---------
+From: Maria <m@x.com>
+Date: Mon, May 10, 2024
+Subject: Fatura atrasada
+
+A fatura está atrasada, por favor verifiquem.
+
+Enviado do meu iPhone"""
+
+class TestEmailPreprocessor(unittest.TestCase):
+    def test_removes_quoted_reply_signature_and_disclaimer(self):
+        """
+        Testa a remoção do histórico citado, da assinatura e do aviso legal.
+        """
+        result = EmailPreprocessor().process(REPLY)
+        self.assertEqual(result.text, "Olá equipe,\n\nPreciso de suporte com o erro no módulo de relatórios.")
+        self.assertGreater(result.saved_tokens, 0)
+        self.assertFalse(result.truncated)
+
+    def test_keeps_forwarded_content(self):
+        """
+        Testa se o cabeçalho do encaminhamento é removido e o conteúdo encaminhado é mantido.
+        """
+        result = EmailPreprocessor().process(FORWARD)
+        self.assertEqual(result.text, "Veja abaixo.\n\nA fatura está atrasada, por favor verifiquem.")
+
+    def test_fits_token_budget(self):
+        """
+        Testa o limite de tokens de entrada.
+        """
+        result = EmailPreprocessor(max_input_tokens=10).process("palavra " * 50)
+        self.assertTrue(result.truncated)
+        self.assertLessEqual(result.tokens, 10)
+        self.assertEqual(result.stats()["saved_tokens"], result.original_tokens - result.tokens)
+
+    def test_keeps_content_resembling_disclaimer_or_sign_off(self):
+        """
+        Testa se textos do corpo parecidos com avisos legais ou despedidas não são removidos.
+        """
+        emails = [
+            "Bom dia,\n\nEsta mensagem é para informar que o sistema ficará fora do ar amanhã.\n\nJoão",
+            "Olá,\n\nPreciso revisar o contrato confidencial antes da reunião.",
+            "Oi pessoal,\n\nObrigado!\n\nMas ainda preciso que vocês corrijam o erro 500 no login.",
+        ]
+        for email in emails:
+            self.assertEqual(EmailPreprocessor().process(email).text, email)
+
+    def test_disabled_keeps_content(self):
+        result = EmailPreprocessor(enabled=False).process(REPLY)
+        self.assertEqual(result.text, REPLY)
+        self.assertEqual(result.saved_tokens, 0)
+
+if __name__ == '__main__':
+    unittest.main()
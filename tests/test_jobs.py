@@ -0,0 +1,83 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from unittest import mock
+
+from src.jobs import JobRunner, JobQueueFull, InvalidCallbackUrl, MemoryJobStore, FileSystemJobStore
+
+class TestJobRunner(unittest.TestCase):
+
+    def test_queue_full(self):
+        """
+        Testa se novos jobs são recusados quando o limite de pendentes é atingido.
+        """
+        release = threading.Event()
+        runner = JobRunner(MemoryJobStore(), max_workers=1, max_pending=1)
+        job_id = runner.submit(release.wait)
+
+        with self.assertRaises(JobQueueFull):
+            runner.submit(lambda: "resposta")
+
+        release.set()
+        runner.shutdown()
+        self.assertEqual(runner.get(job_id)["status"], "done")
+        runner.submit(lambda: "resposta")
+        runner.shutdown()
+
+    def test_failed_job(self):
+        """
+        Testa se exceções na tarefa marcam o job como falho.
+        """
+        def fail():
+            raise RuntimeError("falha")
+
+        runner = JobRunner(MemoryJobStore(), max_workers=1)
+        job_id = runner.submit(fail, {"category": 1})
+        runner.shutdown()
+
+        job = runner.get(job_id)
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["category"], 1)
+        self.assertIn("error", job)
+
+    def test_filesystem_store_is_shared(self):
+        """
+        Testa se um job salvo em disco é visível para outra instância (outro worker).
+        """
+        path = tempfile.mkdtemp()
+        try:
+            runner = JobRunner(FileSystemJobStore(path), max_workers=1)
+            job_id = runner.submit(lambda: "resposta")
+            runner.shutdown()
+            self.assertEqual(FileSystemJobStore(path).get(job_id)["response"], "resposta")
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def test_callback_url_allowlist(self):
+        """
+        Testa se o callback só é aceito por https para hosts permitidos.
+        """
+        runner = JobRunner(MemoryJobStore(), max_workers=1, callback_allowed_hosts=["Hooks.Exemplo.com"])
+        for url in ("http://hooks.exemplo.com/job", "https://127.0.0.1/job", "https://hooks.exemplo.com.evil.io/",
+                    "https://hooks.exemplo.com@10.0.0.1/", "file:///etc/passwd"):
+            with self.assertRaises(InvalidCallbackUrl):
+                runner.submit(lambda: "resposta", callback_url=url)
+        with self.assertRaises(InvalidCallbackUrl):
+            JobRunner(MemoryJobStore()).submit(lambda: "resposta", callback_url="https://hooks.exemplo.com/job")
+
+        with mock.patch("requests.post") as post:
+            job_id = runner.submit(lambda: "resposta", callback_url="https://hooks.exemplo.com/job")
+            runner.shutdown()
+        post.assert_called_once()
+        self.assertEqual(post.call_args.kwargs["json"]["id"], job_id)
+        self.assertFalse(post.call_args.kwargs["allow_redirects"])
+
+if __name__ == '__main__':
+    unittest.main()
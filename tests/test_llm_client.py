@@ -0,0 +1,232 @@
+import sys
+import os
+import json
+import time
+import asyncio
+import threading
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.llm_client import LLMClient, AsyncLLMClient, LLMError, CircuitBreaker, CircuitOpenError
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """
+    Servidor local que imita a API de Chat Completions.
+    O comportamento é definido pelos atributos de classe do servidor.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server.requests += 1
+
+        if server.failures > 0:
+            server.failures -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        if server.delay:
+            time.sleep(server.delay)
+
+        if payload.get('stream') and server.broken_stream:
+            # Conexão encerrada no meio da resposta: menos bytes que o Content-Length anunciado
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Content-Length', '10000')
+            self.end_headers()
+            for _ in range(20):
+                self.wfile.write(f"data: {json.dumps({'choices': [{'delta': {'content': 'Olá'}}]})}\n\n".encode())
+            return
+
+        if payload.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            for token in ['Olá', ', ', 'tudo bem']:
+                chunk = {'choices': [{'delta': {'content': token}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        body = json.dumps({'choices': [{'message': {'content': 'Resposta simulada'}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class TestLLMClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Inicia o servidor simulado em uma thread.
+        """
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), MockLLMHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}/v1"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        self.server.requests = 0
+        self.server.failures = 0
+        self.server.delay = 0
+        self.server.broken_stream = False
+
+    def _client(self, **kwargs):
+        kwargs.setdefault('backoff_base', 0.01)
+        return LLMClient(api_key='teste', base_url=self.base_url, **kwargs)
+
+    def test_chat(self):
+        """
+        Testa uma resposta completa e a reutilização da sessão HTTP.
+        """
+        client = self._client()
+        self.assertEqual(client.chat([{'role': 'user', 'content': 'oi'}]), 'Resposta simulada')
+        session = client.session
+        client.chat([{'role': 'user', 'content': 'oi'}])
+        self.assertIs(client.session, session)
+
+    def test_stream_chat(self):
+        """
+        Testa o recebimento dos tokens em streaming.
+        """
+        tokens = list(self._client().stream_chat([{'role': 'user', 'content': 'oi'}]))
+        self.assertEqual(tokens, ['Olá', ', ', 'tudo bem'])
+
+    def test_retries_on_server_error(self):
+        """
+        Testa novas tentativas após falhas temporárias do provedor.
+        """
+        self.server.failures = 2
+        client = self._client(max_retries=2)
+        self.assertEqual(client.chat([{'role': 'user', 'content': 'oi'}]), 'Resposta simulada')
+        self.assertEqual(self.server.requests, 3)
+
+    def test_read_timeout(self):
+        """
+        Testa se o timeout de leitura interrompe respostas lentas.
+        """
+        self.server.delay = 0.5
+        client = self._client(read_timeout=0.1, max_retries=0)
+        with self.assertRaises(LLMError):
+            client.chat([{'role': 'user', 'content': 'oi'}])
+
+    def test_circuit_breaker_fails_fast(self):
+        """
+        Testa se o circuit breaker aberto evita novas chamadas ao provedor.
+        """
+        self.server.failures = 10
+        client = self._client(max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        for _ in range(2):
+            with self.assertRaises(LLMError):
+                client.chat([{'role': 'user', 'content': 'oi'}])
+
+        with self.assertRaises(CircuitOpenError):
+            client.chat([{'role': 'user', 'content': 'oi'}])
+        self.assertEqual(self.server.requests, 2)
+
+    def test_circuit_breaker_half_open(self):
+        """
+        Testa se o circuit breaker volta a fechar após uma chamada de teste bem-sucedida.
+        """
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_probe_records_unexpected_errors(self):
+        """
+        Testa se qualquer erro na chamada de teste do meio aberto reabre o breaker (sem travá-lo).
+        """
+        import requests
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        client = self._client(max_retries=0, breaker=breaker)
+        for error in (requests.TooManyRedirects('redirecionamentos'), RuntimeError('inesperado')):
+            with mock.patch.object(client.session, 'post', side_effect=error):
+                with self.assertRaises((LLMError, RuntimeError)):
+                    client.chat([{'role': 'user', 'content': 'oi'}])
+            self.assertEqual(breaker._state, CircuitBreaker.OPEN)
+        self.assertEqual(client.chat([{'role': 'user', 'content': 'oi'}]), 'Resposta simulada')
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_stream_failure_is_recorded(self):
+        """
+        Testa se uma falha no meio do streaming é lançada como LLMError e conta para o circuit breaker.
+        """
+        self.server.broken_stream = True
+        client = self._client(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+        tokens = []
+        with self.assertRaises(LLMError):
+            for token in client.stream_chat([{'role': 'user', 'content': 'oi'}]):
+                tokens.append(token)
+        self.assertIn('Olá', tokens)
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        async def run():
+            async_client = AsyncLLMClient(api_key='teste', base_url=self.base_url,
+                                          breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+            try:
+                with self.assertRaises(LLMError):
+                    [t async for t in async_client.stream_chat([{'role': 'user', 'content': 'oi'}])]
+            finally:
+                await async_client.aclose()
+            return async_client.breaker.state
+
+        self.assertEqual(asyncio.run(run()), CircuitBreaker.OPEN)
+
+    def test_async_chat_and_stream(self):
+        """
+        Testa o cliente assíncrono: resposta completa, streaming e novas tentativas.
+        """
+        self.server.failures = 1
+
+        async def run():
+            client = AsyncLLMClient(api_key='teste', base_url=self.base_url, backoff_base=0.01)
+            try:
+                reply = await client.chat([{'role': 'user', 'content': 'oi'}])
+                tokens = [t async for t in client.stream_chat([{'role': 'user', 'content': 'oi'}])]
+            finally:
+                await client.aclose()
+            return reply, tokens
+
+        reply, tokens = asyncio.run(run())
+        self.assertEqual(reply, 'Resposta simulada')
+        self.assertEqual(tokens, ['Olá', ', ', 'tudo bem'])
+        self.assertEqual(self.server.requests, 3)
+
+    def test_async_concurrent_requests(self):
+        """
+        Testa se chamadas simultâneas esperam o provedor em paralelo, sem bloquear o event loop.
+        """
+        self.server.delay = 0.3
+
+        async def run():
+            client = AsyncLLMClient(api_key='teste', base_url=self.base_url, pool_size=50)
+            try:
+                start = time.perf_counter()
+                replies = await asyncio.gather(*[client.chat([{'role': 'user', 'content': 'oi'}]) for _ in range(10)])
+                return replies, time.perf_counter() - start
+            finally:
+                await client.aclose()
+
+        replies, elapsed = asyncio.run(run())
+        self.assertEqual(replies, ['Resposta simulada'] * 10)
+        self.assertLess(elapsed, 0.3 * 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+from src.model_registry import ModelRegistry, ActiveModel, FixedModel
+
+def train_pipeline(texts, labels):
+    """
+    Treina um pipeline pequeno, no mesmo formato do usado pela API.
+    """
+    return Pipeline([("tfidf", TfidfVectorizer()), ("clf", MultinomialNB())]).fit(texts, labels)
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.registry = ModelRegistry(self.root)
+        self.model_a = train_pipeline(["preciso de suporte", "feliz aniversário"], [1, 0])
+        self.model_b = train_pipeline(["preciso de suporte", "feliz aniversário"], [0, 1])
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_publish_and_activate(self):
+        """
+        Testa a publicação de versões e a troca da versão ativa.
+        """
+        v1 = self.registry.publish(self.model_a, metadata={"f1": 1.0}, version="v1")
+        v2 = self.registry.publish(self.model_b, version="v2", activate=False)
+        self.assertEqual(self.registry.versions(), ["v1", "v2"])
+        self.assertEqual(self.registry.active_version(), v1)
+        self.assertEqual(self.registry.metadata(v1)["f1"], 1.0)
+
+        self.registry.activate(v2)
+        self.assertEqual(self.registry.active_version(), "v2")
+        with self.assertRaises(ValueError):
+            self.registry.activate("inexistente")
+
+    def test_loads_with_memory_mapping(self):
+        """
+        Testa se os arrays do modelo são carregados via memory-mapping.
+        """
+        version = self.registry.publish(self.model_a)
+        model = self.registry.load(version)
+        self.assertIsInstance(model.named_steps["clf"].feature_log_prob_, np.memmap)
+        self.assertEqual(model.predict(["preciso de suporte"])[0], 1)
+
+    def test_hot_swap_on_active_change(self):
+        """
+        Testa se o worker troca de modelo quando o arquivo ACTIVE muda,
+        sem afetar referências obtidas antes da troca.
+        """
+        self.registry.publish(self.model_a, version="v1")
+        active = ActiveModel(self.registry, check_interval=0)
+        version, in_flight = active.get()
+        self.assertEqual(version, "v1")
+
+        self.registry.publish(self.model_b, version="v2")
+        version, model = active.get()
+        self.assertEqual(version, "v2")
+        self.assertEqual(model.predict(["preciso de suporte"])[0], 0)
+        self.assertEqual(in_flight.predict(["preciso de suporte"])[0], 1)
+
+    def test_fallback_without_active_version(self):
+        """
+        Testa o uso do carregador legado quando o registro está vazio.
+        """
+        active = ActiveModel(self.registry, fallback_loader=lambda: self.model_a)
+        self.assertEqual(active.version, "legacy")
+
+        with self.assertRaises(FileNotFoundError):
+            ActiveModel(self.registry).get()
+
+    def test_fixed_model_rejects_version_change(self):
+        """
+        Testa o modelo fixo (backend fora do registro).
+        """
+        fixed = FixedModel("onnx:model.int8.onnx", self.model_a)
+        self.assertEqual(fixed.get(), ("onnx:model.int8.onnx", self.model_a))
+        self.assertEqual(fixed.reload()[0], "onnx:model.int8.onnx")
+        with self.assertRaises(ValueError):
+            fixed.reload("v2")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import sys
+import os
+import unittest
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.near_duplicates import NearDuplicateIndex, simhash
+
+TEMPLATE = "Prezado cliente, o chamado número {} foi {} em {}. Acesse o portal para acompanhar o andamento da sua solicitação."
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def test_templated_emails_share_signature(self):
+        """
+        Testa se emails que diferem apenas em números geram a mesma assinatura.
+        """
+        self.assertEqual(simhash(TEMPLATE.format(123, "atualizado", "10/05")), simhash(TEMPLATE.format(987, "atualizado", "22/07")))
+
+    def test_lookup_within_threshold(self):
+        """
+        Testa a busca por emails quase idênticos e a recusa de emails diferentes.
+        """
+        index = NearDuplicateIndex(threshold=0.95)
+        index.add(TEMPLATE.format(123, "atualizado", "10/05"), "resposta")
+
+        self.assertEqual(index.lookup(TEMPLATE.format(555, "atualizado", "01/01")), "resposta")
+        self.assertIsNone(index.lookup(TEMPLATE.format(555, "cancelado", "01/01")))
+        self.assertIsNone(index.lookup("Preciso de suporte técnico urgente, o sistema de relatórios está fora do ar."))
+        self.assertEqual(index.stats()["hits"], 1)
+
+    def test_short_emails_are_ignored(self):
+        """
+        Testa se emails curtos demais não entram no índice.
+        """
+        index = NearDuplicateIndex(min_tokens=8)
+        index.add("Olá, tudo bem?", "resposta")
+        self.assertIsNone(index.lookup("Olá, tudo bem?"))
+        self.assertEqual(index.stats()["items"], 0)
+
+    def test_evicts_least_recently_used(self):
+        """
+        Testa o limite de tamanho do índice.
+        """
+        index = NearDuplicateIndex(max_items=2, min_tokens=1)
+        texts = ["relatório mensal de vendas pronto", "reunião sobre o projeto amanhã cedo", "erro no módulo de faturamento hoje"]
+        for i, text in enumerate(texts):
+            index.add(text, i)
+        self.assertIsNone(index.lookup(texts[0]))
+        self.assertEqual(index.lookup(texts[2]), 2)
+        self.assertEqual(index.stats()["items"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
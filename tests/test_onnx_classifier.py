@@ -0,0 +1,133 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import importlib.util
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.onnx_classifier import OnnxClassifier, QUANTIZED_FILE
+
+# Dependências opcionais (requirements-onnx.txt); onnx é usado só para montar o modelo de teste
+ONNX_AVAILABLE = all(importlib.util.find_spec(name) for name in ("onnx", "onnxruntime", "transformers"))
+
+VOCAB = ["[PAD]", "[UNK]", "suporte", "chamado", "erro", "natal", "festas", "obrigado"]
+# Peso de cada token em (improdutivo, produtivo); os demais tokens não pesam
+TOKEN_LOGITS = {"suporte": (0.0, 2.0), "chamado": (0.0, 1.0), "erro": (0.0, 1.0),
+                "natal": (2.0, 0.0), "festas": (1.0, 0.0), "obrigado": (1.0, 0.0)}
+
+def build_model_dir(path):
+    """
+    Gera um diretório como o de src/export_onnx.py: tokenizer, config.json e um modelo
+    ONNX mínimo (soma dos pesos dos tokens, ignorando o padding), com eixos dinâmicos.
+    """
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import PreTrainedTokenizerFast
+
+    tokenizer = Tokenizer(models.WordLevel({token: i for i, token in enumerate(VOCAB)}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    PreTrainedTokenizerFast(tokenizer_object=tokenizer, pad_token="[PAD]", unk_token="[UNK]").save_pretrained(path)
+
+    with open(path / "config.json", "w", encoding="utf-8") as f:
+        json.dump({"id2label": {"0": "Improdutivo", "1": "Produtivo"}}, f)
+
+    weights = np.zeros((len(VOCAB), 2), dtype=np.float32)
+    for token, logits in TOKEN_LOGITS.items():
+        weights[VOCAB.index(token)] = logits
+    nodes = [
+        helper.make_node("Gather", ["weights", "input_ids"], ["embedded"]),
+        helper.make_node("Cast", ["attention_mask"], ["mask"], to=TensorProto.FLOAT),
+        helper.make_node("Unsqueeze", ["mask", "last_axis"], ["mask3"]),
+        helper.make_node("Mul", ["embedded", "mask3"], ["masked"]),
+        helper.make_node("ReduceSum", ["masked", "sequence_axis"], ["logits"], keepdims=0),
+    ]
+    graph = helper.make_graph(
+        nodes, "email-classifier",
+        [helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "sequence"]),
+         helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "sequence"])],
+        [helper.make_tensor_value_info("logits", TensorProto.FLOAT, ["batch", 2])],
+        initializer=[numpy_helper.from_array(weights, "weights"),
+                     numpy_helper.from_array(np.array([2], dtype=np.int64), "last_axis"),
+                     numpy_helper.from_array(np.array([1], dtype=np.int64), "sequence_axis")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    onnx.save(model, str(path / QUANTIZED_FILE))
+
+@unittest.skipUnless(ONNX_AVAILABLE, "onnx, onnxruntime e transformers não instalados (requirements-onnx.txt)")
+class TestOnnxClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.model_dir = Path(tempfile.mkdtemp())
+        build_model_dir(self.model_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+
+    def test_predict_keeps_input_order(self):
+        """
+        Testa se as predições voltam na ordem da entrada, com lotes ordenados por tamanho e padding dinâmico.
+        """
+        texts = ["natal", "suporte chamado erro erro erro", "obrigado festas natal natal", "suporte", "erro"]
+        classifier = OnnxClassifier(self.model_dir, batch_size=2).load()
+        self.assertEqual(classifier.predict(texts).tolist(), [0, 1, 0, 1, 1])
+
+        # O resultado não depende do tamanho do lote (o padding não altera os logits)
+        one_by_one = OnnxClassifier(self.model_dir, batch_size=1)
+        np.testing.assert_allclose(classifier.predict_proba(texts), one_by_one.predict_proba(texts), rtol=1e-5)
+
+    def test_predict_proba(self):
+        """
+        Testa se as probabilidades são o softmax dos logits, com uma coluna por rótulo do config.json.
+        """
+        classifier = OnnxClassifier(self.model_dir)
+        self.assertEqual(classifier.classes_.tolist(), [0, 1])
+        probabilities = classifier.predict_proba(["suporte", "texto desconhecido"])
+        self.assertEqual(probabilities.shape, (2, 2))
+        np.testing.assert_allclose(probabilities.sum(axis=1), 1.0, rtol=1e-6)
+        np.testing.assert_allclose(probabilities[0], [1 / (1 + np.exp(2)), 1 / (1 + np.exp(-2))], rtol=1e-5)
+        np.testing.assert_allclose(probabilities[1], [0.5, 0.5], rtol=1e-6)
+
+    def test_truncates_to_max_length(self):
+        """
+        Testa se os textos são truncados em max_length tokens.
+        """
+        classifier = OnnxClassifier(self.model_dir, max_length=2)
+        # Só "natal natal" é lido: o restante (produtivo) fica fora do limite
+        self.assertEqual(classifier.predict(["natal natal suporte suporte suporte"]).tolist(), [0])
+
+    def test_session_recreated_in_new_process(self):
+        """
+        Testa se a sessão é criada uma vez por processo (não reaproveitada após um fork).
+        """
+        classifier = OnnxClassifier(self.model_dir).load()
+        session = classifier.session
+        self.assertIs(classifier.session, session)
+        classifier._session_pid = -1
+        self.assertIsNot(classifier.session, session)
+
+class TestOnnxClassifierConfig(unittest.TestCase):
+
+    def test_labels_without_model(self):
+        """
+        Testa o número de classes sem carregar o modelo (o construtor não importa onnxruntime).
+        """
+        model_dir = Path(tempfile.mkdtemp())
+        try:
+            self.assertEqual(OnnxClassifier(model_dir).classes_.tolist(), [0, 1])
+            with open(model_dir / "config.json", "w", encoding="utf-8") as f:
+                json.dump({"id2label": {"0": "a", "1": "b", "2": "c"}}, f)
+            self.assertEqual(OnnxClassifier(model_dir).classes_.tolist(), [0, 1, 2])
+        finally:
+            shutil.rmtree(model_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import sys
+import os
+import time
+import unittest
+from unittest import mock
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.pdf_extraction import PdfExtractor, page_timings
+
+def blocked_extraction(data, page_numbers):
+    """
+    Tarefa travada (PDF patológico), executada no pool no lugar de extract_pages.
+    """
+    time.sleep(120)
+
+def build_pdf(pages):
+    """
+    Monta um PDF válido com uma linha de texto por página.
+    """
+    count = len(pages)
+    objects = [
+        b"<</Type /Catalog /Pages 2 0 R>>",
+        ("<</Type /Pages /Kids [%s] /Count %d>>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(count)), count)).encode(),
+        b"<</Type /Font /Subtype /Type1 /BaseFont /Helvetica>>",
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(f"<</Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources <</Font <</F1 3 0 R>>>> /Contents {5 + 2 * i} 0 R>>".encode())
+        objects.append(b"<</Length %d>>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<</Size %d /Root 1 0 R>>\nstartxref\n%d\n%%%%EOF" % (len(objects) + 1, xref)
+    return bytes(output)
+
+class TestPdfExtractor(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Cria um PDF de seis páginas para os testes.
+        """
+        self.pdf = build_pdf([f"Pagina {i}" for i in range(6)])
+
+    def test_extracts_all_pages_in_order(self):
+        """
+        Testa a extração completa, em ordem, de um PDF pequeno.
+        """
+        result = PdfExtractor().extract(self.pdf)
+        self.assertEqual(result.text, " ".join(f"Pagina {i}" for i in range(6)))
+        self.assertEqual(result.page_count, 6)
+        self.assertEqual(result.pages_read, 6)
+        self.assertEqual(len(result.page_seconds), 6)
+        self.assertFalse(result.truncated)
+
+    def test_page_budget(self):
+        """
+        Testa se apenas as primeiras páginas são extraídas.
+        """
+        result = PdfExtractor(max_pages=2).extract(self.pdf)
+        self.assertEqual(result.text, "Pagina 0 Pagina 1")
+        self.assertTrue(result.truncated)
+
+    def test_char_budget(self):
+        """
+        Testa se a extração para ao atingir o limite de caracteres.
+        """
+        result = PdfExtractor(max_chars=12).extract(self.pdf)
+        self.assertEqual(result.pages_read, 2)
+        self.assertEqual(len(result.text), 12)
+        self.assertTrue(result.truncated)
+
+    def test_timeout(self):
+        """
+        Testa se um tempo limite esgotado interrompe a extração.
+        """
+        result = PdfExtractor(timeout=0).extract(self.pdf)
+        self.assertTrue(result.timed_out)
+        self.assertEqual(result.pages_read, 0)
+
+    def test_process_pool(self):
+        """
+        Testa a extração distribuída em um pool de processos.
+        """
+        before = page_timings.snapshot()["pages"]
+        extractor = PdfExtractor(workers=2, pages_per_task=2, timeout=60)
+        try:
+            result = extractor.extract(self.pdf)
+        finally:
+            extractor.shutdown()
+        self.assertEqual(result.text, " ".join(f"Pagina {i}" for i in range(6)))
+        self.assertEqual(page_timings.snapshot()["pages"], before + 6)
+
+    def test_timeout_replaces_blocked_pool(self):
+        """
+        Testa se, com o tempo esgotado, o processo travado é encerrado e o pool volta a atender.
+        """
+        extractor = PdfExtractor(workers=1, timeout=1)
+        try:
+            with mock.patch('src.pdf_extraction.extract_pages', blocked_extraction):
+                result = extractor.extract(self.pdf)
+            self.assertTrue(result.timed_out)
+            self.assertEqual(result.pages_read, 0)
+
+            # Com o único processo ainda travado, esta extração também esgotaria o tempo
+            extractor.timeout = 60
+            start = time.perf_counter()
+            result = extractor.extract(self.pdf)
+            self.assertFalse(result.timed_out)
+            self.assertEqual(result.pages_read, 6)
+            self.assertLess(time.perf_counter() - start, 30)
+        finally:
+            extractor.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.prepare_training_data import (HashIndex, append_to_dataset, clean_text, clean_text_series, ingest_source,
+                                       prepare_training_data)
+from src.dataset_store import DatasetStore
+
+class TestPrepareTrainingData(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output = Path(self.tmp_dir) / "dataset.csv"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_vectorized_cleaning_matches_clean_text(self):
+        """
+        Testa se a limpeza vetorizada produz o mesmo resultado de clean_text.
+        """
+        texts = ["Erro #1234 no  Módulo!", "Olá,   tudo bem?\n", "  123  "]
+        self.assertEqual(clean_text_series(pd.Series(texts)).tolist(), [clean_text(t) for t in texts])
+
+    def test_append_skips_rows_already_in_dataset(self):
+        """
+        Testa se textos já presentes no dataset (ou repetidos no lote) não são adicionados.
+        """
+        first = pd.DataFrame({"text": ["a", "b", "b"], "label": [1, 0, 0]})
+        self.assertEqual(len(append_to_dataset(first, self.output)), 2)
+
+        second = pd.DataFrame({"text": ["b", "c"], "label": [0, 1]})
+        added = append_to_dataset(second, self.output)
+        self.assertEqual(added["text"].tolist(), ["c"])
+        self.assertEqual(pd.read_csv(self.output)["text"].tolist(), ["a", "b", "c"])
+
+    def test_index_is_rebuilt_from_existing_dataset(self):
+        """
+        Testa se o índice de hashes é reconstruído a partir de um dataset existente.
+        """
+        pd.DataFrame({"text": ["a"], "label": [1]}).to_csv(self.output, index=False)
+        index = HashIndex(self.output).load()
+        self.assertEqual(len(index), 1)
+        self.assertTrue(index.path.exists())
+
+    def test_ingest_source_in_chunks(self):
+        """
+        Testa a ingestão de uma fonte externa em blocos, sem duplicar registros ao repetir a ingestão.
+        """
+        source = Path(self.tmp_dir) / "source.csv"
+        pd.DataFrame({
+            "body": ["Preciso de SUPORTE!", "preciso de suporte", "Feliz aniversário", "123"],
+            "category": [1, 1, 0, 0],
+        }).to_csv(source, index=False)
+
+        added = ingest_source(source, self.output, text_column="body", label_column="category", chunksize=1)
+        self.assertEqual(added, 2)
+        self.assertEqual(ingest_source(source, self.output, "body", "category", chunksize=2), 0)
+        self.assertEqual(len(pd.read_csv(self.output)), 2)
+
+    def test_append_to_parquet_dataset(self):
+        """
+        Testa o acréscimo em um dataset Parquet, com uma parte por lote e índice reconstruído das partes.
+        """
+        dataset_dir = Path(self.tmp_dir) / "dataset"
+        append_to_dataset(pd.DataFrame({"text": ["a", "b"], "label": [1, 0]}), dataset_dir)
+        added = append_to_dataset(pd.DataFrame({"text": ["b", "c"], "label": [0, 1]}), dataset_dir)
+        self.assertEqual(added["text"].tolist(), ["c"])
+        self.assertEqual(len(list(dataset_dir.glob("part-*.parquet"))), 2)
+        self.assertEqual(DatasetStore(dataset_dir).read(["text"])["text"].tolist(), ["a", "b", "c"])
+
+        # Índice reconstruído a partir das partes Parquet
+        HashIndex(dataset_dir).path.unlink()
+        self.assertEqual(len(HashIndex(dataset_dir).load()), 3)
+
+    def test_logs_row_count_and_unique_records(self):
+        """
+        Testa se o total registrado é o número de linhas do dataset, e não o de textos únicos.
+        """
+        # Dataset antigo, com uma linha repetida (anterior ao índice de hashes)
+        pd.DataFrame({"text": ["a", "a", "b"], "label": [1, 1, 0]}).to_csv(self.output, index=False)
+        source = Path(self.tmp_dir) / "source.csv"
+        pd.DataFrame({"text": ["c"], "label": [1]}).to_csv(source, index=False)
+
+        with mock.patch("src.prepare_training_data.default_output_path", return_value=self.output):
+            with self.assertLogs("src.prepare_training_data", level="INFO") as logs:
+                prepare_training_data(source)
+        self.assertIn("Total de registros: 4", "\n".join(logs.output))
+        self.assertIn("Registros únicos: 3", "\n".join(logs.output))
+
+if __name__ == '__main__':
+    unittest.main()
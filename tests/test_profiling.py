@@ -0,0 +1,90 @@
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.profiling import RequestProfiler
+
+def slow_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+class TestRequestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _profile(self, profiler, seconds, forced=False):
+        capture = profiler.start(forced=forced)
+        if capture is None:
+            return None
+        slow_work(seconds)
+        return profiler.finish(capture, {'classification': seconds}, {'email_chars': 10})
+
+    def test_slow_requests_saved(self):
+        """
+        Testa se apenas requisições sorteadas acima do limite de latência têm o perfil salvo.
+        """
+        profiler = RequestProfiler(self.directory, enabled=True, sample_rate=1.0, slow_ms=30)
+        self.assertIsNone(self._profile(profiler, 0))
+        profile_id = self._profile(profiler, 0.05)
+        self.assertIsNotNone(profile_id)
+
+        summary, = profiler.list_profiles()
+        self.assertEqual(summary['profile_id'], profile_id)
+        self.assertEqual(summary['trigger'], 'sampled')
+        self.assertTrue(summary['slow'])
+        self.assertEqual(summary['stages_ms'], {'classification': 50.0})
+        self.assertTrue(any('slow_work' in row['function'] for row in summary['top_functions']))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, f'{profile_id}.prof')))
+
+    def test_not_sampled(self):
+        """
+        Testa se, sem amostragem e sem o cabeçalho, nenhuma requisição é perfilada.
+        """
+        profiler = RequestProfiler(self.directory, enabled=True, sample_rate=0, slow_ms=0)
+        self.assertIsNone(profiler.start())
+        capture = profiler.start(forced=True)
+        self.assertIsNotNone(capture)
+        self.assertIsNotNone(profiler.finish(capture))  # Perfis forçados são sempre salvos
+
+    def test_ring_directory(self):
+        """
+        Testa se o diretório guarda apenas os perfis mais recentes.
+        """
+        profiler = RequestProfiler(self.directory, enabled=True, slow_ms=60000, max_profiles=2)
+        ids = [self._profile(profiler, 0, forced=True) for _ in range(4)]
+        self.assertEqual([p['profile_id'] for p in profiler.list_profiles()], ids[:1:-1])
+        self.assertEqual(len(os.listdir(self.directory)), 4)  # .json e .prof de cada perfil
+
+    def test_sampling_mode(self):
+        """
+        Testa o profiler por amostragem de pilha (formato folded).
+        """
+        profiler = RequestProfiler(self.directory, enabled=True, mode='sampling', interval=0.001)
+        profile_id = self._profile(profiler, 0.05, forced=True)
+        with open(os.path.join(self.directory, f'{profile_id}.folded'), encoding='utf-8') as f:
+            folded = f.read()
+        self.assertIn('slow_work', folded)
+        with open(os.path.join(self.directory, f'{profile_id}.json'), encoding='utf-8') as f:
+            self.assertGreater(json.load(f)['samples'], 0)
+
+    def test_invalid_mode(self):
+        """
+        Testa se um modo desconhecido é recusado.
+        """
+        with self.assertRaises(ValueError):
+            RequestProfiler(self.directory, mode='perf')
+
+if __name__ == '__main__':
+    unittest.main()
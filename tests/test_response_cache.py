@@ -0,0 +1,93 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.response_cache import ResponseCache, LRUMemoryCache
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Cria um diretório temporário para o nível em disco.
+        """
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Remove o diretório temporário.
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_key_ignores_whitespace_and_case(self):
+        """
+        Testa se conteúdos equivalentes após normalização geram a mesma chave.
+        """
+        key_a = ResponseCache.make_key("Olá,  preciso\nde ajuda", "gpt", "prompt")
+        key_b = ResponseCache.make_key("olá, preciso de ajuda ", "gpt", "prompt")
+        self.assertEqual(key_a, key_b)
+        self.assertNotEqual(key_a, ResponseCache.make_key("olá, preciso de ajuda", "outro", "prompt"))
+        self.assertNotEqual(key_a, ResponseCache.make_key("olá, preciso de ajuda", "gpt", "outro"))
+
+    def test_hits_and_misses(self):
+        """
+        Testa os contadores de hit e miss nos dois níveis.
+        """
+        cache = ResponseCache(cache_dir=self.cache_dir)
+        self.assertIsNone(cache.get("k"))
+        cache.set("k", "resposta")
+        self.assertEqual(cache.get("k"), "resposta")
+
+        stats = cache.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+
+    def test_disk_tier_is_shared(self):
+        """
+        Testa se uma instância (outro worker) encontra respostas gravadas por outra.
+        """
+        ResponseCache(cache_dir=self.cache_dir).set("k", "resposta")
+        other = ResponseCache(cache_dir=self.cache_dir)
+        self.assertEqual(other.get("k"), "resposta")
+        self.assertEqual(other.stats()["disk_hits"], 1)
+        self.assertEqual(other.get("k"), "resposta")
+        self.assertEqual(other.stats()["memory_hits"], 1)
+
+    def test_lru_eviction(self):
+        """
+        Testa se o item menos usado recentemente é removido ao atingir o limite.
+        """
+        cache = LRUMemoryCache(threshold=2, default_timeout=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_ttl_expiration(self):
+        """
+        Testa se itens expirados deixam de ser retornados.
+        """
+        cache = LRUMemoryCache(threshold=10, default_timeout=60)
+        cache.set("a", 1, timeout=1)
+        cache._cache["a"] = (time.time() - 1, 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_disabled_cache(self):
+        """
+        Testa se o cache desativado não armazena nada.
+        """
+        cache = ResponseCache(cache_dir=self.cache_dir, enabled=False)
+        cache.set("k", "resposta")
+        self.assertIsNone(cache.get("k"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.train_model import train_incremental
+from src.dataset_store import DatasetStore, open_dataset
+from model_registry import ModelRegistry
+
+def labeled(start, count):
+    texts = [f"Preciso de suporte com o chamado {i}" if i % 2 else f"Feliz natal e boas festas {i}"
+             for i in range(start, start + count)]
+    return pd.DataFrame({"text": texts, "label": [i % 2 for i in range(start, start + count)]})
+
+class TestIncrementalTraining(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.store = DatasetStore(self.tmp_dir / "dataset")
+        self.registry = ModelRegistry(self.tmp_dir / "registry")
+        self.model_path = self.tmp_dir / "model.joblib"
+        patches = [
+            mock.patch("src.train_model.REGISTRY_DIR", self.registry.root),
+            mock.patch("src.train_model.MODEL_PATH", str(self.model_path)),
+            mock.patch("src.train_model.open_dataset", lambda path=None: open_dataset(path or self.store.path)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def training(self, version):
+        return self.registry.metadata(version)["training"]
+
+    def test_rows_seen_advances_and_noop_run(self):
+        """
+        Testa se cada execução lê apenas as linhas novas e se uma execução sem novidades não publica versão.
+        """
+        self.store.append(labeled(0, 40))
+        first = train_incremental(chunksize=16)
+        self.assertEqual(self.training(first)["rows_seen"], 40)
+        self.assertEqual(self.training(first)["new_rows"], 40)
+
+        self.assertIsNone(train_incremental(chunksize=16))
+        self.assertEqual(self.registry.active_version(), first)
+
+        self.store.append(labeled(40, 10))
+        second = train_incremental(chunksize=16)
+        self.assertEqual(self.training(second)["rows_seen"], 50)
+        self.assertEqual(self.training(second)["new_rows"], 10)
+
+        # O modelo incremental não substitui o pipeline de MODEL_PATH
+        self.assertFalse(self.model_path.exists())
+
+    def test_source_does_not_advance_pointer(self):
+        """
+        Testa se atualizar com --source não move a posição de leitura do dataset principal.
+        """
+        self.store.append(labeled(0, 20))
+        base = train_incremental(chunksize=16)
+
+        source = self.tmp_dir / "novos.csv"
+        labeled(100, 8).to_csv(source, index=False)
+        version = train_incremental(source=str(source), chunksize=16)
+        self.assertEqual(self.training(version)["rows_seen"], self.training(base)["rows_seen"])
+        self.assertEqual(self.training(version)["new_rows"], 8)
+
+        # O dataset principal continua de onde parou
+        self.store.append(labeled(20, 4))
+        self.assertEqual(self.training(train_incremental(chunksize=16))["rows_seen"], 24)
+
+    def test_source_requires_incremental_active_version(self):
+        """
+        Testa se --source é recusado quando a versão ativa não é incremental, mantendo o modelo ativo.
+        """
+        source = self.tmp_dir / "novos.csv"
+        labeled(100, 3).to_csv(source, index=False)
+        self.assertIsNone(train_incremental(source=str(source)))
+        self.assertEqual(self.registry.versions(), [])
+
+        data = labeled(0, 20)
+        pipeline = Pipeline([("tfidf", TfidfVectorizer()), ("clf", MultinomialNB())]).fit(data["text"], data["label"])
+        active = self.registry.publish(pipeline, metadata={"format": "pipeline"})
+        self.assertIsNone(train_incremental(source=str(source)))
+        self.assertIsNone(train_incremental(source=str(source), from_scratch=True))
+        self.assertEqual(self.registry.active_version(), active)
+        self.assertEqual(self.registry.versions(), [active])
+
+if __name__ == '__main__':
+    unittest.main()
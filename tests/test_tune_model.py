@@ -0,0 +1,68 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+# Adicionar o diretório src ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from src.tune_model import tune_model
+from src.dataset_store import DatasetStore, open_dataset
+from compiled_model import CompiledModel
+from model_registry import ModelRegistry
+
+def emails(count):
+    texts = [f"Preciso de suporte com o chamado {i}" if i % 2 else f"Feliz natal e boas festas {i}" for i in range(count)]
+    return pd.DataFrame({"text": texts, "label": [i % 2 for i in range(count)]})
+
+class TestTuneModel(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.store = DatasetStore(self.tmp_dir / "dataset")
+        self.store.append(emails(40))
+        self.registry = ModelRegistry(self.tmp_dir / "registry")
+        self.compiled_path = self.tmp_dir / "model.compiled.joblib"
+        patches = [
+            mock.patch("src.tune_model.REGISTRY_DIR", self.registry.root),
+            mock.patch("src.tune_model.open_dataset", lambda path=None: open_dataset(path or self.store.path)),
+            # compile_for_serving vem do módulo train_model importado por tune_model
+            mock.patch("train_model.COMPILED_MODEL_PATH", self.compiled_path),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_publishes_compiled_model(self):
+        """
+        Testa se o melhor modelo de uma grade pequena é publicado na forma compilada.
+        """
+        version = tune_model(cv=2, n_jobs=1, cache_dir=str(self.tmp_dir / "cache"),
+                             param_grid={"clf__alpha": [0.1, 1.0]})
+
+        metadata = self.registry.metadata(version)
+        self.assertEqual(metadata["format"], "compiled")
+        self.assertIn(metadata["tuning"]["best_params"]["clf__alpha"], [0.1, 1.0])
+        self.assertEqual(self.registry.active_version(), version)
+        self.assertIsInstance(self.registry.load(version), CompiledModel)
+        self.assertTrue(self.compiled_path.exists())
+
+    def test_no_compile_publishes_pipeline(self):
+        """
+        Testa se --no-compile publica o pipeline do scikit-learn.
+        """
+        version = tune_model(cv=2, n_jobs=1, cache_dir=str(self.tmp_dir / "cache"),
+                             param_grid={"clf__alpha": [0.1]}, compile_model=False)
+        self.assertEqual(self.registry.metadata(version)["format"], "pipeline")
+        self.assertFalse(self.compiled_path.exists())
+
+if __name__ == '__main__':
+    unittest.main()